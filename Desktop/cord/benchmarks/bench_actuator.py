@@ -0,0 +1,121 @@
+"""
+구동 경로 벤치마크 (시뮬레이션 하드웨어)
+
+SimulatedGpio 의 EventLog 로 조향 명령의 비용을 측정합니다. 실제 핀 없이 일반 리눅스에서 실행 가능.
+- 직접 호출: 제어 루프에서 set_servo_angle 을 바로 호출 (soft_pwm 은 hold 만큼 루프가 막힘)
+- Actuator: 명령만 넘기고 구동 스레드에서 최신 목표만 적용
+조향 드라이버(soft_pwm / pca9685)별로 각각 측정합니다.
+
+출력
+- 루프 속도: 목표 주기 대비 실제 제어 루프 반복 빈도
+- 호출 시간: 명령 한 번에 제어 루프가 막힌 시간
+- 구동 지연: 마지막 명령 시각부터 해당 듀티 사이클이 핀에 쓰인 시각까지
+- 듀티 쓰기: 서보 핀 쓰기 횟수와 그중 값이 바뀌지 않은 불필요한 쓰기
+
+사용법: python benchmarks/bench_actuator.py [--rate 30] [--seconds 3] [--hold 0.1] [--driver soft_pwm]
+"""
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.hw import KIND_DUTY, KIND_PULSE, STEERING_DRIVERS, open_gpio, open_steering, DCMotor
+from vehicle.actuator import Actuator
+from vehicle.stats import LatencyStats
+
+SERVO_PIN = 12
+SERVO_CHANNEL = 0
+IN1, IN2, ENA = 17, 27, 18
+
+
+def steering_commands(count, seed=0):
+    """autonomous_driving 과 같은 규칙(좌/우 ±15도, 직진 30도)으로 만든 각도 시퀀스"""
+    rng = random.Random(seed)
+    angle = 30
+    angles = []
+    for _ in range(count):
+        direction = rng.choices((0, 1, 2), weights=(1, 3, 1))[0]
+        if direction == 0:
+            angle = max(0, angle - 15)
+        elif direction == 1:
+            angle = 30
+        else:
+            angle = min(60, angle + 15)
+        angles.append(angle)
+    return angles
+
+
+def run_loop(name, angles, rate, hold, driver, use_actuator):
+    gpio = open_gpio(simulate=True)
+    servo = open_steering(driver, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL, hold=hold)
+    motor = DCMotor(gpio, IN1, IN2, ENA)
+    actuator = Actuator(servo, motor).start() if use_actuator else None
+    gpio.log.clear()
+
+    period = 1.0 / rate
+    call_time = LatencyStats(window=len(angles))
+    command_times = []
+    start = time.monotonic()
+    next_tick = start
+    for angle in angles:
+        t0 = time.monotonic()
+        command_times.append(t0)
+        if actuator is not None:
+            actuator.set_angle(angle)
+        else:
+            servo.set_angle(angle)
+        call_time.add(time.monotonic() - t0)
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.monotonic() - start
+    if actuator is not None:
+        actuator.flush(timeout=2.0)
+        actuator.stop()
+
+    # 0 이 아닌 서보 듀티/펄스 쓰기 = 각도 적용 시점
+    if driver == "pca9685":
+        key, kind = (SERVO_CHANNEL, "pulse"), KIND_PULSE
+    else:
+        key, kind = (SERVO_PIN, "duty"), KIND_DUTY
+    latency = LatencyStats(window=len(angles))
+    for t, duty in gpio.log.select(key[0], kind):
+        if duty == 0:
+            continue
+        i = bisect.bisect_right(command_times, t) - 1
+        if i >= 0:
+            latency.add(t - command_times[i])
+    servo_writes = gpio.log.summary()[key]
+
+    calls = call_time.summary()
+    lat = latency.summary()
+    print(f"{name:>16}: 루프 {len(angles) / elapsed:5.1f}Hz (목표 {rate}Hz), "
+          f"호출 평균 {calls['mean_ms']:.2f}ms / 최대 {calls['max_ms']:.2f}ms, "
+          f"구동 지연 p50 {lat['p50_ms']:.1f}ms / p95 {lat['p95_ms']:.1f}ms, "
+          f"서보 쓰기 {servo_writes['writes']} (변화 없음 {servo_writes['writes'] - servo_writes['changes']})")
+    if actuator is not None:
+        print(f"{'':>16}  Actuator 통계: {actuator.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조향 구동 경로 벤치마크 (시뮬레이션)")
+    parser.add_argument("--rate", type=float, default=30, help="제어 루프 목표 주기 (Hz)")
+    parser.add_argument("--seconds", type=float, default=3, help="측정 시간 (초)")
+    parser.add_argument("--hold", type=float, default=0.1, help="soft_pwm 서보 듀티 유지 시간 (초)")
+    parser.add_argument("--driver", choices=STEERING_DRIVERS, action="append",
+                        help="측정할 조향 드라이버 (여러 번 지정 가능, 기본: 모두)")
+    args = parser.parse_args()
+
+    angles = steering_commands(int(args.rate * args.seconds))
+    print(f"명령 {len(angles)}개, {args.rate}Hz, 서보 hold {args.hold}s")
+    for driver in args.driver or STEERING_DRIVERS:
+        run_loop(f"{driver} 직접", angles, args.rate, args.hold, driver, use_actuator=False)
+        run_loop(f"{driver} Actuator", angles, args.rate, args.hold, driver, use_actuator=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+조향 제어기 스텝 응답 벤치마크 (시뮬레이션 하드웨어)
+
+직진(30도) -> 좌회전 구간 -> 직진 -> 우회전 구간 으로 바뀌는 도로를 가정하고,
+잡음이 섞인 3클래스 확률을 추론 주기마다 만들어 두 조향 방식을 비교합니다.
+- 계단: 기존 autonomous_driving 방식 (argmax 로 ±15도, 직진이면 30도로 바로 복귀)
+- 제어기: vehicle.controller (확률 가중 목표 각도 + 저역통과 + PID + 각속도 제한)
+서보는 SimulatedPca9685 위의 PcaServo 로 구동하고 쓰기 횟수는 EventLog 로 셉니다.
+시간은 시뮬레이션 시간이라 실행 결과가 항상 같습니다.
+
+출력 (구간별)
+- 수렴 주기: 목표 ±tol 도 안에 들어와 계속 머무르기 시작한 제어 주기 수
+- 수렴 추론: 그때까지 사용한 추론(판단) 횟수
+- 넘침: 목표를 지나친 최대 각도
+공통: 전체 추종 오차(RMSE), 조향 방향 반전 횟수, 서보 쓰기 횟수
+
+사용법: python benchmarks/bench_controller.py [--control-hz 30] [--infer-hz 10] [--noise 0.15]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.controller import CLASS_ANGLES, SteeringController, decision_to_angle
+from vehicle.hw import KIND_PULSE, PcaServo, SimulatedPca9685
+
+# (구간 길이 초, 실제 필요한 조향 각도)
+ROAD = [(1.0, 30), (2.0, 8), (1.5, 30), (2.0, 52), (1.5, 30)]
+
+
+def class_probabilities(true_angle, rng, noise, width=15.0):
+    """실제 각도와 가까운 클래스일수록 확률이 높은 잡음 섞인 분류 결과"""
+    logits = [-((a - true_angle) / width) ** 2 + rng.gauss(0, noise * 3) for a in CLASS_ANGLES]
+    m = max(logits)
+    exps = [math.exp(x - m) for x in logits]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class StepSteering:
+    """기존 ±15도 계단 방식"""
+
+    def __init__(self, increment=15):
+        self.increment = increment
+        self.angle = 30
+
+    def on_decision(self, probabilities):
+        direction = max(range(3), key=lambda i: probabilities[i])
+        if direction == 0:
+            self.angle = max(0, self.angle - self.increment)
+        elif direction == 1:
+            self.angle = 30
+        else:
+            self.angle = min(60, self.angle + self.increment)
+
+    def step(self, dt):
+        return self.angle
+
+
+class ControllerSteering:
+    def __init__(self):
+        self.controller = SteeringController()
+        self.target = 30
+
+    def on_decision(self, probabilities):
+        self.target = decision_to_angle(probabilities)
+
+    def step(self, dt):
+        return self.controller.update(self.target, dt)
+
+
+def simulate(name, steering, control_hz, infer_hz, noise, tol, seed=0):
+    rng = random.Random(seed)
+    pca = SimulatedPca9685()
+    servo = PcaServo(pca, channel=0)
+    dt = 1.0 / control_hz
+    infer_every = max(1, round(control_hz / infer_hz))
+
+    tick = 0
+    decisions = 0
+    sq_error = 0.0
+    reversals = 0
+    last_delta = 0
+    angle = 30
+    segments = []
+    for duration, true_angle in ROAD:
+        ticks = int(duration * control_hz)
+        start_angle = angle
+        settled_at = None
+        settled_decisions = None
+        overshoot = 0.0
+        for i in range(ticks):
+            if tick % infer_every == 0:
+                steering.on_decision(class_probabilities(true_angle, rng, noise))
+                decisions += 1
+            new_angle = steering.step(dt)
+            delta = new_angle - angle
+            if delta and last_delta and (delta > 0) != (last_delta > 0):
+                reversals += 1
+            if delta:
+                last_delta = delta
+            angle = new_angle
+            if angle != servo.angle:
+                servo.set_angle(angle)
+
+            error = angle - true_angle
+            sq_error += error * error
+            if abs(error) <= tol:
+                if settled_at is None:
+                    settled_at, settled_decisions = i + 1, decisions
+            else:
+                settled_at = settled_decisions = None
+            if start_angle != true_angle:
+                direction = 1 if true_angle > start_angle else -1
+                overshoot = max(overshoot, (angle - true_angle) * direction)
+            tick += 1
+        segment_start_decisions = decisions - math.ceil(ticks / infer_every)
+        segments.append((true_angle, settled_at,
+                         None if settled_decisions is None else settled_decisions - segment_start_decisions,
+                         overshoot))
+
+    writes = sum(1 for _, pin, kind, _ in pca.log if kind == KIND_PULSE and pin == 0)
+    rmse = math.sqrt(sq_error / tick)
+    print(f"[{name}] RMSE {rmse:.1f}도, 방향 반전 {reversals}회, 서보 쓰기 {writes}회, 추론 {decisions}회")
+    for true_angle, settled_at, settled_decisions, overshoot in segments:
+        if settled_at is None:
+            result = "수렴 못함"
+        else:
+            result = f"수렴 {settled_at:3d}주기 / 추론 {settled_decisions:2d}회"
+        print(f"    목표 {true_angle:2d}도: {result}, 넘침 {overshoot:.1f}도")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조향 제어기 스텝 응답 벤치마크 (시뮬레이션)")
+    parser.add_argument("--control-hz", type=float, default=30, help="제어 루프 주기 (Hz)")
+    parser.add_argument("--infer-hz", type=float, default=10, help="추론(판단) 주기 (Hz)")
+    parser.add_argument("--noise", type=float, default=0.15, help="분류 확률 잡음 크기")
+    parser.add_argument("--tol", type=float, default=6, help="수렴 판정 허용 오차 (도)")
+    args = parser.parse_args()
+
+    for name, steering in (("계단", StepSteering()), ("제어기", ControllerSteering())):
+        simulate(name, steering, args.control_hz, args.infer_hz, args.noise, args.tol)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+JPEG 디코딩 벤치마크
+
+원본 크기 디코딩 + resize 와 JpegDecoder 의 축소 디코딩 + resize 를 비교합니다.
+이미지를 주지 않으면 노이즈 이미지를 JPEG 로 인코딩해서 사용합니다.
+
+사용법: python benchmarks/bench_jpeg_decode.py [image.jpg] [--width 1280 --height 720] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.jpeg_decode import JpegDecoder
+
+TARGET_SIZE = (64, 64)
+
+
+def time_per_frame(func, jpg, repeat):
+    func(jpg)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(jpg)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JPEG 디코딩 벤치마크")
+    parser.add_argument("path", nargs="?", help="테스트할 JPEG 파일")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.path:
+        with open(args.path, "rb") as f:
+            jpg = f.read()
+    else:
+        image = np.random.randint(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+        image = cv2.GaussianBlur(image, (9, 9), 0)
+        jpg = cv2.imencode(".jpg", image)[1].tobytes()
+
+    def full_decode(data):
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return cv2.resize(frame, TARGET_SIZE)
+
+    reduced = JpegDecoder(target_size=TARGET_SIZE)
+    reduced_roi = JpegDecoder(target_size=TARGET_SIZE, roi=(0.3, 1.0))
+    reduced_gray = JpegDecoder(target_size=TARGET_SIZE, grayscale=True, roi=(0.3, 1.0))
+
+    cases = [
+        ("full + resize", full_decode),
+        (f"reduced 1/{reduced.scale_for(jpg)} + resize", lambda d: cv2.resize(reduced(d), TARGET_SIZE)),
+        ("reduced + roi + resize", lambda d: cv2.resize(reduced_roi(d), TARGET_SIZE)),
+        ("reduced gray + roi + resize", lambda d: cv2.resize(reduced_gray(d), TARGET_SIZE)),
+    ]
+    baseline = None
+    for name, func in cases:
+        t = time_per_frame(func, jpg, args.repeat)
+        baseline = baseline or t
+        print(f"{name:>30}: {t * 1e3:.2f} ms/frame ({baseline / t:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+학습 데이터 로더 벤치마크 (최대 메모리 RSS, images/sec)
+
+로더마다 새 프로세스에서 한 에포크 분량을 읽고 ru_maxrss 로 최대 메모리를 잽니다.
+- legacy: 기존 load_processed_data (imread 3채널 -> resize -> /255 float64 -> np.array)
+- arrays: 미리 할당한 float32 (N, 64, 64, 1) 배열에 Preprocessor.normalize 로 기록 (스트리밍 전)
+- stream: vehicle.dataset.make_dataset (병렬 디코딩, uint8 유지, 배치 단위 float32 정규화, prefetch)
+세 경우 모두 학습 스크립트처럼 tensorflow 를 먼저 import 한 뒤 기준 RSS 를 잽니다.
+경로를 주지 않으면 차선 모양 이진 영상 (640x336 PNG) 을 임시 폴더에 만들어 씁니다.
+
+사용법: python benchmarks/bench_loader.py [data_path] [--count 3000] [--modes legacy arrays stream]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMAGE_SIZE = (64, 64)
+MODES = ("legacy", "arrays", "stream")
+
+
+def make_dataset_dir(path, count, seed=0):
+    """클래스 폴더 3개에 차선 모양 이진 영상 count 장"""
+    rng = np.random.default_rng(seed)
+    width, height = 640, 336
+    for n in range(count):
+        cls = ("left", "straight", "right")[n % 3]
+        os.makedirs(os.path.join(path, cls), exist_ok=True)
+        img = np.zeros((height, width), dtype=np.uint8)
+        shift = (n % 3 - 1) * width // 6
+        for x in (width // 4, width * 3 // 4):
+            x += int(rng.integers(-20, 20))
+            cv2.line(img, (x, height), (x + shift, 0), 255, 6)
+        noise = rng.random((height, width)) < 0.02
+        img[noise] = 255
+        cv2.imwrite(os.path.join(path, cls, f"processed_{n:06d}.png"), img)
+
+
+def rss_mb():
+    """현재까지의 최대 RSS (MB, Linux 의 ru_maxrss 는 KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_legacy(data_path):
+    X, y = [], []
+    for idx, cls in enumerate(("left", "straight", "right")):
+        cls_path = os.path.join(data_path, cls)
+        for img_name in os.listdir(cls_path):
+            img = cv2.imread(os.path.join(cls_path, img_name))
+            img = cv2.resize(img, IMAGE_SIZE)
+            X.append(img / 255.0)
+            y.append(idx)
+    return len(np.array(X)), np.array(y)
+
+
+def load_arrays(data_path):
+    from vehicle.dataset import list_samples
+    from vehicle.preprocess import Preprocessor
+
+    samples = list_samples(data_path)
+    pre = Preprocessor(output_size=IMAGE_SIZE)
+    X = np.empty((len(samples), IMAGE_SIZE[1], IMAGE_SIZE[0], 1), dtype=np.float32)
+    for i, path in enumerate(samples.paths):
+        pre.normalize(cv2.imread(path, cv2.IMREAD_GRAYSCALE), X[i])
+    return len(X), samples.labels
+
+
+def load_stream(data_path):
+    from vehicle.dataset import list_samples, make_dataset, stratified_split
+
+    samples = list_samples(data_path)
+    train_idx, _ = stratified_split(samples.labels, val_fraction=0.0)
+    total = 0
+    for images, _ in make_dataset(samples, train_idx, IMAGE_SIZE, batch_size=32, shuffle=True, seed=0):
+        total += int(images.shape[0])
+    return total, samples.labels
+
+
+def run_mode(mode, data_path):
+    """한 로더 실행 (자식 프로세스 안에서) -> 결과 dict"""
+    try:
+        import tensorflow  # noqa: F401  학습 스크립트와 같은 기준 메모리
+    except ImportError:
+        if mode == "stream":
+            return {"mode": mode, "skipped": "tensorflow 가 없습니다"}
+    baseline = rss_mb()
+    start = time.perf_counter()
+    count, _ = {"legacy": load_legacy, "arrays": load_arrays, "stream": load_stream}[mode](data_path)
+    elapsed = time.perf_counter() - start
+    peak = rss_mb()
+    return {"mode": mode, "images": count, "images_per_sec": count / elapsed,
+            "baseline_rss_mb": baseline, "peak_rss_mb": peak, "loader_rss_mb": peak - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="학습 데이터 로더 벤치마크")
+    parser.add_argument("path", nargs="?", help="클래스 폴더가 있는 데이터 경로")
+    parser.add_argument("--count", type=int, default=3000, help="합성 이미지 수 (경로를 주지 않을 때)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = args.path
+        if data_path is None:
+            data_path = tmp
+            make_dataset_dir(data_path, args.count)
+        print(f"데이터: {data_path}")
+        for mode in args.modes:
+            # 최대 RSS 는 프로세스 단위라 로더마다 새 프로세스에서 측정
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), data_path, "--child", mode],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            if "skipped" in r:
+                print(f"{mode:>7}: 건너뜀 ({r['skipped']})")
+                continue
+            print(f"{mode:>7}: {r['images']} 장, {r['images_per_sec']:8.1f} images/sec, "
+                  f"최대 RSS {r['peak_rss_mb']:7.1f} MB (로더 +{r['loader_rss_mb']:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+MJPEG 프레임 분리 벤치마크
+
+녹화된 MJPEG 바이트 스트림(libcamera-vid ... -o capture.mjpeg)을 최대 속도로 흘려 보내며
+기존 방식(buffer += read(4096); find)과 MjpegSplitter 의 처리 속도를 비교합니다.
+파일을 주지 않으면 지정한 크기의 가짜 JPEG 프레임으로 스트림을 만들어 사용합니다.
+
+사용법: python benchmarks/bench_mjpeg.py [capture.mjpeg] [--frame-kb 200] [--frames 300]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.mjpeg import MjpegSplitter
+
+
+def make_fake_stream(frame_kb, frames):
+    """SOI/EOI 마커만 맞춘 가짜 MJPEG 스트림 생성"""
+    body = bytes(range(256)).replace(b'\xff', b'\x00') * (frame_kb * 1024 // 256)
+    frame = b'\xff\xd8' + body + b'\xff\xd9'
+    return frame * frames
+
+
+def legacy_split(stream):
+    """기존 스크립트들의 분리 방식 -> (프레임 수, 프레임 바이트 합)"""
+    count = 0
+    nbytes = 0
+    buffer = b""
+    while True:
+        chunk = stream.read(4096)
+        if not chunk:
+            break
+        buffer += chunk
+        a = buffer.find(b'\xff\xd8')
+        b = buffer.find(b'\xff\xd9')
+        if a != -1 and b != -1:
+            jpg = buffer[a:b+2]
+            buffer = buffer[b+2:]
+            count += 1
+            nbytes += len(jpg)  # 실제 루프처럼 잘라낸 프레임을 사용
+    return count, nbytes
+
+
+def splitter_split(stream):
+    count = 0
+    nbytes = 0
+    for jpg in MjpegSplitter(stream):
+        count += 1
+        nbytes += len(jpg)
+    return count, nbytes
+
+
+def run(name, func, data):
+    stream = io.BufferedReader(io.BytesIO(data))
+    start = time.perf_counter()
+    count, nbytes = func(stream)
+    elapsed = time.perf_counter() - start
+    mb = len(data) / (1024 * 1024)
+    print(f"{name:>10}: 프레임 {count}개 ({nbytes / (1024 * 1024):.1f} MB), {elapsed:.3f}초, "
+          f"{count / elapsed:.1f} fps, {mb / elapsed:.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MJPEG 프레임 분리 벤치마크")
+    parser.add_argument("path", nargs="?", help="녹화된 MJPEG 파일 경로")
+    parser.add_argument("--frame-kb", type=int, default=200, help="가짜 프레임 크기 (KB)")
+    parser.add_argument("--frames", type=int, default=300, help="가짜 프레임 수")
+    args = parser.parse_args()
+
+    if args.path:
+        with open(args.path, "rb") as f:
+            data = f.read()
+    else:
+        data = make_fake_stream(args.frame_kb, args.frames)
+    print(f"스트림 크기: {len(data) / (1024 * 1024):.1f} MB")
+
+    run("legacy", legacy_split, data)
+    run("splitter", splitter_split, data)
+
+
+if __name__ == "__main__":
+    main()
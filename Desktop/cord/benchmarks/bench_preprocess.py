@@ -0,0 +1,106 @@
+"""
+전처리 커널 마이크로 벤치마크
+
+기존 방식과 vehicle.preprocess.Preprocessor 의 프레임당 처리 시간(µs)을 비교합니다.
+- 주행 기존: BGR 프레임을 64x64 로 resize -> /255 (학습 입력과 다름)
+- 학습 기존: 원본 크기에서 자르기/그레이/블러/균등화/adaptiveThreshold -> resize -> /255 (float64)
+- 커널 BGR: 같은 과정을 작업 폭 160 에서, 결과는 미리 할당한 float32 버퍼에 기록
+- 커널 그레이 ROI: libcamera 경로 (JPEG 을 1/4 그레이스케일 + ROI 로 디코딩한 프레임)
+이미지를 주지 않으면 차선 모양을 그린 노이즈 이미지를 사용합니다.
+
+사용법: python benchmarks/bench_preprocess.py [image.jpg] [--width 640 --height 480] [--repeat 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.preprocess import Preprocessor
+
+TARGET_SIZE = (64, 64)
+
+
+def make_frame(width, height, seed=0):
+    """회색 노이즈 바닥 위에 어두운 차선 두 줄"""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 170, dtype=np.uint8)
+    frame += rng.integers(0, 40, frame.shape, dtype=np.uint8)
+    for x in (width // 4, width * 3 // 4):
+        cv2.line(frame, (x, height), (x + width // 8, height // 3), (30, 30, 30), max(2, width // 40))
+    return frame
+
+
+def time_per_frame(func, repeat):
+    """프레임당 시간 (초) 목록"""
+    func()  # 워밍업 (버퍼 할당)
+    times = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times[i] = time.perf_counter() - start
+    return times
+
+
+def legacy_training(frame):
+    """preprocess_images_by_range_1.py (기존) + load_processed_data (기존)"""
+    h = frame.shape[0]
+    roi = frame[int(h * 0.3):, :]
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    equalized = cv2.equalizeHist(blurred)
+    binary = cv2.adaptiveThreshold(equalized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+    binary = cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)  # imread 로 다시 읽으면 3채널
+    return cv2.resize(binary, TARGET_SIZE) / 255.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 커널 벤치마크")
+    parser.add_argument("path", nargs="?", help="테스트할 이미지 파일")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.path:
+        frame = cv2.imread(args.path)
+        if frame is None:
+            raise SystemExit(f"이미지를 읽을 수 없습니다: {args.path}")
+    else:
+        frame = make_frame(args.width, args.height)
+
+    pre = Preprocessor(output_size=TARGET_SIZE)
+    pre_threshold = Preprocessor(output_size=TARGET_SIZE, method="threshold")
+    out = np.empty((TARGET_SIZE[1], TARGET_SIZE[0], 3), dtype=np.float32)
+    legacy_out = np.empty_like(out)
+
+    # libcamera 경로: 1/4 축소 그레이스케일 디코딩 + ROI (JpegDecoder 와 같은 결과)
+    quarter = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (frame.shape[1] // 4, frame.shape[0] // 4),
+                         interpolation=cv2.INTER_AREA)
+    gray_roi = quarter[int(quarter.shape[0] * pre.crop_top):]
+
+    def legacy_driving():
+        small = cv2.resize(frame, TARGET_SIZE)
+        np.multiply(small, 1.0 / 255.0, out=legacy_out, casting='unsafe')
+
+    cases = [
+        ("주행 기존 (resize + /255)", legacy_driving),
+        ("학습 기존 (원본 크기 이진화)", lambda: legacy_training(frame)),
+        ("커널 BGR adaptive", lambda: pre(frame, out)),
+        ("커널 BGR threshold", lambda: pre_threshold(frame, out)),
+        ("커널 그레이 ROI adaptive", lambda: pre(gray_roi, out, cropped=True)),
+        ("커널 그레이 ROI threshold", lambda: pre_threshold(gray_roi, out, cropped=True)),
+    ]
+    print(f"입력 {frame.shape[1]}x{frame.shape[0]}, 출력 {TARGET_SIZE[0]}x{TARGET_SIZE[1]}x3 float32, "
+          f"반복 {args.repeat}")
+    for name, func in cases:
+        times = time_per_frame(func, args.repeat) * 1e6
+        print(f"{name:>24}: 평균 {times.mean():8.1f} µs, p50 {np.percentile(times, 50):8.1f} µs, "
+              f"p95 {np.percentile(times, 95):8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import RPi.GPIO as GPIO
 import time
 from pynput import keyboard
 import cv2
@@ -8,24 +7,28 @@ import shlex
 import datetime
 import os
 import threading
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.mjpeg import MjpegSplitter
+from vehicle.jpeg_decode import jpeg_size
+from vehicle.hw import open_gpio, open_steering, DCMotor
+from vehicle.image_writer import ImageWriter
+from vehicle.recording import RecordingWriter
 
 # === GPIO 설정 ===
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 IN1 = 17        # DC 모터 IN1 핀 번호
 IN2 = 27        # DC 모터 IN2 핀 번호
 ENA = 18        # DC 모터 ENA 핀 번호
 
-GPIO.setmode(GPIO.BCM)  # BCM 핀 번호 사용
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
-
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 서보모터: 50Hz PWM
-dc_motor_pwm = GPIO.PWM(ENA, 100)   # DC 모터: 100Hz PWM
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-servo_pwm.start(0)
-dc_motor_pwm.start(0)
+gpio = open_gpio()  # BCM 핀 번호 사용 (AL_CAR_SIMULATE_HW=1 이면 시뮬레이션)
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)  # DC 모터: 100Hz PWM
 
 current_angle = 30  # 서보모터 초기 각도
 current_speed = 0   # DC 모터 초기 속도
@@ -46,20 +49,31 @@ for i in range(len(ANGLE_RANGES)):
     folder_path = os.path.join(base_save_path, f"range_{i}")
     os.makedirs(folder_path, exist_ok=True)
 
+# 이미지 저장: 캡처 스레드가 SD 카드 쓰기를 기다리지 않도록 별도 스레드 풀에서 저장
+WRITER_POLICY = "drop_oldest"  # 큐가 가득 차면 "drop_oldest" (오래된 요청 버림) 또는 "block" (자리 날 때까지 대기)
+writer = ImageWriter(workers=2, queue_size=16, policy=WRITER_POLICY).start()
+
+# 저장 방식: True 이면 카메라가 보낸 JPEG 바이트를 그대로 저장 (디코딩/재인코딩 없음, 화질 손실 없음)
+PASS_THROUGH = True
+# 미리보기 창: False 이면 (PASS_THROUGH 일 때) 프레임을 전혀 디코딩하지 않음. 종료는 Ctrl+C / ESC
+PREVIEW = True
+
+# 저장 형식: "files" (범위 폴더에 JPEG 파일 하나씩) 또는 "shards" (녹화 샤드 파일에 촬영 시각/각도/속도/라벨과 함께 기록)
+RECORD_FORMAT = "files"
+recorder = None
+if RECORD_FORMAT == "shards":
+    recorder = RecordingWriter(os.path.join(base_save_path, "recordings"),
+                               labels=[f"range_{i}" for i in range(len(ANGLE_RANGES))])
+
 def set_servo_angle(angle):
-    duty = 2 + (angle / 18)
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.1)
-    servo_pwm.ChangeDutyCycle(0)
+    servo.set_angle(angle)
 
 def motor_forward():
     global current_speed
     if current_speed < MAX_SPEED:
         current_speed += SPEED_INCREMENT
     current_speed = min(current_speed, MAX_SPEED)
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(current_speed)
+    dc_motor.forward(current_speed)
     print(f"전진: 속도 {current_speed}%")
 
 def motor_slow_down():
@@ -70,17 +84,13 @@ def motor_slow_down():
     if current_speed == 0:
         motor_stop()
     else:
-        GPIO.output(IN1, GPIO.HIGH)
-        GPIO.output(IN2, GPIO.LOW)
-        dc_motor_pwm.ChangeDutyCycle(current_speed)
+        dc_motor.forward(current_speed)
         print(f"속도 감소: 속도 {current_speed}%")
 
 def motor_stop():
     global current_speed
     current_speed = 0
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(0)
+    dc_motor.stop()
     print("모터 정지")
 
 set_servo_angle(current_angle)
@@ -119,44 +129,51 @@ def on_release(key):
 # === 카메라 설정 ===
 cmd = 'libcamera-vid --inline --nopreview -t 0 --codec mjpeg --width 640 --height 480 --framerate 15 -o - --camera 0'
 process = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+splitter = MjpegSplitter(process.stdout)
 
 capture_interval = 1  # 캡처 간격 (3초)
 last_capture_time = time.time()
 
 def capture_images():
     global last_capture_time
-    buffer = b""
     while len(captured_ranges) < len(ANGLE_RANGES):
         current_time = time.time()
         if current_time - last_capture_time >= capture_interval:
-            buffer += process.stdout.read(4096)
-            a = buffer.find(b'\xff\xd8')
-            b = buffer.find(b'\xff\xd9')
-            if a != -1 and b != -1:
-                jpg = buffer[a:b+2]
-                buffer = buffer[b+2:]
+            jpg = splitter.read()
+            if jpg is None:
+                break
+            # 깨진 프레임은 헤더만 보고 걸러냄 (디코딩 없음)
+            if jpeg_size(jpg) is None:
+                continue
+            # 픽셀이 필요할 때(미리보기, 재인코딩 저장)만 디코딩
+            bgr_frame = None
+            if PREVIEW or not PASS_THROUGH:
                 bgr_frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
-                if bgr_frame is not None:
-                    # 실시간 영상 표시
-                    cv2.imshow("Camera View", bgr_frame)
-
-                    # 캡처 조건: 각도가 특정 범위에 속하고 해당 범위가 캡처되지 않은 경우
-                    angle_range = get_angle_range(current_angle)
-                    if angle_range != -1:
-                        range_folder = os.path.join(base_save_path, f"range_{angle_range}")
-                        now = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
-                        filename = os.path.join(range_folder, f"{now}.jpg")
-                        try:
-                            if cv2.imwrite(filename, bgr_frame):
-                                print(f"이미지 저장 성공: {filename}")
-                                captured_ranges.add(angle_range)  # 저장된 범위 추가
-                                last_capture_time = current_time  # 마지막 캡처 시간 업데이트
-                            else:
-                                print(f"이미지 저장 실패: {filename}")
-                        except Exception as e:
-                            print(f"이미지 저장 중 에러 발생: {e}")
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
+                if bgr_frame is None:
+                    continue
+            if PREVIEW:
+                # 실시간 영상 표시
+                cv2.imshow("Camera View", bgr_frame)
+
+            # 캡처 조건: 각도가 특정 범위에 속하고 해당 범위가 캡처되지 않은 경우
+            angle_range = get_angle_range(current_angle)
+            if angle_range != -1:
+                if recorder is not None:
+                    # 샤드에 이어서 기록 (원본 바이트 복사뿐이라 캡처 스레드에서 바로 호출)
+                    recorder.append(jpg if PASS_THROUGH else bgr_frame, angle=current_angle,
+                                    speed=current_speed, label=angle_range)
+                else:
+                    range_folder = os.path.join(base_save_path, f"range_{angle_range}")
+                    now = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
+                    filename = os.path.join(range_folder, f"{now}.jpg")
+                    if PASS_THROUGH:
+                        writer.submit_encoded(filename, jpg)  # 카메라 JPEG 원본 그대로 저장
+                    else:
+                        writer.submit(filename, bgr_frame)
+                captured_ranges.add(angle_range)  # 저장된 범위 추가
+                last_capture_time = current_time  # 마지막 캡처 시간 업데이트
+            if PREVIEW and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
 # === 프로그램 실행 ===
 try:
@@ -169,7 +186,12 @@ except KeyboardInterrupt:
 finally:
     process.terminate()
     cv2.destroyAllWindows()
-    servo_pwm.stop()
-    dc_motor_pwm.stop()
-    GPIO.cleanup()
+    writer.close()  # 남은 이미지 저장
+    writer.report()
+    if recorder is not None:
+        recorder.close()  # 샤드 인덱스 기록
+        recorder.report()
+    servo.close()
+    dc_motor.close()
+    gpio.cleanup()
     print("프로그램 종료")
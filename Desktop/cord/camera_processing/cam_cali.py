@@ -1,54 +1,76 @@
 import numpy as np
 import cv2
 import glob
+import os
+import sys
+import time
 
-# 코너 찾기 알고리즘의 종료 기준 설정
-criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.calibration import Calibration, DEFAULT_CALIBRATION_PATH, hash_source_images, save_calibration
+from vehicle.chessboard import DEFAULT_CORNER_CACHE_DIR, detect_all
 
-# 실제 체스보드의 3D 점 설정 (크기: 8x6)
-objectpoints = np.zeros((8*6, 3), np.float32)
-objectpoints[:, :2] = np.mgrid[0:8, 0:6].T.reshape(-1, 2)
-
-# 3D 및 2D 점 리스트 초기화
-worldpoints = []  # 실제 3D 공간에서의 점들
-imagepoints = []  # 이미지 상의 2D 점들
+# 체스보드 크기 (내부 코너 개수)
+PATTERN = (8, 6)
 
 # 이미지 파일 경로 설정
-images = glob.glob('/home/jungmin/Desktop/cord/date/image/*.jpg')
+image_glob = '/home/jungmin/Desktop/cord/date/image/*.jpg'
+
+# 캘리브레이션 결과 저장 경로 (스트리밍/주행/전처리 코드가 이 파일을 읽음)
+calibration_path = DEFAULT_CALIBRATION_PATH
+
+# 이미지별 코너 검출 결과 캐시 경로 (새로 추가되거나 바뀐 이미지만 다시 처리)
+corner_cache_dir = DEFAULT_CORNER_CACHE_DIR
 
-# 이미지에서 체스보드 코너 찾기
-gray = None  # 캘리브레이션 단계에서 사용할 `gray` 초기화
-for idx, fname in enumerate(images):
-    print("Processing image", idx + 1, ":", fname)
-    img = cv2.imread(fname)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def main():
+    # 실제 체스보드의 3D 점 설정 (크기: 8x6)
+    objectpoints = np.zeros((PATTERN[0] * PATTERN[1], 3), np.float32)
+    objectpoints[:, :2] = np.mgrid[0:PATTERN[0], 0:PATTERN[1]].T.reshape(-1, 2)
 
-    # 체스보드 코너 찾기
-    ret, corners = cv2.findChessboardCorners(gray, (8, 6), None)
+    images = sorted(glob.glob(image_glob))
+    print(f"이미지 {len(images)}장에서 체스보드 코너를 찾습니다.")
 
-    if ret:
-        print("체스보드 코너를 찾았습니다:", fname)
-        worldpoints.append(objectpoints)
+    counts = {"cached": 0, "detected": 0}
 
-        # 코너 점을 더 정확하게 찾기
-        corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
-        imagepoints.append(corners2)
+    def report(result, cached):
+        counts["cached" if cached else "detected"] += 1
+        if not result.found:
+            print("체스보드 코너를 찾지 못했습니다:", result.path)
 
-        # 이미지에 체스보드 코너 그리기
-        img = cv2.drawChessboardCorners(img, (8, 6), corners2, ret)
-    else:
-        print("체스보드 코너를 찾지 못했습니다:", fname)
+    # 이미지에서 체스보드 코너 찾기 (프로세스 풀 병렬 처리 + 캐시)
+    start = time.time()
+    results = detect_all(images, PATTERN, cache_dir=corner_cache_dir, progress=report)
+    print(f"코너 검출 완료: {time.time() - start:.1f}초 "
+          f"(새로 처리 {counts['detected']}장, 캐시 사용 {counts['cached']}장)")
 
-# 이미지가 성공적으로 처리된 경우에만 캘리브레이션 수행
-if gray is not None and worldpoints and imagepoints:
-    ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(worldpoints, imagepoints, gray.shape[::-1], None, None)
+    found = [r for r in results if r.found]
+    sizes = {r.image_size for r in found}
+    if len(sizes) > 1:
+        print(f"이미지 해상도가 서로 다릅니다: {sizes}")
+        return
+
+    # 이미지가 성공적으로 처리된 경우에만 캘리브레이션 수행
+    if not found:
+        print("체스보드 코너를 찾은 이미지가 충분하지 않아 캘리브레이션을 수행할 수 없습니다.")
+        return
+
+    worldpoints = [objectpoints] * len(found)  # 실제 3D 공간에서의 점들
+    imagepoints = [r.corners for r in found]   # 이미지 상의 2D 점들
+    image_size = found[0].image_size
+    ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(worldpoints, imagepoints, image_size, None, None)
 
     # 카메라 매트릭스와 왜곡 계수 출력
     print("Camera matrix:")
     print(mtx)
     print("\nDistortion coefficients:")
     print(dist)
-else:
-    print("체스보드 코너를 찾은 이미지가 충분하지 않아 캘리브레이션을 수행할 수 없습니다.")
+    print(f"\nRMS 재투영 오차: {ret:.4f} (이미지 {len(found)}장)")
+
+    # 캘리브레이션 결과와 remap 테이블을 파일로 저장
+    calibration = Calibration(mtx, dist, image_size, ret,
+                              source_hash=hash_source_images(digests=[r.sha1 for r in found]),
+                              num_images=len(found))
+    save_calibration(calibration_path, calibration)
+    print(f"캘리브레이션 결과 저장: {calibration_path}")
 
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,34 @@ import subprocess
 import shlex
 import datetime
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.mjpeg import MjpegSplitter
+from vehicle.jpeg_decode import jpeg_size
+from vehicle.image_writer import ImageWriter
 
 # 카메라 스트리밍 명령어 설정
 cmd = 'libcamera-vid --inline --nopreview -t 0 --codec mjpeg --width 640 --height 480 --framerate 30 -o - --camera 0'
 
 # 명령어 실행
 process = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+splitter = MjpegSplitter(process.stdout)
 
 # 캡처 간격 및 시간 초기화
 capture_interval = 3
 last_capture_time = time.time()
 
+# 저장 방식: True 이면 카메라가 보낸 JPEG 바이트를 그대로 저장 (디코딩/재인코딩 없음, 화질 손실 없음)
+PASS_THROUGH = True
+# 미리보기 창: False 이면 (PASS_THROUGH 일 때) 프레임을 전혀 디코딩하지 않음. 종료는 Ctrl+C
+PREVIEW = True
+
 # OpenCV 창 설정
-cv2.namedWindow('frame', cv2.WINDOW_NORMAL)
-cv2.resizeWindow('frame', 640, 360)
+if PREVIEW:
+    cv2.namedWindow('frame', cv2.WINDOW_NORMAL)
+    cv2.resizeWindow('frame', 640, 360)
 
 # 절대 경로 설정
 save_path = "/home/jungmin/Desktop/cord/date/"
@@ -29,48 +43,49 @@ if cv2.imwrite(save_path + "test.jpg", test_image):
 else:
     print("테스트 이미지 저장 실패")
 
+writer = ImageWriter(workers=1, queue_size=8, policy="drop_oldest").start()
+
 try:
-    buffer = b""
     while True:
+        # 스트림에서 JPEG 프레임 하나 꺼내기
+        jpg = splitter.read()
+        if jpg is None:
+            print("카메라 스트림이 종료되었습니다.")
+            break
         current_time = time.time()
 
-        # 버퍼에 데이터 추가
-        buffer += process.stdout.read(4096)
-        a = buffer.find(b'\xff\xd8')
-        b = buffer.find(b'\xff\xd9')
-
-        # JPEG 이미지가 버퍼에 있으면 디코딩
-        if a != -1 and b != -1:
-            jpg = buffer[a:b+2]
-            buffer = buffer[b+2:]
+        # 깨진 프레임은 헤더만 보고 걸러냄 (디코딩 없음)
+        if jpeg_size(jpg) is None:
+            continue
 
+        # 픽셀이 필요할 때(미리보기, 재인코딩 저장)만 디코딩
+        bgr_frame = None
+        if PREVIEW or not PASS_THROUGH:
             bgr_frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if bgr_frame is None:
+                continue
+
+        # 이미지 표시
+        if PREVIEW:
+            cv2.imshow('frame', bgr_frame)
+
+        # 지정된 간격으로 이미지 저장 (저장 스레드에서 쓰고 결과를 출력)
+        if current_time - last_capture_time >= capture_interval:
+            now = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
+            print("take picture :", now)
+            if PASS_THROUGH:
+                writer.submit_encoded(save_path + now + ".jpg", jpg)  # 카메라 JPEG 원본 그대로 저장
+            else:
+                writer.submit(save_path + now + ".jpg", bgr_frame)
+            last_capture_time = current_time
 
-            # 이미지 표시
-            if bgr_frame is not None:
-                cv2.imshow('frame', bgr_frame)
-
-                # 지정된 간격으로 이미지 저장
-                if current_time - last_capture_time >= capture_interval:
-                    now = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
-                    print("take picture :", now)
-                    
-                    # 예외 처리로 저장 성공 여부 출력
-                    try:
-                        if cv2.imwrite(save_path + now + ".jpg", bgr_frame):
-                            print("이미지 저장 성공:", now)
-                        else:
-                            print("이미지 저장 실패:", now)
-                    except Exception as e:
-                        print("이미지 저장 중 에러 발생:", e)
-                    
-                    last_capture_time = current_time
-
-                # 'q' 키 입력 시 종료
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+        # 'q' 키 입력 시 종료
+        if PREVIEW and cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
 finally:
     process.terminate()
     cv2.destroyAllWindows()
+    writer.close()  # 남은 이미지 저장
+    writer.report()
 
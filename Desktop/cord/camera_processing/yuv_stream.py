@@ -0,0 +1,48 @@
+import cv2
+import subprocess
+import shlex
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.frame_source import stop_process
+from vehicle.yuv import Yuv420Reader
+
+# 해상도 설정
+width, height = 640, 480
+
+# YUV420 원시 스트림 명령어 설정 (JPEG 인코딩/디코딩 없음)
+# 파일로 테스트할 때는 sys.argv[1] 에 원시 YUV 파일 경로를 지정
+if len(sys.argv) > 1:
+    process = None
+    stream = open(sys.argv[1], "rb")
+else:
+    cmd = f'libcamera-vid --nopreview -t 0 --codec yuv420 --width {width} --height {height} --framerate 30 -o - --camera 0'
+    # stderr 는 읽지 않으므로 버리기 (PIPE 로 두면 버퍼가 차서 libcamera-vid 가 멈춤)
+    process = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    stream = process.stdout
+
+reader = Yuv420Reader(stream, width, height)
+
+# 창 설정
+cv2.namedWindow('gray', cv2.WINDOW_NORMAL)
+cv2.namedWindow('binary', cv2.WINDOW_NORMAL)
+
+try:
+    for gray in reader:
+        # Y 평면이 곧 그레이스케일 이미지 -> 상단 30% 자르기, 블러, 이진화
+        roi = gray[int(height * 0.3):, :]
+        blurred = cv2.GaussianBlur(roi, (5, 5), 0)
+        _, binary = cv2.threshold(blurred, 128, 255, cv2.THRESH_BINARY_INV)
+
+        cv2.imshow('gray', gray)
+        cv2.imshow('binary', binary)
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+finally:
+    if process is not None:
+        stop_process(process)
+    else:
+        stream.close()
+    cv2.destroyAllWindows()
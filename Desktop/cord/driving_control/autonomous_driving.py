@@ -1,111 +1,206 @@
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
-import RPi.GPIO as GPIO
-import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.frame_source import VideoCaptureSource, LibcameraSource
+from vehicle.jpeg_decode import JpegDecoder
+from vehicle.preprocess import Preprocessor
+from vehicle.calibration import DEFAULT_CALIBRATION_PATH, load_calibration
+from vehicle.inference import load_backend
+from vehicle.pipeline import Pipeline, StopPipeline
+from vehicle.stats import LatencyStats
+from vehicle.hw import open_gpio, open_steering, DCMotor
+from vehicle.actuator import Actuator
+from vehicle.scheduler import RateScheduler, Watchdog
+from vehicle.controller import SteeringController, decision_to_angle
 
 # === GPIO 설정 ===
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 IN1 = 17        # DC 모터 IN1 핀 번호
 IN2 = 27        # DC 모터 IN2 핀 번호
 ENA = 18        # DC 모터 ENA 핀 번호
 
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)
-dc_motor_pwm = GPIO.PWM(ENA, 100)
-servo_pwm.start(0)
-dc_motor_pwm.start(0)
+SIMULATE_HW = None  # True 이면 실제 핀 대신 SimulatedGpio 사용, None 이면 환경변수 AL_CAR_SIMULATE_HW 로 결정
+
+gpio = open_gpio(simulate=SIMULATE_HW)
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)
+
+# 서보 대기(0.1초)는 구동 스레드에서 처리하고, 명령은 최신 목표만 적용
+actuator = Actuator(servo, dc_motor).start()
 
 # === 서보모터 및 DC 모터 제어 함수 ===
 current_angle = 30  # 초기 서보모터 각도 (직진)
-ANGLE_INCREMENT = 15  # 좌우 회전 각도
 SPEED = 20  # 모터 속도 (20으로 설정)
+MODEL_INPUT_SIZE = (64, 64)  # 모델 입력 크기 (width, height)
+CAMERA_BACKEND = "webcam"  # "webcam" (USB 웹캠) 또는 "libcamera" (Pi 카메라 MJPEG 파이프)
+INFERENCE_BACKEND = "keras_direct"  # "keras_predict", "keras_direct", "keras_traced", "tflite_fp16", "tflite_int8"
+UNDISTORT = False  # True 이면 cam_cali.py 캘리브레이션 결과로 왜곡 보정 (학습 데이터와 같은 설정으로)
+CONTROL_RATE_HZ = 30  # 제어 루프 주기 (판단 -> 구동)
+STALL_TIMEOUT = 0.5   # 이 시간(초) 동안 새 판단이 없으면 모터 정지 (카메라/추론 멈춤 대비)
+
+# 조향 제어기: 클래스 확률 -> 목표 각도 (0~60도, 직진 30도) -> 저역통과 + PID + 각속도 제한
+STEERING_GAINS = dict(kp=12.0, ki=0.0, kd=0.0)  # 오차 1도당 deg/s
+STEERING_SMOOTHING = 0.4    # 목표 각도 저역통과 계수 (1 이면 필터 없음)
+STEERING_MAX_RATE = 300.0   # 최대 조향 각속도 (deg/s)
+STEERING_DEADBAND = 2.0     # 목표와 이 각도 이내면 서보를 움직이지 않음
 
 def set_servo_angle(angle):
-    """서보모터 각도 설정"""
-    duty = 2 + (angle / 18)
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.1)
-    servo_pwm.ChangeDutyCycle(0)
+    """서보모터 목표 각도 설정 (바로 반환)"""
+    actuator.set_angle(angle)
 
 def motor_forward(speed=SPEED):
-    """DC 모터 전진"""
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(speed)
+    """DC 모터 전진 (바로 반환)"""
+    actuator.set_speed(speed)
 
 def motor_stop():
-    """DC 모터 정지"""
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(0)
+    """DC 모터 정지 (바로 반환)"""
+    actuator.set_speed(0)
 
 # === 모델 및 전처리 ===
-model = load_model("/home/pi/AL_CAR/lane_following_model.h5")
-print("모델 로드 완료!")
+model = load_backend(INFERENCE_BACKEND)
+print(f"모델 로드 완료! ({model.name})")
+
+undistort = load_calibration(DEFAULT_CALIBRATION_PATH).undistorter() if UNDISTORT else None
+
+# 전처리 결과 버퍼 (추론 중인 버퍼를 덮어쓰지 않도록 여러 개를 돌려 씀)
+# 채널 수는 모델 입력을 따름: 단일 채널 모델 (64, 64, 1) 이면 이진 영상을 한 번만 기록 (3채널 모델은 복제)
+NUM_INPUT_BUFFERS = 4
+input_buffers = np.zeros((NUM_INPUT_BUFFERS,) + model.input_buffer.shape, dtype=np.float32)
 
-def preprocess_frame(frame):
-    """카메라 프레임을 모델 입력 크기로 전처리"""
-    frame = cv2.resize(frame, (64, 64))
-    frame = frame / 255.0  # 정규화
-    return np.expand_dims(frame, axis=0)
+# 학습 데이터와 같은 전처리 (vehicle/preprocess.py, preprocess_images_by_range_1.py 와 같은 설정)
+# 상단 자르기 -> 그레이 -> 블러 -> 이진화 -> 축소 + 정규화를 입력 버퍼에 바로 기록
+preprocessor = Preprocessor(output_size=MODEL_INPUT_SIZE)
+# libcamera 는 JPEG 디코딩 단계에서 그레이스케일 + ROI 자르기까지 처리 (왜곡 보정 시에는 전체 프레임이 필요)
+DECODE_ROI = CAMERA_BACKEND == "libcamera" and undistort is None
+
+def preprocess_frame(frame, out):
+    """카메라 프레임을 모델 입력 크기로 전처리해서 미리 할당된 out 버퍼에 기록"""
+    if undistort is not None:
+        frame = undistort(frame)
+    preprocessor(frame, out, cropped=DECODE_ROI)
 
 # === 카메라 설정 ===
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("카메라를 열 수 없습니다.")
+# 백그라운드 스레드가 항상 최신 프레임만 보관하므로 오래된 프레임으로 조향하지 않음
+if CAMERA_BACKEND == "libcamera":
+    # 전처리 작업 폭(160)만 필요하므로 JPEG 를 1/2~1/8 크기의 그레이스케일로 바로 디코딩
+    decoder = JpegDecoder(target_size=(preprocessor.work_width, MODEL_INPUT_SIZE[1]), grayscale=True,
+                          roi=(preprocessor.crop_top, 1.0) if DECODE_ROI else None)
+    camera = LibcameraSource(640, 480, 30, decoder=decoder)
+else:
+    camera = VideoCaptureSource(0)
+try:
+    camera.start()
+except RuntimeError as e:
+    print(e)
     exit()
 
-try:
-    while True:
-        ret, frame = cap.read()
-        if not ret:
+# === 파이프라인 스테이지 ===
+# 캡처 -> 전처리 -> 추론 을 각각 별도 스레드에서 실행하고, 추론 결과(판단)는 latest_decision 에 둠
+# 스테이지 사이 큐는 크기 1 에 오래된 항목을 버리므로 느린 스테이지가 앞 스테이지를 막지 않음
+control_latency = LatencyStats()  # 프레임 캡처부터 구동 명령까지 걸린 시간
+preprocess_count = 0
+latest_decision = None  # (frame, 클래스 확률) - 튜플 통째로 바꾸므로 잠금 없이 읽어도 안전
+
+def capture_stage():
+    frame = camera.read(wait_new=True, timeout=1.0)
+    if frame is None:
+        if not camera.running:
             print("프레임을 읽을 수 없습니다.")
-            break
-
-        # 프레임 전처리
-        processed_frame = preprocess_frame(frame)
-
-        # 모델 예측
-        predictions = model.predict(processed_frame)
-        direction = np.argmax(predictions)  # 0: left, 1: straight, 2: right
-
-        # 방향 제어
-        if direction == 0:  # 좌회전
-            current_angle = max(0, current_angle - ANGLE_INCREMENT)
-            set_servo_angle(current_angle)
-            print(f"좌회전: 각도 {current_angle}도")
-            motor_forward()
-
-        elif direction == 1:  # 직진
-            current_angle = 30  # 기본 직진 각도
-            set_servo_angle(current_angle)
-            print(f"직진: 각도 {current_angle}도")
-            motor_forward()
-
-        elif direction == 2:  # 우회전
-            current_angle = min(60, current_angle + ANGLE_INCREMENT)
-            set_servo_angle(current_angle)
-            print(f"우회전: 각도 {current_angle}도")
-            motor_forward()
-
-        # 종료 조건 (q 키를 누르면 정지)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            print("종료 키 입력됨. 프로그램 종료 중...")
-            break
+            raise StopPipeline
+        return None
+    return frame
+
+def preprocess_stage(frame):
+    global preprocess_count
+    batch = input_buffers[preprocess_count % NUM_INPUT_BUFFERS]
+    preprocess_count += 1
+    preprocess_frame(frame.image, batch[0])
+    return frame, batch
+
+def infer_stage(item):
+    global latest_decision
+    frame, batch = item
+    predictions = model.infer(batch)
+    latest_decision = (frame, predictions[0])  # [p_left, p_straight, p_right]
+    watchdog.feed()
+
+# === 제어 루프 ===
+# CONTROL_RATE_HZ 주기로 최신 판단의 목표 각도를 향해 조향 제어기를 한 단계씩 진행 (주기/지터/데드라인 초과 기록)
+# 새 판단이 STALL_TIMEOUT 동안 없으면 watchdog 이 모터를 멈추고, 새 판단이 오면 다시 출발
+controller = SteeringController(**STEERING_GAINS, smoothing=STEERING_SMOOTHING,
+                                max_rate=STEERING_MAX_RATE, deadband=STEERING_DEADBAND,
+                                min_angle=0, max_angle=60, center=30)
+last_decision_seq = -1
+target_angle = 30
+
+def on_stall():
+    print(f"{STALL_TIMEOUT}초 동안 새 판단 없음: 모터 정지")
+    motor_stop()
+
+def control_step():
+    global current_angle, last_decision_seq, target_angle
+    decision = latest_decision
+    if decision is None or watchdog.stalled:
+        return
+    frame, probabilities = decision
+    if frame.seq != last_decision_seq:
+        # 새 판단: 목표 각도 갱신 후 모터 전진
+        last_decision_seq = frame.seq
+        target_angle = decision_to_angle(probabilities)
+        motor_forward()
+        control_latency.add(camera.age(frame))
+
+    angle = controller.update(target_angle, scheduler.period)
+    if angle != current_angle:
+        current_angle = angle
+        set_servo_angle(current_angle)
+        print(f"조향: 목표 {target_angle:.1f}도, 각도 {current_angle}도")
+
+watchdog = Watchdog(STALL_TIMEOUT, on_stall)
+scheduler = RateScheduler(CONTROL_RATE_HZ)
+
+pipeline = Pipeline(queue_size=1)
+pipeline.add_stage("capture", capture_stage)
+pipeline.add_stage("preprocess", preprocess_stage)
+pipeline.add_stage("infer", infer_stage)
+
+try:
+    pipeline.start()
+    watchdog.start()
+    print(f"자율주행 시작 ({CONTROL_RATE_HZ}Hz 제어, Ctrl+C 로 종료)")
+    # 종료 조건: 카메라 종료 또는 스테이지 에러 시 파이프라인이 멈춤
+    scheduler.run(control_step, should_stop=lambda: not pipeline.running)
+
+except KeyboardInterrupt:
+    print("종료 키 입력됨. 프로그램 종료 중...")
 
 finally:
     # 리소스 정리
     print("모터 정지 및 GPIO 정리...")
-    motor_stop()
-    cap.release()
+    watchdog.stop()
+    pipeline.stop()
+    actuator.stop()
+    dc_motor.stop()
+    camera.stop()
+    print("스테이지별 처리시간:")
+    pipeline.report()
+    print("제어 루프:")
+    scheduler.report()
+    print(f"캡처-구동 지연시간: {control_latency.summary()}, 정지(watchdog) {watchdog.stalls}회")
+    stats = camera.stats()
+    print(f"카메라 통계: 캡처 {stats['grabbed']}, 사용 {stats['consumed']}, 버림 {stats['dropped']}")
+    stats = actuator.stats()
+    print(f"구동 통계: 명령 {stats['commands']}, 적용 {stats['applied']}, "
+          f"대체됨 {stats['dropped']}, 변화 없음 {stats['skipped']}")
     cv2.destroyAllWindows()
-    servo_pwm.stop()
-    dc_motor_pwm.stop()
-    GPIO.cleanup()
+    servo.close()
+    dc_motor.close()
+    gpio.cleanup()
     print("프로그램 종료")
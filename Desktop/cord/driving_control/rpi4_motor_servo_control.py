@@ -1,27 +1,23 @@
-import RPi.GPIO as GPIO
-import time
+import os
+import sys
 from pynput import keyboard
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.hw import open_gpio, open_steering, DCMotor
+
 # GPIO 핀 설정
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 IN1 = 17        # DC 모터 IN1 핀 번호
 IN2 = 27        # DC 모터 IN2 핀 번호
 ENA = 18        # DC 모터 ENA 핀 번호
 
-# GPIO 모드 설정
-GPIO.setmode(GPIO.BCM)  # BCM 핀 번호 사용
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
-
-# PWM 설정
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 서보모터: 50Hz PWM
-dc_motor_pwm = GPIO.PWM(ENA, 100)   # DC 모터: 100Hz PWM
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-# PWM 시작
-servo_pwm.start(0)
-dc_motor_pwm.start(0)
+gpio = open_gpio()  # BCM 핀 번호 사용 (AL_CAR_SIMULATE_HW=1 이면 시뮬레이션)
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)  # DC 모터: 100Hz PWM
 
 # 초기값 설정
 current_angle = 90  # 서보모터 기본 각도
@@ -33,10 +29,7 @@ def set_servo_angle(angle):
     서보모터의 각도를 설정합니다.
     :param angle: 0~180도 사이의 각도 값
     """
-    duty = 2 + (angle / 18)  # 각도 -> 듀티 사이클 변환
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.1)
-    servo_pwm.ChangeDutyCycle(0)  # 과열 방지를 위해 PWM 신호 차단
+    servo.set_angle(angle)
 
 # DC 모터 전진 함수
 def motor_forward():
@@ -46,9 +39,7 @@ def motor_forward():
     global current_speed
     if current_speed < 100:  # 최대 속도 제한
         current_speed += 5
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(current_speed)
+    dc_motor.forward(current_speed)
     print(f"전진: 속도 {current_speed}%")
 
 # DC 모터 속도 감소 함수
@@ -59,9 +50,7 @@ def motor_slow_down():
     global current_speed
     if current_speed > 0:  # 최소 속도 제한
         current_speed -= 5
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(current_speed)
+    dc_motor.forward(current_speed)
     print(f"속도 감소: 속도 {current_speed}%")
 
 # 모터 정지 함수
@@ -71,9 +60,7 @@ def motor_stop():
     """
     global current_speed
     current_speed = 0
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(0)
+    dc_motor.stop()
     print("모터 정지")
 
 # 초기 서보모터 각도 설정
@@ -126,7 +113,7 @@ except KeyboardInterrupt:
     pass
 finally:
     # 프로그램 종료 시 GPIO 핀 초기화
-    servo_pwm.stop()
-    dc_motor_pwm.stop()
-    GPIO.cleanup()
+    servo.close()
+    dc_motor.close()
+    gpio.cleanup()
     print("프로그램을 종료합니다.")
\ No newline at end of file
@@ -1,4 +1,3 @@
-import RPi.GPIO as GPIO
 import time
 from pynput import keyboard
 import cv2
@@ -8,15 +7,23 @@ import shlex
 import datetime
 import os
 import threading
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.mjpeg import MjpegSplitter
+from vehicle.hw import open_gpio, open_steering
+from vehicle.image_writer import ImageWriter
+from vehicle.recording import RecordingWriter
 
 # === GPIO 설정 ===
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 
-GPIO.setmode(GPIO.BCM)  # BCM 핀 번호 사용
-GPIO.setup(SERVO_PIN, GPIO.OUT)
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 서보모터: 50Hz PWM
-servo_pwm.start(0)
+gpio = open_gpio()  # BCM 핀 번호 사용 (AL_CAR_SIMULATE_HW=1 이면 시뮬레이션)
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL)
 
 current_angle = 90  # 서보모터 초기 각도
 ANGLE_INCREMENT = 5  # 서보모터 각도 변화량
@@ -33,11 +40,19 @@ for i in range(len(ANGLE_RANGES)):
     folder_path = os.path.join(base_save_path, f"range_{i}")
     os.makedirs(folder_path, exist_ok=True)
 
+# 이미지 저장: 캡처 스레드가 SD 카드 쓰기를 기다리지 않도록 별도 스레드 풀에서 저장
+WRITER_POLICY = "drop_oldest"  # 큐가 가득 차면 "drop_oldest" (오래된 요청 버림) 또는 "block" (자리 날 때까지 대기)
+writer = ImageWriter(workers=2, queue_size=16, policy=WRITER_POLICY).start()
+
+# 저장 형식: "files" (범위 폴더에 JPEG 파일 하나씩) 또는 "shards" (녹화 샤드 파일에 촬영 시각/각도/속도/라벨과 함께 기록)
+RECORD_FORMAT = "files"
+recorder = None
+if RECORD_FORMAT == "shards":
+    recorder = RecordingWriter(os.path.join(base_save_path, "recordings"),
+                               labels=[f"range_{i}" for i in range(len(ANGLE_RANGES))])
+
 def set_servo_angle(angle):
-    duty = 2 + (angle / 18)
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.1)
-    servo_pwm.ChangeDutyCycle(0)
+    servo.set_angle(angle)
 
 set_servo_angle(current_angle)
 
@@ -69,41 +84,36 @@ def on_release(key):
 # === 카메라 설정 ===
 cmd = 'libcamera-vid --inline --nopreview -t 0 --codec mjpeg --width 640 --height 480 --framerate 30 -o - --camera 0'
 process = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+splitter = MjpegSplitter(process.stdout)
 
 capture_interval = 3  # 캡처 간격 (3초)
 last_capture_time = time.time()
 
 def capture_images():
     global last_capture_time
-    buffer = b""
     while len(captured_ranges) < len(ANGLE_RANGES):
         current_time = time.time()
         if current_time - last_capture_time >= capture_interval:
             last_capture_time = current_time
-            buffer += process.stdout.read(4096)
-            a = buffer.find(b'\xff\xd8')
-            b = buffer.find(b'\xff\xd9')
-            if a != -1 and b != -1:
-                jpg = buffer[a:b+2]
-                buffer = buffer[b+2:]
-                bgr_frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
-                if bgr_frame is not None:
-                    # 캡처 조건: 각도가 특정 범위에 속하고 해당 범위가 캡처되지 않은 경우
-                    angle_range = get_angle_range(current_angle)
-                    if angle_range != -1:
+            jpg = splitter.read()
+            if jpg is None:
+                break
+            bgr_frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if bgr_frame is not None:
+                # 캡처 조건: 각도가 특정 범위에 속하고 해당 범위가 캡처되지 않은 경우
+                angle_range = get_angle_range(current_angle)
+                if angle_range != -1:
+                    if recorder is not None:
+                        # 카메라 JPEG 원본을 샤드에 각도/속도와 함께 기록
+                        recorder.append(jpg, angle=current_angle, speed=0, label=angle_range)
+                    else:
                         range_folder = os.path.join(base_save_path, f"range_{angle_range}")
                         now = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
                         filename = os.path.join(range_folder, f"{now}.jpg")
-                        try:
-                            if cv2.imwrite(filename, bgr_frame):
-                                print(f"이미지 저장 성공: {filename}")
-                                captured_ranges.add(angle_range)  # 저장된 범위 추가
-                            else:
-                                print(f"이미지 저장 실패: {filename}")
-                        except Exception as e:
-                            print(f"이미지 저장 중 에러 발생: {e}")
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
+                        writer.submit(filename, bgr_frame)
+                    captured_ranges.add(angle_range)  # 저장된 범위 추가
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
 
 # === 프로그램 실행 ===
 try:
@@ -116,6 +126,11 @@ except KeyboardInterrupt:
 finally:
     process.terminate()
     cv2.destroyAllWindows()
-    servo_pwm.stop()
-    GPIO.cleanup()
+    writer.close()  # 남은 이미지 저장
+    writer.report()
+    if recorder is not None:
+        recorder.close()  # 샤드 인덱스 기록
+        recorder.report()
+    servo.close()
+    gpio.cleanup()
     print("프로그램 종료")
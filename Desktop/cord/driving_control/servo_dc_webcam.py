@@ -1,4 +1,3 @@
-import RPi.GPIO as GPIO
 import time
 from pynput import keyboard
 import cv2
@@ -6,24 +5,30 @@ import numpy as np
 import datetime
 import os
 import threading
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.hw import open_gpio, open_steering, DCMotor
+from vehicle.image_writer import ImageWriter
+from vehicle.recording import RecordingWriter
+from vehicle.actuator import Actuator
 
 # === GPIO 설정 ===
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 IN1 = 17        # DC 모터 IN1 핀 번호
 IN2 = 27        # DC 모터 IN2 핀 번호
 ENA = 18        # DC 모터 ENA 핀 번호
 
-GPIO.setmode(GPIO.BCM)  # BCM 핀 번호 사용
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 서보모터: 50Hz PWM
-dc_motor_pwm = GPIO.PWM(ENA, 100)   # DC 모터: 100Hz PWM
+gpio = open_gpio()
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)  # DC 모터: 100Hz PWM
 
-servo_pwm.start(0)
-dc_motor_pwm.start(0)
+# 서보 대기 시간 동안 키 입력이 막히지 않도록 별도 스레드에서 구동 (최신 명령만 적용)
+actuator = Actuator(servo, dc_motor).start()
 
 current_angle = 30  # 서보모터 초기 각도
 current_speed = 0   # DC 모터 초기 속도
@@ -48,20 +53,25 @@ for direction in ANGLE_RANGES.keys():
     folder_path = os.path.join(base_save_path, direction)
     os.makedirs(folder_path, exist_ok=True)
 
+# 이미지 저장: 캡처 스레드가 SD 카드 쓰기를 기다리지 않도록 별도 스레드 풀에서 저장
+WRITER_POLICY = "drop_oldest"  # 큐가 가득 차면 "drop_oldest" (오래된 요청 버림) 또는 "block" (자리 날 때까지 대기)
+writer = ImageWriter(workers=2, queue_size=16, policy=WRITER_POLICY).start()
+
+# 저장 형식: "files" (방향 폴더에 JPEG 파일 하나씩) 또는 "shards" (녹화 샤드 파일에 촬영 시각/각도/속도/라벨과 함께 기록)
+RECORD_FORMAT = "files"
+recorder = None
+if RECORD_FORMAT == "shards":
+    recorder = RecordingWriter(os.path.join(base_save_path, "recordings"), labels=list(ANGLE_RANGES))
+
 def set_servo_angle(angle):
-    duty = 2 + (angle / 18)
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.1)
-    servo_pwm.ChangeDutyCycle(0)
+    actuator.set_angle(angle)  # 바로 반환
 
 def motor_forward():
     global current_speed
     if current_speed < MAX_SPEED:
         current_speed += SPEED_INCREMENT
     current_speed = min(current_speed, MAX_SPEED)
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(current_speed)
+    actuator.set_speed(current_speed)
     print(f"전진: 속도 {current_speed}%")
 
 def motor_slow_down():
@@ -72,17 +82,13 @@ def motor_slow_down():
     if current_speed == 0:
         motor_stop()
     else:
-        GPIO.output(IN1, GPIO.HIGH)
-        GPIO.output(IN2, GPIO.LOW)
-        dc_motor_pwm.ChangeDutyCycle(current_speed)
+        actuator.set_speed(current_speed)
         print(f"속도 감소: 속도 {current_speed}%")
 
 def motor_stop():
     global current_speed
     current_speed = 0
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(0)
+    actuator.set_speed(0)
     print("모터 정지")
 
 set_servo_angle(current_angle)
@@ -145,17 +151,15 @@ def capture_images():
             # 캡처 조건: 각도에 따라 이미지 저장
             direction = get_direction(current_angle)
             if direction:
-                range_folder = os.path.join(base_save_path, direction)
-                now = datetime.datetime.now().strftime('%y%m%d_%H%M%S_%f')  # 파일 이름에 밀리초 포함
-                filename = os.path.join(range_folder, f"{direction}_{now}.jpg")
-                try:
-                    if cv2.imwrite(filename, frame):
-                        print(f"이미지 저장 성공 ({direction}): {filename}")
-                        last_capture_time = current_time  # 마지막 캡처 시간 업데이트
-                    else:
-                        print(f"이미지 저장 실패: {filename}")
-                except Exception as e:
-                    print(f"이미지 저장 중 에러 발생: {e}")
+                if recorder is not None:
+                    # 샤드에 각도/속도와 함께 기록 (웹캠 프레임은 여기서 JPEG 인코딩)
+                    recorder.append(frame, angle=current_angle, speed=current_speed, label=direction)
+                else:
+                    range_folder = os.path.join(base_save_path, direction)
+                    now = datetime.datetime.now().strftime('%y%m%d_%H%M%S_%f')  # 파일 이름에 밀리초 포함
+                    filename = os.path.join(range_folder, f"{direction}_{now}.jpg")
+                    writer.submit(filename, frame)
+                last_capture_time = current_time  # 마지막 캡처 시간 업데이트
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
@@ -170,7 +174,16 @@ except KeyboardInterrupt:
 finally:
     cap.release()
     cv2.destroyAllWindows()
-    servo_pwm.stop()
-    dc_motor_pwm.stop()
-    GPIO.cleanup()
+    writer.close()  # 남은 이미지 저장
+    writer.report()
+    if recorder is not None:
+        recorder.close()  # 샤드 인덱스 기록
+        recorder.report()
+    actuator.stop()
+    dc_motor.stop()
+    stats = actuator.stats()
+    print(f"구동 통계: 명령 {stats['commands']}, 적용 {stats['applied']}, 대체됨 {stats['dropped']}, 변화 없음 {stats['skipped']}")
+    servo.close()
+    dc_motor.close()
+    gpio.cleanup()
     print("프로그램 종료")
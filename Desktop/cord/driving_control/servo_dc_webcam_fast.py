@@ -1,4 +1,3 @@
-import RPi.GPIO as GPIO
 import time
 from pynput import keyboard
 import cv2
@@ -6,24 +5,30 @@ import numpy as np
 import datetime
 import os
 import threading
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.hw import open_gpio, open_steering, DCMotor
+from vehicle.image_writer import ImageWriter
+from vehicle.frame_ring import BurstRecorder
+from vehicle.actuator import Actuator
 
 # === GPIO 설정 ===
 SERVO_PIN = 12  # 서보모터 핀 번호
+SERVO_CHANNEL = 0  # PCA9685 사용 시 서보모터 채널
 IN1 = 17        # DC 모터 IN1 핀 번호
 IN2 = 27        # DC 모터 IN2 핀 번호
 ENA = 18        # DC 모터 ENA 핀 번호
 
-GPIO.setmode(GPIO.BCM)  # BCM 핀 번호 사용
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
+# 조향 드라이버: "soft_pwm" (GPIO 소프트웨어 PWM) 또는 "pca9685" (I2C 하드웨어 PWM, 유지 대기 없음)
+STEERING_DRIVER = "soft_pwm"
 
-servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 서보모터: 50Hz PWM
-dc_motor_pwm = GPIO.PWM(ENA, 100)   # DC 모터: 100Hz PWM
+gpio = open_gpio()
+servo = open_steering(STEERING_DRIVER, gpio, pin=SERVO_PIN, channel=SERVO_CHANNEL, hold=0.3)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)  # DC 모터: 100Hz PWM
 
-servo_pwm.start(0)
-dc_motor_pwm.start(0)
+# 서보 대기 시간 동안 키 입력이 막히지 않도록 별도 스레드에서 구동 (최신 명령만 적용)
+actuator = Actuator(servo, dc_motor).start()
 
 current_angle = 30  # 서보모터 초기 각도
 current_speed = 0   # DC 모터 초기 속도
@@ -47,12 +52,13 @@ for direction in ANGLE_RANGES.keys():
     folder_path = os.path.join(base_save_path, direction)
     os.makedirs(folder_path, exist_ok=True)
 
+# 이미지 저장: 캡처 스레드가 SD 카드 쓰기를 기다리지 않도록 별도 스레드 풀에서 저장
+WRITER_POLICY = "drop_oldest"  # 큐가 가득 차면 "drop_oldest" (오래된 요청 버림) 또는 "block" (자리 날 때까지 대기)
+writer = ImageWriter(workers=2, queue_size=16, policy=WRITER_POLICY).start()
+
 def set_servo_angle(angle):
     """서보모터 각도를 설정합니다."""
-    duty = 2 + (angle / 18)
-    servo_pwm.ChangeDutyCycle(duty)
-    time.sleep(0.3)  # 신호 유지 시간 증가
-    servo_pwm.ChangeDutyCycle(0)
+    actuator.set_angle(angle)  # 바로 반환
 
 def motor_forward():
     """DC 모터 전진."""
@@ -60,9 +66,7 @@ def motor_forward():
     if current_speed < MAX_SPEED:
         current_speed += SPEED_INCREMENT
     current_speed = min(current_speed, MAX_SPEED)
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(current_speed)
+    actuator.set_speed(current_speed)
     print(f"전진: 속도 {current_speed}%")
 
 def motor_slow_down():
@@ -74,18 +78,14 @@ def motor_slow_down():
     if current_speed == 0:
         motor_stop()
     else:
-        GPIO.output(IN1, GPIO.HIGH)
-        GPIO.output(IN2, GPIO.LOW)
-        dc_motor_pwm.ChangeDutyCycle(current_speed)
+        actuator.set_speed(current_speed)
         print(f"속도 감소: 속도 {current_speed}%")
 
 def motor_stop():
     """DC 모터 정지."""
     global current_speed
     current_speed = 0
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    dc_motor_pwm.ChangeDutyCycle(0)
+    actuator.set_speed(0)
     print("모터 정지")
 
 set_servo_angle(current_angle)
@@ -130,31 +130,32 @@ if not cap.isOpened():
     exit()
 
 capture_interval = 0.1  # 캡처 간격
-burst_capture_count = 3  # 한 번에 저장할 이미지 수
-burst_interval = 0.05  # 버스트 캡처 간격
+burst_capture_count = 3  # 한 번에 저장할 이미지 수 (서로 다른 연속 프레임)
+burst_pre_frames = 1     # 그중 트리거 이전 프레임 수 (링 버퍼에 보관된 프레임)
+
+# 버스트 저장: 트리거 전후 연속 프레임을 미리 할당한 슬롯에 복사해 writer 로 넘김 (sleep 없음)
+burst = BurstRecorder(writer, pre_frames=burst_pre_frames,
+                      post_frames=burst_capture_count - burst_pre_frames - 1)
 
 def capture_images():
     global last_capture_time
     last_capture_time = time.time()
+    frame = None
     while True:
-        ret, frame = cap.read()
+        ret, frame = cap.read(frame)  # 이전 프레임 배열을 재사용 (링 버퍼가 복사해 두므로 안전)
         if not ret:
             print("웹캠에서 프레임을 읽을 수 없습니다.")
             break
+        burst.add_frame(frame)
 
         current_time = time.time()
         if current_time - last_capture_time >= capture_interval:
             direction = get_direction(current_angle)
             if direction:
                 range_folder = os.path.join(base_save_path, direction)
-                for i in range(burst_capture_count):
-                    burst_time = datetime.datetime.now().strftime('%y%m%d_%H%M%S_%f')
-                    filename = os.path.join(range_folder, f"{direction}_{burst_time}_burst{i}.jpg")
-                    if cv2.imwrite(filename, frame):
-                        print(f"이미지 저장 성공 ({direction}): {filename}")
-                    else:
-                        print(f"이미지 저장 실패: {filename}")
-                    time.sleep(burst_interval)
+                burst_time = datetime.datetime.now().strftime('%y%m%d_%H%M%S_%f')
+                burst.trigger(lambda i, folder=range_folder, direction=direction, stamp=burst_time:
+                              os.path.join(folder, f"{direction}_{stamp}_burst{i}.jpg"))
             last_capture_time = current_time
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
@@ -170,7 +171,15 @@ except KeyboardInterrupt:
 finally:
     cap.release()
     cv2.destroyAllWindows()
-    servo_pwm.stop()
-    dc_motor_pwm.stop()
-    GPIO.cleanup()
+    writer.close()  # 남은 이미지 저장
+    writer.report()
+    stats = burst.stats()
+    print(f"버스트 통계: 버스트 {stats['bursts']}, 저장 요청 {stats['saved']}, 슬롯 부족으로 버림 {stats['dropped']}")
+    actuator.stop()
+    dc_motor.stop()
+    stats = actuator.stats()
+    print(f"구동 통계: 명령 {stats['commands']}, 적용 {stats['applied']}, 대체됨 {stats['dropped']}, 변화 없음 {stats['skipped']}")
+    servo.close()
+    dc_motor.close()
+    gpio.cleanup()
     print("프로그램 종료")
@@ -0,0 +1,86 @@
+import numpy as np
+import os
+import sys
+import json
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.inference import MODEL_FILES, load_backend
+from vehicle.stats import LatencyStats
+from vehicle.preprocess import Preprocessor
+
+# === 설정 ===
+model_dir = "/home/pi/AL_CAR"
+data_path = "/home/pi/AL_CAR/processed_images"  # 검증용 이미지 (left/straight/right)
+report_path = "/home/pi/AL_CAR/backend_report.json"
+image_size = (64, 64)
+MAX_IMAGES = 600      # 정확도 평가에 사용할 최대 이미지 수
+LATENCY_RUNS = 200    # 지연시간 측정 반복 횟수 (배치 크기 1)
+
+def load_eval_data(data_path, image_size, max_images, seed=0):
+    """클래스별로 고르게 이미지를 골라 (X, y) 반환 (X 는 한 채널, 모델마다 match_channels 로 맞춤)"""
+    classes = ["left", "straight", "right"]
+    rng = np.random.default_rng(seed)
+    pre = Preprocessor(output_size=image_size)  # 학습/주행과 같은 축소 + 정규화
+    X, y = [], []
+    for idx, cls in enumerate(classes):
+        cls_path = os.path.join(data_path, cls)
+        names = sorted(os.listdir(cls_path))
+        picked = rng.choice(len(names), size=min(len(names), max_images // len(classes)), replace=False)
+        for i in picked:
+            img = cv2.imread(os.path.join(cls_path, names[i]), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                continue
+            X.append(pre.normalize(img, np.empty((image_size[1], image_size[0], 1), dtype=np.float32)))
+            y.append(idx)
+    return np.stack(X), np.array(y)
+
+def match_channels(X, channels):
+    """한 채널 입력을 모델 입력 채널 수에 맞춤 (3채널 모델은 같은 값을 세 채널에 복제)"""
+    return X if X.shape[-1] == channels else np.repeat(X, channels, axis=-1)
+
+def measure_latency(backend, sample, runs):
+    """한 장씩 추론할 때의 지연시간 (ms) 통계"""
+    backend.latency = LatencyStats(window=runs)
+    for _ in range(runs):
+        backend.infer(sample)
+    return backend.latency.summary()
+
+def main():
+    X, y = load_eval_data(data_path, image_size, MAX_IMAGES)
+    print(f"평가 데이터 크기: {X.shape}")
+
+    report = {"num_images": int(len(y)), "backends": {}}
+    reference = None
+    for name, filename in MODEL_FILES.items():
+        model_path = os.path.join(model_dir, filename)
+        if not os.path.exists(model_path):
+            print(f"[{name}] 모델 파일이 없어 건너뜁니다: {model_path}")
+            continue
+        backend = load_backend(name, model_path)
+        X_model = match_channels(X, backend.input_shape[-1])
+
+        predictions = np.argmax(backend.infer(X_model), axis=1)
+        if reference is None:
+            reference = predictions  # 첫 번째(keras_predict) 백엔드 기준 일치율
+        result = {
+            "input_channels": int(backend.input_shape[-1]),
+            "model_size_kb": os.path.getsize(model_path) / 1024,
+            "accuracy": float(np.mean(predictions == y)),
+            "agreement": float(np.mean(predictions == reference)),
+        }
+        result.update(measure_latency(backend, X_model[:1], LATENCY_RUNS))
+        report["backends"][name] = result
+
+    # 결과 표 출력
+    print(f"\n{'backend':<12} {'size(KB)':>9} {'acc':>7} {'agree':>7} {'mean':>8} {'p50':>8} {'p95':>8}")
+    for name, r in report["backends"].items():
+        print(f"{name:<12} {r['model_size_kb']:9.1f} {r['accuracy']:7.3f} {r['agreement']:7.3f} "
+              f"{r['mean_ms']:6.2f}ms {r['p50_ms']:6.2f}ms {r['p95_ms']:6.2f}ms")
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n비교 리포트 저장: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import numpy as np
+import os
+import sys
+import json
+import time
+import argparse
+import tensorflow as tf
+from tensorflow.keras.utils import to_categorical
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.inference import load_backend
+from vehicle.preprocess import Preprocessor
+from vehicle.dataset import stratified_split
+from lane_model import build_model
+from export_tflite import convert_fp16
+from compare_backends import load_eval_data, match_channels, measure_latency
+
+# === 설정 ===
+data_path = "/home/pi/AL_CAR/processed_images"  # 학습 이미지 (left/straight/right)
+output_dir = "/home/pi/AL_CAR/channel_comparison"  # 비교용 모델/리포트 저장 경로
+image_size = (64, 64)
+CHANNELS = (3, 1)      # 기존 3채널 모델 vs 단일 채널 모델
+LATENCY_RUNS = 200     # 지연시간 측정 반복 횟수 (배치 크기 1)
+
+def train_variant(channels, X_train, y_train, X_val, y_val, epochs, seed):
+    """같은 분할/시드로 channels 입력 모델을 학습하고 (모델, 검증 정확도) 반환"""
+    tf.keras.utils.set_random_seed(seed)
+    model = build_model(image_size, channels)
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    model.fit(match_channels(X_train, channels), y_train, validation_data=(match_channels(X_val, channels), y_val),
+              epochs=epochs, batch_size=32, verbose=2)
+    _, accuracy = model.evaluate(match_channels(X_val, channels), y_val, verbose=0)
+    return model, accuracy
+
+def measure_preprocess(channels, sample, runs):
+    """주행 루프와 같은 축소 + 정규화를 channels 입력 버퍼에 기록하는 시간 (µs)"""
+    pre = Preprocessor(output_size=image_size)
+    binary = (sample[..., 0] * 255).astype(np.uint8)
+    out = np.empty((image_size[1], image_size[0], channels), dtype=np.float32)
+    pre.normalize(binary, out)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(runs):
+        pre.normalize(binary, out)
+    return (time.perf_counter() - start) / runs * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="단일 채널 / 3채널 입력 모델 비교 (정확도, 크기, 지연시간)")
+    parser.add_argument("--data", default=data_path, help="학습 이미지 경로")
+    parser.add_argument("--output", default=output_dir, help="비교용 모델과 리포트 저장 경로")
+    parser.add_argument("--max-images", type=int, default=3000, help="사용할 최대 이미지 수 (클래스별 균등)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    os.makedirs(args.output, exist_ok=True)
+
+    # 데이터는 한 채널로 한 번만 로드 (3채널 모델에는 복제해서 입력 = 기존 imread 결과와 같음)
+    X, y = load_eval_data(args.data, image_size, args.max_images, seed=args.seed)
+    y = to_categorical(y, num_classes=3)
+    train_idx, val_idx = stratified_split(y.argmax(axis=1), val_fraction=0.2, seed=args.seed)
+    X_train, X_val, y_train, y_val = X[train_idx], X[val_idx], y[train_idx], y[val_idx]
+    print(f"훈련 데이터: {X_train.shape}, 검증 데이터: {X_val.shape}")
+
+    report = {"num_train": int(len(X_train)), "num_val": int(len(X_val)), "epochs": args.epochs, "variants": {}}
+    for channels in CHANNELS:
+        print(f"\n=== 입력 채널 {channels} ===")
+        model, accuracy = train_variant(channels, X_train, y_train, X_val, y_val, args.epochs, args.seed)
+
+        h5_path = os.path.join(args.output, f"lane_model_c{channels}.h5")
+        fp16_path = os.path.join(args.output, f"lane_model_c{channels}_fp16.tflite")
+        model.save(h5_path)
+        with open(fp16_path, "wb") as f:
+            f.write(convert_fp16(model))
+
+        sample = match_channels(X_val[:1], channels)
+        result = {
+            "val_accuracy": float(accuracy),
+            "params": int(model.count_params()),
+            "first_conv_params": int(model.layers[0].count_params()),
+            "input_bytes_per_frame": int(sample[0].nbytes),
+            "h5_size_kb": os.path.getsize(h5_path) / 1024,
+            "tflite_fp16_size_kb": os.path.getsize(fp16_path) / 1024,
+            "preprocess_us": measure_preprocess(channels, X_val[0], LATENCY_RUNS),
+        }
+        for name, path in (("keras_direct", h5_path), ("tflite_fp16", fp16_path)):
+            backend = load_backend(name, path)
+            result[name] = measure_latency(backend, sample, LATENCY_RUNS)
+        report["variants"][f"c{channels}"] = result
+
+    # 결과 표 출력
+    print(f"\n{'input':<6} {'acc':>6} {'params':>9} {'h5(KB)':>8} {'fp16(KB)':>9} {'pre':>8} "
+          f"{'keras p50':>10} {'tflite p50':>11}")
+    for name, r in report["variants"].items():
+        print(f"{name:<6} {r['val_accuracy']:6.3f} {r['params']:9d} {r['h5_size_kb']:8.1f} "
+              f"{r['tflite_fp16_size_kb']:9.1f} {r['preprocess_us']:6.1f}us "
+              f"{r['keras_direct']['p50_ms']:8.2f}ms {r['tflite_fp16']['p50_ms']:9.2f}ms")
+
+    report_path = os.path.join(args.output, "channel_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n비교 리포트 저장: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import tensorflow as tf
+import numpy as np
+import os
+import sys
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.preprocess import Preprocessor
+
+# === 경로 설정 ===
+model_dir = "/home/pi/AL_CAR"
+keras_model_path = os.path.join(model_dir, "lane_following_model.h5")
+fp16_model_path = os.path.join(model_dir, "lane_following_model_fp16.tflite")
+int8_model_path = os.path.join(model_dir, "lane_following_model_int8.tflite")
+data_path = "/home/pi/AL_CAR/processed_images"  # 대표 데이터셋으로 사용할 학습 이미지
+image_size = (64, 64)
+
+REPRESENTATIVE_SAMPLES = 200  # int8 양자화 보정에 사용할 이미지 수
+
+def sample_training_images(data_path, image_size, count, channels=1, seed=42):
+    """
+    학습 이미지에서 클래스별로 고르게 count 장을 골라 (N, H, W, channels) float32 배열로 반환
+    (lane_following.py 의 load_processed_data 와 같은 전처리)
+    """
+    classes = ["left", "straight", "right"]
+    rng = np.random.default_rng(seed)
+    paths = []
+    for cls in classes:
+        cls_path = os.path.join(data_path, cls)
+        names = sorted(os.listdir(cls_path))
+        picked = rng.choice(len(names), size=min(len(names), count // len(classes)), replace=False)
+        paths.extend(os.path.join(cls_path, names[i]) for i in picked)
+
+    pre = Preprocessor(output_size=image_size)
+    images = np.empty((len(paths), image_size[1], image_size[0], channels), dtype=np.float32)
+    count = 0
+    for img_path in paths:
+        img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        pre.normalize(img, images[count])
+        count += 1
+    return images[:count]
+
+def convert_fp16(model):
+    """float16 가중치 양자화 TFLite 모델 (크기 절반, 정확도 거의 동일)"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+def convert_int8(model, representative_images):
+    """int8 전체 정수 양자화 TFLite 모델 (입출력도 int8)"""
+    def representative_dataset():
+        for img in representative_images:
+            yield [img[np.newaxis].astype(np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+def export_tflite_models(model, representative_images, fp16_path=fp16_model_path, int8_path=int8_model_path):
+    """학습된 Keras 모델을 float16 / int8 TFLite 모델로 저장"""
+    for path, tflite_model in ((fp16_path, convert_fp16(model)),
+                               (int8_path, convert_int8(model, representative_images))):
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+        print(f"TFLite 모델 저장 완료: {path} ({len(tflite_model) / 1024:.1f} KB)")
+
+def main():
+    model = tf.keras.models.load_model(keras_model_path)
+    print(f"모델 로드 완료: {keras_model_path}")
+
+    # 입력 채널 수는 모델에서 (1: 단일 채널 모델, 3: 기존 모델)
+    representative_images = sample_training_images(data_path, image_size, REPRESENTATIVE_SAMPLES,
+                                                   channels=model.input_shape[-1])
+    print(f"대표 데이터셋 크기: {representative_images.shape}")
+
+    export_tflite_models(model, representative_images)
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,36 @@
-import tensorflow as tf
 import numpy as np
 import os
-from sklearn.model_selection import train_test_split
-import cv2
+import sys
 
-# === 데이터 준비 ===
-def load_processed_data(data_path, image_size):
-    X = []  # 이미지 데이터
-    y = []  # 레이블
-
-    classes = ["left", "straight", "right"]  # 클래스 이름
-    class_indices = {cls: idx for idx, cls in enumerate(classes)}
-
-    for cls in classes:
-        cls_path = os.path.join(data_path, cls)
-        for img_name in os.listdir(cls_path):
-            img_path = os.path.join(cls_path, img_name)
-            img = cv2.imread(img_path)
-            img = cv2.resize(img, image_size)  # 크기 조정
-            img = img / 255.0  # 정규화
-            X.append(img)
-            y.append(class_indices[cls])
-
-    return np.array(X), np.array(y)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.dataset import list_samples, make_dataset, stratified_split, take_images
+from lane_model import INPUT_CHANNELS, build_model
+from export_tflite import REPRESENTATIVE_SAMPLES, export_tflite_models
 
 # 데이터 경로와 크기 설정
 data_path = "/home/pi/AL_CAR/processed_images"  # 데이터 경로
 image_size = (64, 64)  # 이미지 크기
 
-# 데이터 로드
-X, y = load_processed_data(data_path, image_size)
-print(f"데이터 크기: {X.shape}, 라벨 크기: {y.shape}")
+BATCH_SIZE = 32  # 배치 크기
+# 녹화 샤드 라벨 -> 클래스 (curve_training.py 의 range_i 라벨 등, 예: {"range_0": "left", "range_1": "straight"})
+LABEL_MAP = None
 
-# 훈련/검증 데이터 분리
-X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+# === 데이터 준비 (vehicle/dataset.py) ===
+# 파일 목록/녹화 인덱스만 읽고, 이미지는 학습 중에 병렬로 디코딩해서 배치 단위로 흘려 보냄
+# (전체 데이터셋을 메모리에 올리지 않으므로 데이터셋 크기가 Pi 의 메모리에 묶이지 않음)
+samples = list_samples(data_path, label_map=LABEL_MAP)
+print(f"데이터 수: {len(samples)}, 클래스별: {np.bincount(samples.labels, minlength=3).tolist()}")
 
-# 원-핫 인코딩
-y_train = tf.keras.utils.to_categorical(y_train, num_classes=3)
-y_val = tf.keras.utils.to_categorical(y_val, num_classes=3)
+# 훈련/검증 데이터 분리 (라벨만으로 클래스 비율을 유지한 분할)
+train_idx, val_idx = stratified_split(samples.labels, val_fraction=0.2, seed=42)
+train_ds = make_dataset(samples, train_idx, image_size, batch_size=BATCH_SIZE, channels=INPUT_CHANNELS,
+                        shuffle=True, seed=42)
+val_ds = make_dataset(samples, val_idx, image_size, batch_size=BATCH_SIZE, channels=INPUT_CHANNELS)
+print(f"훈련 데이터: {len(train_idx)}, 검증 데이터: {len(val_idx)}")
 
 # === 모델 설계 ===
-model = tf.keras.Sequential([
-    tf.keras.layers.Conv2D(32, (3, 3), activation='relu', input_shape=(64, 64, 3)),
-    tf.keras.layers.MaxPooling2D(pool_size=(2, 2)),
-    tf.keras.layers.Conv2D(64, (3, 3), activation='relu'),
-    tf.keras.layers.MaxPooling2D(pool_size=(2, 2)),
-    tf.keras.layers.Flatten(),
-    tf.keras.layers.Dense(128, activation='relu'),
-    tf.keras.layers.Dropout(0.5),
-    tf.keras.layers.Dense(3, activation='softmax')  # 3개의 클래스 (left, straight, right)
-])
+model = build_model(image_size, INPUT_CHANNELS)  # 입력 (64, 64, INPUT_CHANNELS)
+model.summary()
 
 # === 모델 컴파일 ===
 model.compile(
@@ -60,15 +41,14 @@ model.compile(
 
 # === 모델 훈련 ===
 history = model.fit(
-    X_train, y_train,  # 훈련 데이터
-    validation_data=(X_val, y_val),  # 검증 데이터
+    train_ds,  # 훈련 데이터 (배치 크기는 데이터셋에서)
+    validation_data=val_ds,  # 검증 데이터
     epochs=50,  # 반복 학습 횟수
-    batch_size=32,  # 배치 크기
     verbose=1  # 출력 옵션
 )
 
 # === 모델 평가 ===
-loss, accuracy = model.evaluate(X_val, y_val)
+loss, accuracy = model.evaluate(val_ds)
 print(f"검증 데이터 손실: {loss:.4f}")
 print(f"검증 데이터 정확도: {accuracy * 100:.2f}%")
 
@@ -76,3 +56,9 @@ print(f"검증 데이터 정확도: {accuracy * 100:.2f}%")
 model_save_path = "/home/pi/AL_CAR/lane_following_model.h5"
 model.save(model_save_path)
 print(f"모델 저장 완료: {model_save_path}")
+
+# === TFLite 모델 변환 (float16 / int8) ===
+# int8 양자화 보정에는 섞인 훈련 배치에서 학습 이미지 일부를 대표 데이터셋으로 사용
+representative_images = take_images(train_ds, REPRESENTATIVE_SAMPLES)
+export_tflite_models(model, representative_images)
+samples.close()
@@ -0,0 +1,20 @@
+import tensorflow as tf
+
+INPUT_CHANNELS = 1  # 전처리 결과가 이진 영상이라 한 채널이면 충분 (3 이면 기존 BGR 입력 모델)
+
+def build_model(image_size=(64, 64), channels=INPUT_CHANNELS, num_classes=3):
+    """
+    차선 추종 CNN (lane_following.py / train_model.py 공용)
+    :param image_size: (width, height)
+    :param channels: 입력 채널 수. 1 이면 첫 Conv 층 연산량/가중치와 입력 크기가 3채널의 1/3
+    """
+    return tf.keras.Sequential([
+        tf.keras.layers.Conv2D(32, (3, 3), activation='relu', input_shape=(image_size[1], image_size[0], channels)),
+        tf.keras.layers.MaxPooling2D(pool_size=(2, 2)),
+        tf.keras.layers.Conv2D(64, (3, 3), activation='relu'),
+        tf.keras.layers.MaxPooling2D(pool_size=(2, 2)),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(num_classes, activation='softmax')  # 3개의 클래스 (left, straight, right)
+    ])
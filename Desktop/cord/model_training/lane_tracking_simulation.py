@@ -1,29 +1,62 @@
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
 import os
+import sys
+import csv
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.inference import load_backend
+from vehicle.preprocess import Preprocessor
+
+CLASSES = ["left", "straight", "right"]  # 클래스 이름
+RENDER_SIZE = (256, 256)  # 결과 이미지 크기
 
 # === 데이터 준비 ===
-def load_test_data(data_path, image_size):
+def list_test_files(data_path):
+    """
+    이미지를 읽지 않고 (파일 경로, 레이블) 목록만 만드는 함수
+    """
+    items = []
+    for idx, cls in enumerate(CLASSES):
+        cls_path = os.path.join(data_path, cls)
+        for img_name in sorted(os.listdir(cls_path)):
+            items.append((os.path.join(cls_path, img_name), idx))
+    return items
+
+def prepare_input(pre, img, out, processed):
+    """
+    그레이스케일 이미지 -> 모델 입력 (out 에 기록)
+    processed=True 이면 전처리 스크립트가 만든 이진 영상이라 축소 + 정규화만,
+    아니면 카메라 원본이라 주행 루프와 같은 전체 커널 (자르기 -> 블러 -> 이진화 -> 축소 + 정규화)
     """
-    데이터와 레이블을 로드하는 함수
+    if processed:
+        return pre.normalize(img, out)
+    return pre(img, out)
+
+def load_test_data(data_path, image_size, channels=1, processed=False):
+    """
+    데이터와 레이블을 로드하는 함수 (channels: 모델 입력 채널 수, processed: prepare_input 참고)
     """
     X = []  # 이미지 데이터
     y = []  # 레이블
     file_paths = []  # 파일 경로 저장
 
-    classes = ["left", "straight", "right"]  # 클래스 이름
-    class_indices = {cls: idx for idx, cls in enumerate(classes)}
+    class_indices = {cls: idx for idx, cls in enumerate(CLASSES)}
     indices_class = {idx: cls for cls, idx in class_indices.items()}  # 인덱스-클래스 매핑
+    pre = Preprocessor(output_size=image_size)  # 학습/주행과 같은 축소 + 정규화
 
-    for cls in classes:
+    for cls in CLASSES:
         cls_path = os.path.join(data_path, cls)
         for img_name in os.listdir(cls_path):
             img_path = os.path.join(cls_path, img_name)
-            img = cv2.imread(img_path)
-            img_resized = cv2.resize(img, image_size)
-            img_normalized = img_resized / 255.0
-            X.append(img_normalized)
+            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+            X.append(prepare_input(pre, img, np.empty((image_size[1], image_size[0], channels), dtype=np.float32),
+                                   processed))
             y.append(class_indices[cls])
             file_paths.append(img_path)
 
@@ -52,50 +85,184 @@ def draw_arrow(image, direction, color):
     cv2.arrowedLine(image, center, endpoint, color, 3, tipLength=0.3)
     return image
 
-# === 모델 및 데이터 로드 ===
-model_path = "/home/pi/AL_CAR/lane_following_model.h5"
-data_path = "/home/pi/AL_CAR/images"
-image_size = (64, 64)
-
-# 모델 로드
-model = load_model(model_path)
-print("모델 로드 완료!")
-
-# 테스트 데이터 로드
-X_test, y_test, file_paths, indices_class = load_test_data(data_path, image_size)
-print(f"테스트 데이터 크기: {X_test.shape}, 라벨 크기: {y_test.shape}")
-
-# === 예측 및 시뮬레이션 ===
-output_folder = "/home/pi/AL_CAR/simulation_output"
-os.makedirs(output_folder, exist_ok=True)
-
-for i, (image, true_label, file_path) in enumerate(zip(X_test, y_test, file_paths)):
-    # 모델 예측
-    image_input = np.expand_dims(image, axis=0)
-    predictions = model.predict(image_input)
-    predicted_label = np.argmax(predictions)
-
-    # 원래 이미지 로드
-    original_image = cv2.imread(file_path)
-    original_image_resized = cv2.resize(original_image, (256, 256))
-
-    # 실제 방향(파란색) 및 예측 방향(빨간색) 표시
-    true_direction = indices_class[true_label]
-    predicted_direction = indices_class[predicted_label]
-
-    image_with_arrows = draw_arrow(original_image_resized, true_direction, (255, 0, 0))  # 파란색 화살표 (실제 방향)
-    image_with_arrows = draw_arrow(image_with_arrows, predicted_direction, (0, 0, 255))  # 빨간색 화살표 (예측 방향)
-
-    # 결과 이미지 저장
-    output_path = os.path.join(output_folder, f"result_{i}_{true_direction}_vs_{predicted_direction}.jpg")
-    cv2.imwrite(output_path, image_with_arrows)
-    print(f"결과 저장: {output_path}")
-
-    # 화면에 출력 (옵션)
-    cv2.imshow("Simulation Result", image_with_arrows)
-    if cv2.waitKey(500) & 0xFF == ord('q'):  # q를 누르면 종료
-        break
-
-# 리소스 해제
-cv2.destroyAllWindows()
-print("시뮬레이션 완료!")
+def render_result(original_image, index, true_label, predicted_label, output_folder):
+    """
+    이미 디코딩된 원본 이미지에 실제/예측 방향 화살표를 그려 저장
+    """
+    image = cv2.resize(original_image, RENDER_SIZE)
+    if image.ndim == 2:  # 그레이스케일로 읽은 이미지에도 색 화살표를 그리도록
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    true_direction = CLASSES[true_label]
+    predicted_direction = CLASSES[predicted_label]
+    image = draw_arrow(image, true_direction, (255, 0, 0))       # 파란색 화살표 (실제 방향)
+    image = draw_arrow(image, predicted_direction, (0, 0, 255))  # 빨간색 화살표 (예측 방향)
+    output_path = os.path.join(output_folder, f"result_{index}_{true_direction}_vs_{predicted_direction}.jpg")
+    cv2.imwrite(output_path, image)
+    return image, output_path
+
+# === 헤드리스 일괄 평가 ===
+def evaluate_headless(model, data_path, image_size, batch_size, output_folder, render=False, workers=4,
+                      processed=False):
+    """
+    데이터셋을 고정 크기 배치로 흘려 보내며 평가 (메모리 사용량은 데이터셋 크기와 무관)
+    - 배치마다 이미지 디코딩은 스레드 풀에서 병렬로, 예측은 한 번의 호출로 처리
+    - render=True 이면 디코딩해 둔 원본으로 결과 이미지를 작업자 풀에서 그려 저장
+    """
+    items = list_test_files(data_path)
+    num_classes = len(CLASSES)
+    confusion = np.zeros((num_classes, num_classes), dtype=np.int64)  # [실제, 예측]
+    batch = np.zeros((batch_size, image_size[1], image_size[0], model.input_shape[-1]), dtype=np.float32)
+    unreadable = 0
+
+    # Preprocessor 는 내부 버퍼를 쓰므로 디코딩 스레드마다 하나씩
+    local = threading.local()
+
+    def decode(slot, path):
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)  # load_test_data 와 같은 입력
+        if img is None:
+            return None
+        if not hasattr(local, "pre"):
+            local.pre = Preprocessor(output_size=image_size)
+        prepare_input(local.pre, img, batch[slot], processed)
+        return img if render else True
+
+    decode_pool = ThreadPoolExecutor(max_workers=workers)
+    render_pool = ThreadPoolExecutor(max_workers=workers) if render else None
+    # 렌더링 대기 작업 수 제한 (원본 이미지를 무한정 쌓아 두지 않도록)
+    render_slots = threading.BoundedSemaphore(batch_size * 2)
+
+    def release_slot(_future):
+        render_slots.release()
+
+    start = time.perf_counter()
+    for offset in range(0, len(items), batch_size):
+        chunk = items[offset:offset + batch_size]
+        decoded = list(decode_pool.map(decode, range(len(chunk)), [path for path, _ in chunk]))
+
+        valid = [i for i, d in enumerate(decoded) if d is not None]
+        unreadable += len(chunk) - len(valid)
+        if not valid:
+            continue
+        if len(valid) < len(chunk):
+            batch[:len(valid)] = batch[valid]
+
+        predicted = np.argmax(model.infer(batch[:len(valid)]), axis=1)
+        true = np.array([chunk[i][1] for i in valid])
+        np.add.at(confusion, (true, predicted), 1)
+
+        if render:
+            for k, i in enumerate(valid):
+                render_slots.acquire()
+                future = render_pool.submit(render_result, decoded[i], offset + i, int(true[k]),
+                                            int(predicted[k]), output_folder)
+                future.add_done_callback(release_slot)
+
+        done = offset + len(chunk)
+        if done // batch_size % 20 == 0 or done == len(items):
+            print(f"진행: {done}/{len(items)} ({done / (time.perf_counter() - start):.1f} images/sec)")
+
+    decode_pool.shutdown()
+    if render_pool is not None:
+        render_pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    total = int(confusion.sum())
+    per_class = {}
+    for idx, cls in enumerate(CLASSES):
+        support = int(confusion[idx].sum())
+        per_class[cls] = {
+            "support": support,
+            "accuracy": float(confusion[idx, idx] / support) if support else None,
+        }
+    return {
+        "model": model.name,
+        "num_images": total,
+        "unreadable": unreadable,
+        "batch_size": batch_size,
+        "accuracy": float(np.trace(confusion) / total) if total else None,
+        "per_class": per_class,
+        "confusion_matrix": {"labels": CLASSES, "rows_true_cols_pred": confusion.tolist()},
+        "elapsed_sec": elapsed,
+        "images_per_sec": total / elapsed if elapsed > 0 else None,
+        "inference_latency": model.latency.summary(),
+    }
+
+def save_summary(summary, output_folder):
+    """JSON 요약과 CSV 혼동 행렬 저장"""
+    json_path = os.path.join(output_folder, "summary.json")
+    with open(json_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    csv_path = os.path.join(output_folder, "confusion_matrix.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["true/pred"] + CLASSES + ["support", "accuracy"])
+        for cls, row in zip(CLASSES, summary["confusion_matrix"]["rows_true_cols_pred"]):
+            entry = summary["per_class"][cls]
+            writer.writerow([cls] + row + [entry["support"], entry["accuracy"]])
+    return json_path, csv_path
+
+# === 화면 시뮬레이션 (기존 방식) ===
+def run_interactive(model, data_path, image_size, output_folder, processed=False):
+    # 테스트 데이터 로드
+    X_test, y_test, file_paths, _ = load_test_data(data_path, image_size, model.input_shape[-1], processed)
+    print(f"테스트 데이터 크기: {X_test.shape}, 라벨 크기: {y_test.shape}")
+
+    for i, (image, true_label, file_path) in enumerate(zip(X_test, y_test, file_paths)):
+        # 모델 예측
+        model.input_buffer[0] = image
+        predictions = model.infer()
+        predicted_label = np.argmax(predictions)
+
+        # 원래 이미지 로드 후 실제 방향(파란색) 및 예측 방향(빨간색) 표시해서 저장
+        original_image = cv2.imread(file_path)
+        image_with_arrows, output_path = render_result(original_image, i, true_label, predicted_label,
+                                                       output_folder)
+        print(f"결과 저장: {output_path}")
+
+        # 화면에 출력 (옵션)
+        cv2.imshow("Simulation Result", image_with_arrows)
+        if cv2.waitKey(500) & 0xFF == ord('q'):  # q를 누르면 종료
+            break
+
+    # 리소스 해제
+    cv2.destroyAllWindows()
+
+def main():
+    parser = argparse.ArgumentParser(description="차선 추종 모델 시뮬레이션")
+    parser.add_argument("--headless", action="store_true", help="화면 없이 배치 단위로 평가하고 요약만 저장")
+    parser.add_argument("--batch-size", type=int, default=64, help="헤드리스 평가 배치 크기")
+    parser.add_argument("--render", action="store_true", help="헤드리스 모드에서도 결과 이미지 저장")
+    parser.add_argument("--workers", type=int, default=4, help="디코딩/렌더링 작업자 수")
+    parser.add_argument("--backend", default="keras_direct", help="vehicle.inference.BACKENDS 중 하나")
+    parser.add_argument("--model", default="/home/pi/AL_CAR/lane_following_model.h5", help="모델 파일 경로")
+    parser.add_argument("--data", default="/home/pi/AL_CAR/images", help="테스트 이미지 경로")
+    parser.add_argument("--processed", action="store_true",
+                        help="--data 가 전처리된 이진 영상이면 지정 (기본은 카메라 원본이라 주행과 같은 전체 전처리)")
+    parser.add_argument("--output", default="/home/pi/AL_CAR/simulation_output", help="결과 저장 경로")
+    args = parser.parse_args()
+
+    image_size = (64, 64)
+    os.makedirs(args.output, exist_ok=True)
+
+    # 모델 로드
+    batch_size = args.batch_size if args.headless else 1
+    model = load_backend(args.backend, args.model, batch_size=batch_size)
+    print(f"모델 로드 완료! ({model.name})")
+
+    if args.headless:
+        summary = evaluate_headless(model, args.data, image_size, args.batch_size, args.output,
+                                    render=args.render, workers=args.workers, processed=args.processed)
+        json_path, csv_path = save_summary(summary, args.output)
+        print(f"정확도: {summary['accuracy']:.4f}, 처리 속도: {summary['images_per_sec']:.1f} images/sec")
+        for cls, entry in summary["per_class"].items():
+            print(f"  {cls:<9} 정확도 {entry['accuracy']}, 이미지 {entry['support']}")
+        print(f"요약 저장: {json_path}, {csv_path}")
+    else:
+        run_interactive(model, args.data, image_size, args.output, args.processed)
+        print(f"추론 지연시간: {model.latency.summary()}")
+
+    print("시뮬레이션 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,26 @@
-import RPi.GPIO as GPIO
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.hw import open_gpio, DCMotor
 
 # 핀 번호 설정
 IN1 = 17
 IN2 = 27
 ENA = 18
 
-# GPIO 핀 모드 설정
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(ENA, GPIO.OUT)
-
-# PWM 설정
-pwm = GPIO.PWM(ENA, 100)  # ENA 핀에 대해 100Hz 주파수로 PWM 설정
-pwm.start(0)  # 처음에는 속도를 0으로 설정
+gpio = open_gpio()  # BCM 핀 번호 사용 (AL_CAR_SIMULATE_HW=1 이면 시뮬레이션)
+dc_motor = DCMotor(gpio, IN1, IN2, ENA)  # DC 모터: 100Hz PWM
 
 def motor_forward(speed):
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    pwm.ChangeDutyCycle(speed)
+    dc_motor.forward(speed)
 
 def motor_backward(speed):
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.HIGH)
-    pwm.ChangeDutyCycle(speed)
+    dc_motor.backward(speed)
 
 def motor_stop():
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    pwm.ChangeDutyCycle(0)
+    dc_motor.stop()
 
 try:
     while True:
@@ -52,5 +43,5 @@ except KeyboardInterrupt:
     print("프로그램 종료")
 
 finally:
-    pwm.stop()
-    GPIO.cleanup()                                                                          
\ No newline at end of file
+    dc_motor.close()
+    gpio.cleanup()                                                                          
\ No newline at end of file
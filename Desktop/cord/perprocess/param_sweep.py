@@ -0,0 +1,242 @@
+"""
+전처리 파라미터 스윕
+
+이진화 기준값(line_tracking_preprocessing.py 의 128), 가우시안 커널, adaptiveThreshold 블록 크기/C
+(preprocess_images_by_range_1.py 의 11, 2)를 고를 때마다 상수를 고치고 데이터셋 전체를 다시 처리하는 대신,
+- 클래스별로 뽑은 일부 이미지를 한 번만 디코딩해서 (ROI 자르기 + 그레이스케일 + 작업 폭 축소까지) .npy 캐시로 저장하고
+- 워커 프로세스들은 그 캐시를 memory-map 으로 공유(복사 없음)하며 파라미터 조합을 병렬로 평가합니다.
+이진화는 학습/주행과 같은 vehicle.preprocess.Preprocessor 로 하므로 고른 값을 그대로 옮겨 쓰면 됩니다.
+같은 표본이면 다음 실행 때 캐시를 그대로 다시 씁니다.
+
+조합마다 출력
+- 차선 픽셀 비율: 이진화 결과에서 흰 픽셀 비율의 평균/표준편차 (목표 비율에 가까울수록 좋음)
+- 덩어리 수: 연결 요소 개수 평균 (많을수록 잡음)
+- 검증 정확도: 16x16 으로 줄인 이진 영상으로 최근접 중심 분류기를 학습/검증한 정확도
+  (작은 모델로 본 클래스 구분력, 라벨 폴더가 2개 이상일 때)
+- 처리량: 조합 하나를 평가할 때의 장/s
+검증 정확도가 높은 순 (같으면 목표 비율에 가까운 순) 으로 정렬합니다.
+
+사용법: python perprocess/param_sweep.py C:\\test\\images [--sample 100] [--workers 4] [--csv sweep.csv]
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.batch_preprocess import IMAGE_EXTENSIONS
+from vehicle.preprocess import Preprocessor
+
+# 스윕할 값 (method 별)
+GRID = {
+    "adaptive": {  # preprocess_images_by_range_1.py: blur -> equalizeHist -> adaptiveThreshold
+        "blur_ksize": (3, 5, 7),
+        "block_size": (7, 11, 15, 21),
+        "thresh_c": (1, 2, 4, 6),
+    },
+    "threshold": {  # line_tracking_preprocessing.py: blur -> threshold
+        "blur_ksize": (3, 5, 7),
+        "threshold": (96, 112, 128, 144, 160),
+    },
+}
+FEATURE_SIZE = (16, 16)  # 최근접 중심 분류기 입력 크기
+
+# 워커 프로세스 전역 (initializer 에서 memory-map)
+_images = None
+_labels = None
+_target_ratio = None
+
+
+def sample_images(input_path, per_class, seed=0):
+    """클래스 폴더마다 최대 per_class 장씩 뽑기 -> ([경로], [라벨 번호], [클래스 이름])"""
+    classes = sorted(d for d in os.listdir(input_path)
+                     if not d.startswith(".") and os.path.isdir(os.path.join(input_path, d)))
+    rng = random.Random(seed)
+    paths, labels = [], []
+    for label, cls in enumerate(classes):
+        cls_dir = os.path.join(input_path, cls)
+        names = sorted(n for n in os.listdir(cls_dir) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in rng.sample(names, min(per_class, len(names))):
+            paths.append(os.path.join(cls_dir, name))
+            labels.append(label)
+    return paths, labels, classes
+
+
+def build_cache(paths, labels, cache_dir, crop_top, work_width):
+    """
+    표본을 디코딩 -> ROI 자르기 -> 그레이스케일 -> 작업 폭으로 축소 해서 하나의 uint8 배열로 저장
+    (그레이 변환은 Preprocessor 와 같은 BGR 디코딩 + cvtColor, IMREAD_GRAYSCALE 과는 값이 조금 다름)
+    :return: (이미지 .npy 경로, 라벨 .npy 경로, 디코딩 처리량 장/s 또는 캐시 재사용이면 None)
+    """
+    h = hashlib.sha1(repr((crop_top, work_width, "bgr2gray")).encode())
+    for path in paths:
+        h.update(path.encode("utf-8"))
+        h.update(str(os.stat(path).st_mtime_ns).encode())
+    key = h.hexdigest()[:12]
+    image_path = os.path.join(cache_dir, f"sweep_cache_{key}.npy")
+    label_path = os.path.join(cache_dir, f"sweep_labels_{key}.npy")
+    if os.path.exists(image_path) and os.path.exists(label_path):
+        return image_path, label_path, None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    start = time.perf_counter()
+    grays, kept = [], []
+    for path, label in zip(paths, labels):
+        image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"이미지를 읽을 수 없습니다: {path}")
+            continue
+        gray = cv2.cvtColor(image[int(image.shape[0] * crop_top):, :], cv2.COLOR_BGR2GRAY)
+        if work_width and gray.shape[1] != work_width:
+            height = max(1, round(gray.shape[0] * work_width / gray.shape[1]))
+            gray = cv2.resize(gray, (work_width, height), interpolation=cv2.INTER_AREA)
+        if grays and gray.shape != grays[0].shape:
+            # 해상도가 다른 사진은 첫 장에 맞춤
+            gray = cv2.resize(gray, (grays[0].shape[1], grays[0].shape[0]), interpolation=cv2.INTER_AREA)
+        grays.append(gray)
+        kept.append(label)
+    if not grays:
+        raise SystemExit("읽을 수 있는 이미지가 없습니다.")
+    rate = len(grays) / (time.perf_counter() - start)
+
+    np.save(label_path, np.array(kept, dtype=np.int32))
+    np.save(image_path + ".part.npy", np.stack(grays))
+    os.replace(image_path + ".part.npy", image_path)  # 중간에 끊긴 캐시는 쓰지 않음
+    return image_path, label_path, rate
+
+
+def make_configs(methods):
+    configs = []
+    for method in methods:
+        grid = GRID[method]
+        for values in itertools.product(*grid.values()):
+            configs.append(dict(zip(grid.keys(), values), method=method))
+    return configs
+
+
+def make_preprocessor(config):
+    """캐시 이미지는 이미 ROI + 작업 폭이므로 블러/이진화 단계만 하는 Preprocessor"""
+    params = {k: v for k, v in config.items() if k in ("blur_ksize", "method", "block_size", "thresh_c", "threshold")}
+    return Preprocessor(crop_top=0, work_width=None, **params)
+
+
+def nearest_centroid_accuracy(features, labels):
+    """
+    5장 중 1장을 검증용으로 두고 최근접 중심 분류 정확도 (훈련 쪽 클래스가 2개 미만이면 None)
+    훈련 쪽에 표본이 없는 클래스는 중심을 만들지 않음 (그 클래스의 검증 표본은 오답으로 셈)
+    """
+    val = np.arange(len(labels)) % 5 == 0
+    train = ~val
+    classes = np.unique(labels[train])
+    if len(classes) < 2 or not val.any():
+        return None
+    centroids = np.stack([features[train & (labels == c)].mean(axis=0) for c in classes])
+    distances = ((features[val][:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    predicted = classes[distances.argmin(axis=1)]
+    return float((predicted == labels[val]).mean())
+
+
+def _init_worker(image_path, label_path, target_ratio):
+    global _images, _labels, _target_ratio
+    _images = np.load(image_path, mmap_mode="r")  # 모든 워커가 같은 페이지 캐시를 공유
+    _labels = np.load(label_path)
+    _target_ratio = target_ratio
+    cv2.setNumThreads(1)
+
+
+def evaluate(config):
+    start = time.perf_counter()
+    count = len(_images)
+    ratios = np.empty(count, dtype=np.float64)
+    components = np.empty(count, dtype=np.float64)
+    features = np.empty((count, FEATURE_SIZE[0] * FEATURE_SIZE[1]), dtype=np.float32)
+    pre = make_preprocessor(config)
+    for i in range(count):
+        binary = pre.binarize(_images[i], cropped=True)
+        ratios[i] = cv2.countNonZero(binary) / binary.size
+        components[i] = cv2.connectedComponents(binary)[0] - 1
+        features[i] = cv2.resize(binary, FEATURE_SIZE, interpolation=cv2.INTER_AREA).ravel()
+    elapsed = time.perf_counter() - start
+    mean_ratio = float(ratios.mean())
+    return {
+        **config,
+        "lane_ratio": mean_ratio,
+        "lane_ratio_std": float(ratios.std()),
+        "components": float(components.mean()),
+        "closeness": max(0.0, 1.0 - abs(mean_ratio - _target_ratio) / _target_ratio),
+        "val_acc": nearest_centroid_accuracy(features / 255.0, _labels),
+        "images_per_sec": count / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def describe(config):
+    if config["method"] == "adaptive":
+        return f"adaptive blur={config['blur_ksize']} block={config['block_size']} C={config['thresh_c']}"
+    return f"threshold blur={config['blur_ksize']} thr={config['threshold']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 파라미터 스윕")
+    parser.add_argument("input_path", help="클래스 폴더(left/straight/right 등)가 있는 원본 이미지 경로")
+    parser.add_argument("--sample", type=int, default=100, help="클래스당 표본 수")
+    parser.add_argument("--methods", nargs="+", default=list(GRID), choices=list(GRID))
+    parser.add_argument("--crop-top", type=float, default=0.3, help="위쪽에서 잘라낼 비율")
+    parser.add_argument("--work-width", type=int, default=160, help="ROI 를 이 폭으로 줄여서 평가 (Preprocessor 의 work_width, 0 이면 원본)")
+    parser.add_argument("--target-ratio", type=float, default=0.1, help="기대하는 차선 픽셀 비율")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--cache-dir", default=None, help="디코딩 캐시 폴더 (기본: input_path/.sweep_cache)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 조합 수")
+    parser.add_argument("--csv", help="전체 결과를 저장할 CSV 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths, labels, classes = sample_images(args.input_path, args.sample, args.seed)
+    print(f"표본 {len(paths)}장 ({', '.join(classes)})")
+    cache_dir = args.cache_dir or os.path.join(args.input_path, ".sweep_cache")
+    image_path, label_path, decode_rate = build_cache(paths, labels, cache_dir, args.crop_top, args.work_width)
+    images = np.load(image_path, mmap_mode="r")
+    if decode_rate is None:
+        print(f"디코딩 캐시 재사용: {image_path} {images.shape}")
+    else:
+        print(f"디코딩 캐시 생성: {image_path} {images.shape}, {decode_rate:.1f}장/s")
+
+    configs = make_configs(args.methods)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"조합 {len(configs)}개 평가 (워커 {workers})")
+    start = time.perf_counter()
+    results = []
+    initargs = (image_path, label_path, args.target_ratio)
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        for result in pool.imap_unordered(evaluate, configs):
+            results.append(result)
+    elapsed = time.perf_counter() - start
+    total_images = len(configs) * len(images)
+    print(f"스윕 완료: {elapsed:.1f}초, 조합 {len(configs) / elapsed:.1f}개/s, "
+          f"이미지 {total_images / elapsed:.1f}장/s (전체 워커 합계)")
+
+    results.sort(key=lambda r: (r["val_acc"] if r["val_acc"] is not None else 0.0, r["closeness"]), reverse=True)
+    print(f"\n{'조합':<42} {'정확도':>6} {'차선 비율':>12} {'덩어리':>7} {'장/s':>8}")
+    for r in results[:args.top]:
+        acc = "-" if r["val_acc"] is None else f"{r['val_acc']:.3f}"
+        ratio = f"{r['lane_ratio']:.3f}±{r['lane_ratio_std']:.3f}"
+        print(f"{describe(r):<42} {acc:>6} {ratio:>12} {r['components']:>7.1f} {r['images_per_sec']:>8.1f}")
+
+    if args.csv:
+        fields = ["method"] + sorted({k for r in results for k in r} - {"method"})
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\n결과 저장: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
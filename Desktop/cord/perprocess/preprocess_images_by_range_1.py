@@ -1,52 +1,48 @@
 import os
-import cv2
-import numpy as np
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.calibration import DEFAULT_CALIBRATION_PATH, load_calibration
+from vehicle.batch_preprocess import collect_images, run_batch
+from vehicle.preprocess import Preprocessor
+
+UNDISTORT = False  # True 이면 cam_cali.py 캘리브레이션 결과로 왜곡 보정 후 전처리
+WORKERS = None     # 전처리 프로세스 수 (None 이면 CPU 수)
+
+# 전처리 파라미터 (바꾸면 다음 실행 때 전부 다시 처리)
+CROP_TOP = 0.3       # 위쪽에서 잘라낼 비율
+WORK_WIDTH = 160     # 블러/이진화를 할 ROI 폭 (주행 중 1/4 JPEG 디코딩 프레임과 같은 해상도)
+BLUR_KSIZE = 5       # 가우시안 블러 커널 크기
+BLOCK_SIZE = 11      # adaptiveThreshold 블록 크기
+THRESH_C = 2         # adaptiveThreshold 상수 C
+
+# 학습/주행 공용 전처리 커널 (vehicle/preprocess.py)
+preprocessor = Preprocessor(crop_top=CROP_TOP, work_width=WORK_WIDTH, blur_ksize=BLUR_KSIZE,
+                            method="adaptive", block_size=BLOCK_SIZE, thresh_c=THRESH_C)
+PREPROCESS_PARAMS = {**preprocessor.params(), "undistort": UNDISTORT}
+
+_undistort = None  # 워커 프로세스마다 처음 쓸 때 캘리브레이션 로드
 
 def preprocess_image(image):
     """
     이미지 전처리 함수:
     - 상단 30% 자르기
     - 그레이스케일 변환
+    - 작업 폭으로 축소
     - 가우시안 블러
     - 히스토그램 균등화
     - Adaptive Thresholding
     """
-    # 이미지 크기 가져오기
-    height, width, _ = image.shape
-
-    # 상단 30% 자르기
-    roi = image[int(height * 0.3):, :]  # 상단 30% 제거
-
-    # 그레이스케일 변환
-    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-
-    # 가우시안 블러 적용 (노이즈 제거)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-
-    # 히스토그램 균등화 (명암비 개선)
-    equalized = cv2.equalizeHist(blurred)
-
-    # Adaptive Thresholding 적용 (더 나은 이진화)
-    binary = cv2.adaptiveThreshold(
-        equalized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2
-    )
+    return preprocessor.binarize(image)
 
-    return binary
-
-def save_preprocessed_image(image, save_path, folder_name, image_name):
-    """
-    전처리된 이미지를 저장하는 함수
-    """
-    folder_path = os.path.join(save_path, folder_name)
-    os.makedirs(folder_path, exist_ok=True)
-
-    filename = f"processed_{image_name}"
-    full_path = os.path.join(folder_path, filename)
-
-    if cv2.imwrite(full_path, image):
-        print(f"전처리된 이미지 저장 성공: {full_path}")
-    else:
-        print(f"이미지 저장 실패: {full_path}")
+def process_image(image):
+    """워커에서 호출: (왜곡 보정) + 전처리"""
+    global _undistort
+    if UNDISTORT:
+        if _undistort is None:
+            _undistort = load_calibration(DEFAULT_CALIBRATION_PATH).undistorter()
+        image = _undistort(image)
+    return preprocess_image(image)
 
 def main():
     # 원본 이미지 경로 및 저장 경로 설정
@@ -57,26 +53,9 @@ def main():
     # 클래스 정의
     classes = ["left", "straight", "right"]  # 클래스 이름
 
-    # 각 클래스 폴더에서 이미지 읽기 및 전처리 수행
-    for cls in classes:
-        input_dir = os.path.join(input_path, cls)
-        output_dir = os.path.join(output_path, cls)
-        os.makedirs(output_dir, exist_ok=True)
-
-        for img_name in os.listdir(input_dir):
-            img_path = os.path.join(input_dir, img_name)
-
-            # 이미지 읽기
-            image = cv2.imread(img_path)
-            if image is None:
-                print(f"이미지를 읽을 수 없습니다: {img_path}")
-                continue
-
-            # 전처리 수행
-            processed_image = preprocess_image(image)
-
-            # 전처리된 이미지 저장
-            save_preprocessed_image(processed_image, output_path, cls, img_name)
+    # 프로세스 풀로 병렬 전처리, 이전 실행 이후 바뀌지 않은 이미지는 건너뜀
+    jobs = collect_images(input_path, output_path, classes)
+    run_batch(jobs, process_image, PREPROCESS_PARAMS, workers=WORKERS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,44 @@
+"""
+학습 샘플 목록/분할: 녹화 라벨이 학습 클래스와 다를 때
+
+사용법: python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.dataset import list_samples, stratified_split
+from vehicle.recording import RecordingWriter
+
+JPEG = b"\xff\xd8fake-jpeg\xff\xd9"
+
+
+def write_range_recording(directory):
+    # curve_training.py 처럼 range_i 라벨로 녹화
+    with RecordingWriter(directory, labels=["range_0", "range_1"]) as writer:
+        for i in range(5):
+            writer.append(JPEG, label=f"range_{i % 2}")
+
+
+def test_unknown_recording_labels(tmp_path):
+    write_range_recording(str(tmp_path))
+    with pytest.raises(ValueError, match="range_0"):
+        list_samples(str(tmp_path))
+
+
+def test_label_map(tmp_path):
+    write_range_recording(str(tmp_path))
+    with list_samples(str(tmp_path), label_map={"range_0": "left", "range_1": "right"}) as samples:
+        assert samples.labels.tolist() == [0, 2, 0, 2, 0]
+
+
+def test_stratified_split():
+    labels = np.array([0] * 10 + [1] * 5 + [2] * 5)
+    train, val = stratified_split(labels, val_fraction=0.2, seed=0)
+    assert np.bincount(labels[val]).tolist() == [2, 1, 1]
+    assert len(np.intersect1d(train, val)) == 0 and len(train) + len(val) == len(labels)
+    with pytest.raises(ValueError):
+        stratified_split(np.array([], dtype=np.int64))
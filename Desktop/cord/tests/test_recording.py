@@ -0,0 +1,60 @@
+"""
+녹화 샤드 읽기: 전원 차단으로 빈 파일/잘린 헤더/잘린 레코드가 남아도 디렉터리 전체를 읽을 수 있는지
+
+사용법: python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vehicle.recording import (MAGIC, META_HEADER, RECORD_HEADER, RECORD_TAG, Recording,
+                               RecordingWriter, ShardReader)
+
+JPEG = b"\xff\xd8fake-jpeg\xff\xd9"
+
+
+def write_good_shard(directory):
+    with RecordingWriter(directory, labels=["left", "straight", "right"], prefix="a") as writer:
+        for label in ("left", "straight", "right"):
+            writer.append(JPEG, angle=90.0, speed=50.0, label=label)
+
+
+def test_empty_shard(tmp_path):
+    write_good_shard(str(tmp_path))
+    open(tmp_path / "b_0000.rec", "wb").close()
+
+    shard = ShardReader(str(tmp_path / "b_0000.rec"))
+    assert shard.recovered and len(shard) == 0
+    shard.close()
+
+    with Recording(str(tmp_path)) as recording:
+        assert len(recording) == 3
+        assert recording[0].jpeg == JPEG
+
+
+def test_truncated_header(tmp_path):
+    write_good_shard(str(tmp_path))
+    with open(tmp_path / "b_0000.rec", "wb") as f:
+        f.write(MAGIC[:5])  # 헤더 일부
+    with open(tmp_path / "c_0000.rec", "wb") as f:
+        f.write(META_HEADER.pack(MAGIC, 100) + b'{"labels": [')  # 메타 JSON 일부
+
+    with Recording(str(tmp_path)) as recording:
+        assert len(recording) == 3
+        assert [recording.label_name(f.label) for f in recording] == ["left", "straight", "right"]
+
+
+def test_recovered_shard_bad_label(tmp_path):
+    # 트레일러 없이 끊긴 샤드, 라벨 번호가 라벨 목록 범위 밖
+    meta = b'{"labels": ["left"]}'
+    with open(tmp_path / "a_0000.rec", "wb") as f:
+        f.write(META_HEADER.pack(MAGIC, len(meta)) + meta)
+        for label in (0, 7, -5):
+            f.write(RECORD_HEADER.pack(RECORD_TAG, 1.0, 90.0, 0.0, label, len(JPEG)) + JPEG)
+
+    with Recording(str(tmp_path)) as recording:
+        assert recording.shards[0].recovered
+        assert recording.index["label"].tolist() == [0, -1, -1]
+        assert np.all(recording.index["length"] == len(JPEG))
@@ -0,0 +1,4 @@
+"""
+AL_CAR 공용 모듈 모음
+- 카메라 스트림, 전처리, 추론, 구동 제어 등 여러 스크립트가 함께 쓰는 코드
+"""
@@ -0,0 +1,122 @@
+"""
+논블로킹 구동 스레드
+
+set_servo_angle 의 대기 시간(0.1~0.3초)이 제어 루프나 키보드 콜백을 막지 않도록,
+서보/모터 명령을 별도 스레드에서 적용합니다.
+- set_angle / set_speed 는 목표값만 기록하고 바로 반환
+- 적용 전에 새 명령이 오면 이전 명령은 버리고 가장 최신 목표만 적용 (coalescing)
+- 현재 값과 같은 목표는 듀티 사이클을 다시 쓰지 않음
+"""
+import threading
+from contextlib import nullcontext
+
+
+class Actuator:
+    """서보모터 각도 / DC 모터 속도 명령을 처리하는 스레드"""
+
+    def __init__(self, servo=None, motor=None, batch=None):
+        """
+        :param servo: vehicle.hw.Servo / PcaServo (set_angle(angle), angle 속성)
+        :param motor: vehicle.hw.DCMotor (drive(speed), speed 속성)
+        :param batch: 서보와 모터가 같은 PCA9685 를 쓸 때 공유하는 PwmBatch (한 번의 I2C 쓰기로 함께 전송)
+        """
+        self.servo = servo
+        self.motor = motor
+        self.batch = batch
+        self._cond = threading.Condition()
+        self._pending_angle = None
+        self._pending_speed = None
+        self._busy = False
+        self._running = False
+        self._thread = None
+
+        # 통계
+        self.commands = 0  # 받은 명령 수
+        self.applied = 0   # 실제로 듀티 사이클을 쓴 명령 수
+        self.dropped = 0   # 적용 전에 더 새로운 명령으로 대체된 명령 수
+        self.skipped = 0   # 현재 값과 같아서 건너뛴 명령 수
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="actuator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """대기 중인 명령을 적용한 뒤 스레드 종료"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def set_angle(self, angle):
+        """서보모터 목표 각도 (바로 반환)"""
+        with self._cond:
+            if self._pending_angle is not None:
+                self.dropped += 1
+            self._pending_angle = angle
+            self.commands += 1
+            self._cond.notify()
+
+    def set_speed(self, speed):
+        """DC 모터 목표 속도 (바로 반환, 음수는 후진)"""
+        with self._cond:
+            if self._pending_speed is not None:
+                self.dropped += 1
+            self._pending_speed = speed
+            self.commands += 1
+            self._cond.notify()
+
+    def flush(self, timeout=None):
+        """대기 중인 명령이 모두 적용될 때까지 대기. 완료되면 True"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._pending_angle is None and self._pending_speed is None and not self._busy,
+                timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending_angle is not None
+                                    or self._pending_speed is not None or not self._running)
+                angle, self._pending_angle = self._pending_angle, None
+                speed, self._pending_speed = self._pending_speed, None
+                if angle is None and speed is None and not self._running:
+                    self._cond.notify_all()
+                    return
+                self._busy = True
+
+            try:
+                self._apply(angle, speed)
+            except Exception as e:
+                print(f"구동 명령 적용 중 에러 발생: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _apply(self, angle, speed):
+        with self.batch.deferred() if self.batch is not None else nullcontext():
+            # 모터는 즉시 적용되므로 먼저, 소프트웨어 PWM 서보는 hold 시간이 걸리므로 나중에
+            if speed is not None and self.motor is not None:
+                if speed == self.motor.speed:
+                    self.skipped += 1
+                else:
+                    self.motor.drive(speed)
+                    self.applied += 1
+            if angle is not None and self.servo is not None:
+                if angle == self.servo.angle:
+                    self.skipped += 1
+                else:
+                    self.servo.set_angle(angle)
+                    self.applied += 1
+
+    def stats(self):
+        return {
+            "commands": self.commands,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+        }
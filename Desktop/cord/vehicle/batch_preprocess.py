@@ -0,0 +1,205 @@
+"""
+병렬 + 증분 일괄 전처리
+
+클래스 폴더의 이미지를 프로세스 풀에 나눠 전처리하고, 매니페스트 파일에
+(원본 경로 -> 수정 시각, 크기, 내용 해시, 전처리 파라미터, 출력 경로)를 기록합니다.
+다시 실행하면
+- 수정 시각/크기/파라미터가 같고 출력 파일이 있으면 파일을 열지도 않고 건너뜀
+- 수정 시각만 바뀐 경우(다른 PC 로 복사 등)는 워커가 내용 해시를 비교해서 같으면 건너뜀
+- 파라미터가 바뀌면 전부 다시 처리
+그래서 촬영 한 번 뒤에 다시 돌리면 새 프레임만 처리합니다.
+진행 상황은 파일마다가 아니라 progress_interval 초마다 한 줄로 출력합니다.
+
+    jobs = collect_images(input_path, output_path, classes=["left", "straight", "right"])
+    run_batch(jobs, process_image, params={"block_size": 11, "C": 2})
+
+transform 은 워커 프로세스로 넘어가므로 모듈 최상위 함수여야 합니다 (람다/클로저 불가).
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+MANIFEST_NAME = ".preprocess_manifest.json"
+MANIFEST_VERSION = 1
+
+# 워커 프로세스 전역 (initializer 에서 한 번 설정)
+_transform = None
+
+
+def collect_images(input_path, output_path, classes=None, prefix="processed_"):
+    """
+    (원본 경로, 출력 경로) 목록
+    :param classes: 처리할 하위 폴더 이름 목록, None 이면 input_path 안의 모든 폴더
+    """
+    if classes is None:
+        # 숨김 폴더(.sweep_cache 등)는 제외
+        classes = sorted(d for d in os.listdir(input_path)
+                         if not d.startswith(".") and os.path.isdir(os.path.join(input_path, d)))
+    jobs = []
+    for cls in classes:
+        input_dir = os.path.join(input_path, cls)
+        output_dir = os.path.join(output_path, cls)
+        for name in sorted(os.listdir(input_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                jobs.append((os.path.join(input_dir, name), os.path.join(output_dir, prefix + name)))
+    return jobs
+
+
+def params_key(params):
+    """파라미터 dict -> 비교용 문자열 (키 순서 무관)"""
+    return json.dumps(params, sort_keys=True)
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"매니페스트를 읽을 수 없어 전부 다시 처리합니다: {e}")
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_manifest(path, entries):
+    """임시 파일에 쓰고 교체 (중간에 끊겨도 이전 매니페스트가 남음)"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "entries": entries}, f)
+    os.replace(tmp, path)
+
+
+def _init_worker(transform):
+    global _transform
+    _transform = transform
+    cv2.setNumThreads(1)  # 프로세스 여러 개가 코어를 나눠 쓰므로 OpenCV 내부 스레드는 끔
+
+
+def _run_job(job):
+    """
+    워커에서 이미지 하나 처리
+    :return: (원본 경로, 상태, 내용 해시, 에러 메시지). 상태는 "done" / "unchanged" / "failed"
+    """
+    src, dst, old_hash = job
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return src, "failed", None, str(e)
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == old_hash and os.path.exists(dst):
+        return src, "unchanged", digest, None
+
+    # imread 대신 바이트를 디코딩 (경로에 한글이 있어도 동작)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return src, "failed", digest, "이미지를 읽을 수 없습니다"
+    try:
+        processed = _transform(image)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        ok, encoded = cv2.imencode(os.path.splitext(dst)[1], processed)
+        if not ok:
+            return src, "failed", digest, "인코딩 실패"
+        with open(dst, "wb") as f:
+            f.write(encoded.tobytes())
+    except Exception as e:
+        return src, "failed", digest, str(e)
+    return src, "done", digest, None
+
+
+def run_batch(jobs, transform, params, manifest_path=None, workers=None, chunksize=8,
+              progress_interval=2.0):
+    """
+    jobs 를 병렬로 전처리 (바뀌지 않은 이미지는 건너뜀)
+    :param jobs: collect_images() 결과 [(원본 경로, 출력 경로)]
+    :param transform: BGR 이미지 -> 전처리 결과 (모듈 최상위 함수)
+    :param params: 전처리 파라미터 dict (바뀌면 전부 다시 처리)
+    :param manifest_path: 기본값은 첫 출력 경로의 상위(출력 루트) 폴더의 MANIFEST_NAME
+    :param workers: 프로세스 수 (기본: CPU 수), 1 이면 현재 프로세스에서 처리
+    :return: {"total", "done", "skipped", "failed", "seconds", "images_per_sec"}
+    """
+    if manifest_path is None:
+        root = os.path.dirname(os.path.dirname(jobs[0][1])) if jobs else "."
+        manifest_path = os.path.join(root, MANIFEST_NAME)
+    workers = workers or os.cpu_count() or 1
+    key = params_key(params)
+    entries = load_manifest(manifest_path)
+
+    # 1) 수정 시각/크기/파라미터만으로 건너뛸 수 있는 이미지 거르기 (파일을 열지 않음)
+    pending = []
+    stat_of = {}
+    skipped = 0
+    for src, dst in jobs:
+        st = os.stat(src)
+        stat_of[src] = (st.st_mtime_ns, st.st_size, dst)
+        entry = entries.get(src)
+        if entry is not None and entry["params"] == key and entry["output"] == dst:
+            if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size and os.path.exists(dst):
+                skipped += 1
+                continue
+            pending.append((src, dst, entry["sha1"]))  # 내용이 같으면 워커가 건너뜀
+        else:
+            pending.append((src, dst, None))
+
+    total = len(jobs)
+    print(f"전처리 대상 {total}장: 건너뜀 {skipped}, 처리 {len(pending)} (워커 {workers})")
+    counts = {"done": 0, "unchanged": 0, "failed": 0}
+    start = last_report = time.monotonic()
+
+    def record(result):
+        nonlocal last_report
+        src, status, digest, error = result
+        counts[status] += 1
+        if status == "failed":
+            print(f"전처리 실패: {src} ({error})")
+            entries.pop(src, None)
+        else:
+            mtime_ns, size, dst = stat_of[src]
+            entries[src] = {"mtime_ns": mtime_ns, "size": size, "sha1": digest, "params": key, "output": dst}
+        now = time.monotonic()
+        if now - last_report >= progress_interval:
+            last_report = now
+            _report_progress(counts, len(pending), now - start)
+            save_manifest(manifest_path, entries)  # 중간에 멈춰도 여기까지는 다시 처리하지 않음
+
+    if pending:
+        if workers == 1:
+            _init_worker(transform)
+            for job in pending:
+                record(_run_job(job))
+        else:
+            with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(transform,)) as pool:
+                for result in pool.imap_unordered(_run_job, pending, chunksize=chunksize):
+                    record(result)
+    save_manifest(manifest_path, entries)
+
+    seconds = time.monotonic() - start
+    processed = counts["done"] + counts["unchanged"] + counts["failed"]
+    stats = {
+        "total": total,
+        "done": counts["done"],
+        "skipped": skipped + counts["unchanged"],
+        "failed": counts["failed"],
+        "seconds": seconds,
+        "images_per_sec": processed / seconds if seconds > 0 else 0.0,
+    }
+    print(f"전처리 완료: 처리 {stats['done']}, 건너뜀 {stats['skipped']}, 실패 {stats['failed']}, "
+          f"{seconds:.1f}초 ({stats['images_per_sec']:.1f}장/s)")
+    return stats
+
+
+def _report_progress(counts, pending, elapsed):
+    finished = counts["done"] + counts["unchanged"] + counts["failed"]
+    rate = finished / elapsed if elapsed > 0 else 0.0
+    remaining = (pending - finished) / rate if rate > 0 else 0.0
+    print(f"  진행 {finished}/{pending} ({finished / pending * 100:.1f}%), 처리 {counts['done']}, "
+          f"내용 같음 {counts['unchanged']}, 실패 {counts['failed']}, {rate:.1f}장/s, 남은 시간 약 {remaining:.0f}초")
@@ -0,0 +1,229 @@
+"""
+카메라 왜곡 보정 (remap 테이블 캐시)
+
+cv2.getOptimalNewCameraMatrix + cv2.undistort 는 매 프레임마다 왜곡 모델 전체를 다시 계산합니다.
+Undistorter 는 (카메라, 해상도, alpha) 마다 initUndistortRectifyMap 으로 고정소수점(CV_16SC2)
+remap 테이블을 한 번만 만들고 디스크에 캐시해 두므로, 프레임당 비용은 cv2.remap 한 번과 ROI 자르기뿐입니다.
+
+캘리브레이션 결과(cam_cali.py)는 버전이 붙은 npz 파일로 저장되며,
+스트리밍/주행/전처리 코드는 load_calibration() 으로 시작할 때 바로 읽어 씁니다.
+"""
+import datetime
+import hashlib
+import os
+
+import cv2
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/AL_CAR/calibration/cache")
+DEFAULT_CALIBRATION_PATH = os.path.expanduser("~/AL_CAR/calibration/camera0.npz")
+CALIBRATION_VERSION = 1
+
+
+def calibration_key(camera_matrix, dist_coeffs):
+    """카메라 매트릭스와 왜곡 계수로 만든 짧은 해시 (값이 바뀌면 캐시 무효화)"""
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(camera_matrix, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(dist_coeffs, dtype=np.float64).tobytes())
+    return h.hexdigest()[:12]
+
+
+def scale_camera_matrix(camera_matrix, calib_size, size):
+    """캘리브레이션 해상도와 다른 해상도로 스트리밍할 때 카메라 매트릭스를 비율에 맞춰 조정"""
+    if calib_size is None or tuple(calib_size) == tuple(size):
+        return camera_matrix
+    sx = size[0] / calib_size[0]
+    sy = size[1] / calib_size[1]
+    scaled = np.array(camera_matrix, dtype=np.float64)
+    scaled[0, :] *= sx
+    scaled[1, :] *= sy
+    return scaled
+
+
+def build_undistort_maps(camera_matrix, dist_coeffs, size, alpha=1.0):
+    """
+    remap 테이블을 계산합니다.
+    :param size: 프레임 크기 (width, height)
+    :param alpha: 0 이면 유효 픽셀만, 1 이면 원본 픽셀을 모두 남김
+    :return: (map1, map2, roi) - map1/map2 는 CV_16SC2 고정소수점 테이블, roi 는 (x, y, w, h)
+    """
+    new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(camera_matrix, dist_coeffs, size, alpha, size)
+    map1, map2 = cv2.initUndistortRectifyMap(camera_matrix, dist_coeffs, None, new_camera_matrix,
+                                             size, cv2.CV_16SC2)
+    return map1, map2, tuple(int(v) for v in roi)
+
+
+class Undistorter:
+    """
+    프레임 왜곡 보정기
+
+    프레임 크기별 remap 테이블을 메모리와 디스크(cache_dir)에 캐시합니다.
+    cache_dir 를 None 으로 주면 디스크 캐시를 쓰지 않습니다.
+    calib_size 를 주면 다른 해상도의 프레임은 카메라 매트릭스를 비율에 맞춰 조정합니다.
+    """
+
+    def __init__(self, camera_matrix, dist_coeffs, alpha=1.0, camera="camera0", cache_dir=DEFAULT_CACHE_DIR,
+                 calib_size=None):
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.alpha = alpha
+        self.camera = camera
+        self.cache_dir = cache_dir
+        self.calib_size = tuple(calib_size) if calib_size is not None else None
+        self._key = calibration_key(self.camera_matrix, self.dist_coeffs)
+        self._maps = {}  # (width, height) -> (map1, map2, roi)
+
+    def preload(self, size, map1, map2, roi):
+        """미리 계산된 remap 테이블 등록 (캘리브레이션 파일에 들어 있는 테이블 등)"""
+        self._maps[tuple(size)] = (map1, map2, tuple(int(v) for v in roi))
+
+    def _cache_path(self, size):
+        name = f"undistort_{self.camera}_{size[0]}x{size[1]}_a{self.alpha:g}_{self._key}.npz"
+        return os.path.join(self.cache_dir, name)
+
+    def maps_for(self, size):
+        """(width, height) 크기에 맞는 remap 테이블 (메모리 -> 디스크 -> 계산 순서로 찾음)"""
+        maps = self._maps.get(size)
+        if maps is not None:
+            return maps
+
+        path = self._cache_path(size) if self.cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    maps = (data["map1"], data["map2"], tuple(int(v) for v in data["roi"]))
+            except (OSError, KeyError, ValueError) as e:
+                print(f"remap 캐시를 읽을 수 없어 다시 계산합니다: {path} ({e})")
+                maps = None
+
+        if maps is None:
+            camera_matrix = scale_camera_matrix(self.camera_matrix, self.calib_size, size)
+            maps = build_undistort_maps(camera_matrix, self.dist_coeffs, size, self.alpha)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = path + ".tmp.npz"
+                np.savez(tmp_path, map1=maps[0], map2=maps[1], roi=np.array(maps[2]))
+                os.replace(tmp_path, path)
+
+        self._maps[size] = maps
+        return maps
+
+    def __call__(self, frame, crop=True, interpolation=cv2.INTER_LINEAR):
+        """
+        프레임의 왜곡을 보정합니다.
+        :param crop: True 이면 유효 영역(ROI)만 잘라서 반환 (복사 없는 view)
+        """
+        h, w = frame.shape[:2]
+        map1, map2, roi = self.maps_for((w, h))
+        undistorted = cv2.remap(frame, map1, map2, interpolation)
+        if not crop:
+            return undistorted
+        x, y, rw, rh = roi
+        if rw == 0 or rh == 0:
+            return undistorted
+        return undistorted[y:y+rh, x:x+rw]
+
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """파일 내용의 SHA1 해시"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_source_images(paths=None, digests=None):
+    """
+    캘리브레이션에 사용한 이미지들의 내용 해시 (파일 이름 순서와 무관)
+    이미 계산한 이미지별 해시가 있으면 digests 로 넘겨서 다시 읽지 않게 할 수 있습니다.
+    """
+    if digests is None:
+        digests = [file_sha1(path) for path in paths]
+    h = hashlib.sha1()
+    for digest in sorted(digests):
+        h.update(digest.encode())
+    return h.hexdigest()
+
+
+class Calibration:
+    """저장된 캘리브레이션 결과"""
+
+    def __init__(self, camera_matrix, dist_coeffs, image_size, rms, source_hash="", num_images=0,
+                 created="", maps=None):
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.image_size = tuple(int(v) for v in image_size)  # (width, height)
+        self.rms = float(rms)               # 재투영 오차 (픽셀)
+        self.source_hash = source_hash      # 사용한 이미지 세트의 해시
+        self.num_images = int(num_images)   # 코너를 찾은 이미지 수
+        self.created = created
+        self.maps = maps or {}              # alpha -> (map1, map2, roi), image_size 기준
+
+    def undistorter(self, alpha=1.0, cache_dir=DEFAULT_CACHE_DIR, camera="camera0"):
+        """이 캘리브레이션으로 Undistorter 생성 (파일에 저장된 remap 테이블을 바로 사용)"""
+        undistort = Undistorter(self.camera_matrix, self.dist_coeffs, alpha=alpha, camera=camera,
+                                cache_dir=cache_dir, calib_size=self.image_size)
+        if alpha in self.maps:
+            undistort.preload(self.image_size, *self.maps[alpha])
+        return undistort
+
+    def __repr__(self):
+        return (f"Calibration(image_size={self.image_size}, rms={self.rms:.4f}, "
+                f"images={self.num_images}, created={self.created!r})")
+
+
+def save_calibration(path, calibration, alphas=(1.0,)):
+    """
+    캘리브레이션 결과를 버전이 붙은 npz 파일로 저장합니다.
+    alphas 에 지정한 값마다 image_size 기준 remap 테이블을 미리 계산해서 함께 저장합니다.
+    """
+    data = {
+        "version": np.array(CALIBRATION_VERSION),
+        "camera_matrix": calibration.camera_matrix,
+        "dist_coeffs": calibration.dist_coeffs,
+        "image_size": np.array(calibration.image_size),
+        "rms": np.array(calibration.rms),
+        "source_hash": np.array(calibration.source_hash),
+        "num_images": np.array(calibration.num_images),
+        "created": np.array(calibration.created or datetime.datetime.now().isoformat(timespec="seconds")),
+        "alphas": np.array(alphas, dtype=np.float64),
+    }
+    for i, alpha in enumerate(alphas):
+        map1, map2, roi = calibration.maps.get(alpha) or build_undistort_maps(
+            calibration.camera_matrix, calibration.dist_coeffs, calibration.image_size, alpha)
+        calibration.maps[alpha] = (map1, map2, roi)
+        data[f"map1_{i}"] = map1
+        data[f"map2_{i}"] = map2
+        data[f"roi_{i}"] = np.array(roi)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **data)
+    os.replace(tmp_path, path)
+
+
+def load_calibration(path=DEFAULT_CALIBRATION_PATH):
+    """
+    save_calibration() 으로 저장한 파일을 읽습니다.
+    :raises FileNotFoundError: 파일이 없을 때
+    :raises ValueError: 지원하지 않는 버전일 때
+    """
+    with np.load(path) as data:
+        version = int(data["version"])
+        if version != CALIBRATION_VERSION:
+            raise ValueError(f"지원하지 않는 캘리브레이션 파일 버전입니다: {version} ({path})")
+        maps = {}
+        for i, alpha in enumerate(data["alphas"]):
+            maps[float(alpha)] = (data[f"map1_{i}"], data[f"map2_{i}"],
+                                  tuple(int(v) for v in data[f"roi_{i}"]))
+        return Calibration(
+            camera_matrix=data["camera_matrix"],
+            dist_coeffs=data["dist_coeffs"],
+            image_size=data["image_size"],
+            rms=float(data["rms"]),
+            source_hash=str(data["source_hash"]),
+            num_images=int(data["num_images"]),
+            created=str(data["created"]),
+            maps=maps,
+        )
@@ -0,0 +1,145 @@
+"""
+체스보드 코너 검출 (병렬 + 증분)
+
+- 축소 이미지에서 findChessboardCorners 로 빠르게 찾고, 원본 해상도에서 cornerSubPix 로 정밀화
+- 이미지 내용 해시를 키로 이미지별 결과를 캐시하므로, 다시 실행하면 새로 추가되거나 바뀐 이미지만 처리
+- 캐시에 없는 이미지는 프로세스 풀에서 병렬로 처리
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from vehicle.calibration import file_sha1
+
+DEFAULT_CORNER_CACHE_DIR = os.path.expanduser("~/AL_CAR/calibration/corners")
+CORNER_CACHE_VERSION = 1
+
+# 코너 정밀화 종료 기준
+SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+# 축소 검출 시 긴 변의 최대 길이
+DETECT_MAX_SIDE = 640
+
+# 축소 이미지 검출 플래그 (원본 해상도 재시도는 OpenCV 기본값)
+DETECT_FLAGS = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE + cv2.CALIB_CB_FAST_CHECK
+
+
+class CornerResult:
+    """이미지 한 장의 코너 검출 결과"""
+
+    __slots__ = ("path", "sha1", "found", "corners", "image_size")
+
+    def __init__(self, path, sha1, found, corners, image_size):
+        self.path = path
+        self.sha1 = sha1
+        self.found = found            # 체스보드를 찾았는지 여부
+        self.corners = corners        # (N, 1, 2) float32, 못 찾았으면 None
+        self.image_size = image_size  # (width, height), 이미지를 못 읽었으면 None
+
+
+def detect_corners(path, pattern=(8, 6), max_side=DETECT_MAX_SIDE, flags=DETECT_FLAGS):
+    """
+    이미지 한 장에서 체스보드 코너를 찾습니다.
+    :return: (found, corners, image_size)
+    """
+    gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return False, None, None
+    h, w = gray.shape
+    image_size = (w, h)
+
+    corners = None
+    scale = max(h, w) / max_side
+    if scale > 1:
+        # 1단계: 축소 이미지에서 빠르게 검출
+        small = cv2.resize(gray, (int(round(w / scale)), int(round(h / scale))), interpolation=cv2.INTER_AREA)
+        ret, small_corners = cv2.findChessboardCorners(small, pattern, flags)
+        if ret:
+            corners = (small_corners * np.float32(scale)).astype(np.float32)
+    if corners is None:
+        # 축소 검출 실패 (또는 이미 작은 이미지) -> 원본 해상도에서 검출
+        ret, corners = cv2.findChessboardCorners(gray, pattern, None)
+        if not ret:
+            return False, None, image_size
+
+    # 2단계: 원본 해상도에서 서브픽셀 정밀화
+    corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), SUBPIX_CRITERIA)
+    return True, corners, image_size
+
+
+def _cache_path(cache_dir, sha1, pattern, max_side, flags):
+    # 검출 설정이 바뀌면 다른 캐시 파일 (이전 설정으로 찾은 코너를 재사용하지 않음)
+    return os.path.join(cache_dir, f"{sha1}_{pattern[0]}x{pattern[1]}_m{max_side}_f{int(flags)}"
+                                   f"_v{CORNER_CACHE_VERSION}.npz")
+
+
+def _load_cached(path, sha1, cache_file):
+    try:
+        with np.load(cache_file) as data:
+            found = bool(data["found"])
+            corners = data["corners"] if found else None
+            size = tuple(int(v) for v in data["image_size"]) or None
+    except (OSError, KeyError, ValueError):
+        return None
+    return CornerResult(path, sha1, found, corners, size)
+
+
+def _save_cached(cache_file, result):
+    tmp_file = cache_file + ".tmp.npz"
+    np.savez(tmp_file,
+             found=np.array(result.found),
+             corners=result.corners if result.found else np.zeros((0, 1, 2), np.float32),
+             image_size=np.array(result.image_size or (), dtype=np.int64))
+    os.replace(tmp_file, cache_file)
+
+
+def _detect_job(args):
+    path, pattern, max_side, flags = args
+    return detect_corners(path, pattern, max_side, flags)
+
+
+def detect_all(paths, pattern=(8, 6), cache_dir=DEFAULT_CORNER_CACHE_DIR, workers=None,
+               max_side=DETECT_MAX_SIDE, flags=DETECT_FLAGS, progress=None):
+    """
+    여러 이미지의 코너를 찾습니다. 캐시에 있는 이미지는 건너뜁니다.
+    :param workers: 프로세스 수 (None 이면 CPU 코어 수, 1 이면 현재 프로세스에서 처리)
+    :param progress: progress(result, cached) 형태로 이미지마다 호출되는 함수
+    :return: paths 순서대로 정렬된 CornerResult 리스트
+    """
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results = {}
+    pending = []
+    for path in paths:
+        sha1 = file_sha1(path)
+        cache_file = _cache_path(cache_dir, sha1, pattern, max_side, flags) if cache_dir else None
+        cached = _load_cached(path, sha1, cache_file) if cache_file and os.path.exists(cache_file) else None
+        if cached is not None:
+            results[path] = cached
+            if progress:
+                progress(cached, True)
+        else:
+            pending.append((path, sha1, cache_file))
+
+    def finish(item, detected):
+        path, sha1, cache_file = item
+        result = CornerResult(path, sha1, *detected)
+        if cache_file:
+            _save_cached(cache_file, result)
+        results[path] = result
+        if progress:
+            progress(result, False)
+
+    jobs = [(path, pattern, max_side, flags) for path, _, _ in pending]
+    if workers == 1 or len(jobs) <= 1:
+        for item, job in zip(pending, jobs):
+            finish(item, _detect_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for item, detected in zip(pending, executor.map(_detect_job, jobs, chunksize=4)):
+                finish(item, detected)
+
+    return [results[path] for path in paths]
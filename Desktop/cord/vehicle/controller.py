@@ -0,0 +1,86 @@
+"""
+조향 제어기
+
+모델 출력(클래스 확률 또는 연속 조향값)을 목표 각도로 바꾸고,
+저역통과 필터 + PID + 각속도 제한으로 매 제어 주기마다 서보 명령 각도를 만듭니다.
+±ANGLE_INCREMENT 계단 방식과 달리 한 번의 판단으로도 목표까지 연속적으로 움직이고,
+직진 판단에서 각도가 한 번에 튀지 않아 곡선에서 진동이 줄어듭니다.
+
+    controller = SteeringController()
+    target = decision_to_angle(probabilities)       # [p_left, p_straight, p_right]
+    angle = controller.update(target, dt=1 / 30)    # 제어 주기마다 호출
+"""
+
+CENTER_ANGLE = 30              # 직진 각도
+CLASS_ANGLES = (0, 30, 60)     # left, straight, right 클래스의 대표 각도
+
+
+def clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+def decision_to_angle(output, class_angles=CLASS_ANGLES, center=CENTER_ANGLE):
+    """
+    모델 출력 -> 목표 각도
+    :param output: 클래스 확률 [p_left, p_straight, p_right] -> 확률 가중 평균 각도
+                   또는 연속 조향값 하나 [s] (-1 왼쪽 끝 ~ 1 오른쪽 끝) -> 중심 기준 선형 변환
+    """
+    if len(output) == 1:
+        s = clamp(float(output[0]), -1.0, 1.0)
+        half_range = (class_angles[-1] - class_angles[0]) / 2
+        return center + s * half_range
+    total = float(sum(output))
+    if total <= 0:
+        return center
+    return sum(float(p) * a for p, a in zip(output, class_angles)) / total
+
+
+class SteeringController:
+    """목표 각도 저역통과 -> PID (출력: 각속도) -> 각속도 제한 -> 각도 범위 제한"""
+
+    def __init__(self, kp=12.0, ki=0.0, kd=0.0, smoothing=0.4, max_rate=300.0,
+                 min_angle=0, max_angle=60, center=CENTER_ANGLE, integral_limit=10.0, deadband=2.0):
+        """
+        :param kp, ki, kd: PID 이득 (오차 1도당 deg/s). kp * dt 가 1 이하여야 넘침 없이 수렴
+        :param smoothing: 목표 저역통과 계수 (0~1, 1 이면 필터 없음)
+        :param max_rate: 최대 조향 각속도 (deg/s)
+        :param integral_limit: 적분항 누적 한계 (deg*s)
+        :param deadband: 오차가 이보다 작으면 움직이지 않음 (확률 잡음에 따른 서보 떨림/쓰기 방지)
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.smoothing = smoothing
+        self.max_rate = max_rate
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.center = center
+        self.integral_limit = integral_limit
+        self.deadband = deadband
+        self.reset()
+
+    def reset(self, angle=None):
+        self.angle = float(self.center if angle is None else angle)  # 현재 명령 각도
+        self.target = None  # 필터된 목표 각도
+        self._integral = 0.0
+        self._prev_error = None
+
+    def update(self, target, dt):
+        """제어 주기마다 호출. 새 명령 각도(정수, 서보 테이블/중복 쓰기 생략에 맞춤)를 반환"""
+        if self.target is None:
+            self.target = float(target)
+        else:
+            self.target += self.smoothing * (target - self.target)
+
+        error = self.target - self.angle
+        if abs(error) < self.deadband:
+            self._prev_error = error
+            return int(round(self.angle))
+        self._integral = clamp(self._integral + error * dt, -self.integral_limit, self.integral_limit)
+        derivative = 0.0 if self._prev_error is None or dt <= 0 else (error - self._prev_error) / dt
+        self._prev_error = error
+
+        rate = self.kp * error + self.ki * self._integral + self.kd * derivative
+        rate = clamp(rate, -self.max_rate, self.max_rate)
+        self.angle = clamp(self.angle + rate * dt, self.min_angle, self.max_angle)
+        return int(round(self.angle))
@@ -0,0 +1,184 @@
+"""
+스트리밍 학습 데이터 파이프라인 (tf.data)
+
+기존 load_processed_data 는 모든 이미지를 한 장씩 읽어 float 배열 하나로 쌓았기 때문에
+데이터셋 크기가 Pi 의 메모리에 묶였습니다. 여기서는
+- list_samples: 파일 목록 / 녹화 인덱스만 읽음 (이미지는 디코딩하지 않음, 라벨은 폴더 이름/인덱스에서)
+- stratified_split: 라벨 배열만으로 클래스 비율을 유지한 훈련/검증 번호 분할
+- make_dataset: 번호 섞기 -> 배치로 묶기 -> 배치별 병렬 디코딩 + 축소 (uint8) -> float32 정규화 -> prefetch
+로 나눠서, 메모리에는 샘플 번호와 몇 개 배치 분량의 이미지만 올라갑니다.
+디코딩은 tf.data 스레드 풀에서 cv2 로 처리하고 (cv2 는 GIL 을 풀어서 실제로 병렬),
+Preprocessor 는 내부 버퍼를 쓰므로 스레드마다 하나씩 만듭니다.
+
+    samples = list_samples(data_path)
+    train_idx, val_idx = stratified_split(samples.labels, val_fraction=0.2, seed=42)
+    train_ds = make_dataset(samples, train_idx, image_size, shuffle=True, seed=42)
+    val_ds = make_dataset(samples, val_idx, image_size)
+    model.fit(train_ds, validation_data=val_ds, epochs=50)
+
+tensorflow 는 make_dataset 을 부를 때만 import 합니다.
+"""
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from vehicle.preprocess import Preprocessor
+from vehicle.recording import Recording, find_shards
+
+CLASSES = ("left", "straight", "right")
+
+
+class SampleList:
+    """
+    디코딩 전 학습 샘플 목록 (클래스 폴더의 이미지 경로 또는 녹화 프레임 번호 + 클래스 번호)
+
+    클래스 폴더 이미지는 전처리 스크립트가 만든 이진 영상이라 축소만 하고,
+    녹화 샤드의 카메라 원본 프레임은 주행과 같은 커널로 이진화까지 처리합니다.
+    """
+
+    def __init__(self, labels, paths=None, recording=None, frames=None):
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.paths = paths
+        self.recording = recording
+        self.frames = frames
+
+    def __len__(self):
+        return len(self.labels)
+
+    def decode(self, i, pre, out):
+        """
+        샘플 i 를 출력 크기 uint8 (H, W) 로 out 에 기록
+        :return: 이미지를 읽지 못하면 False
+        """
+        if self.recording is not None:
+            jpeg = self.recording[int(self.frames[i])].jpeg
+            img = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                return False
+            pre.shrink(pre.binarize(img), out)
+        else:
+            img = cv2.imread(self.paths[i], cv2.IMREAD_GRAYSCALE)  # 이진 영상이라 한 채널만 읽음
+            if img is None:
+                return False
+            pre.shrink(img, out)
+        return True
+
+    def close(self):
+        if self.recording is not None:
+            self.recording.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_samples(data_path, classes=CLASSES, label_map=None):
+    """
+    data_path 의 학습 샘플 목록 (이미지는 읽지 않음)
+    :param data_path: 클래스 폴더 (left/straight/right) 가 있는 경로 또는 녹화 샤드(.rec) 경로
+    :param label_map: 녹화 라벨 이름 -> 클래스 이름 (예: {"range_0": "left"}), 없는 라벨은 이름 그대로
+    """
+    class_indices = {cls: idx for idx, cls in enumerate(classes)}
+
+    # 녹화 샤드면 인덱스의 라벨만으로 목록을 만듦 (라벨은 샤드에 기록된 이름으로 맞춤)
+    if find_shards(data_path):
+        recording = Recording(data_path)
+        label_map = label_map or {}
+        remap = np.array([class_indices.get(label_map.get(name, name), -1) for name in recording.labels] + [-1],
+                         dtype=np.int64)
+        labels = remap[recording.index["label"]]
+        frames = np.flatnonzero(labels >= 0)
+        if not len(frames):
+            recording.close()
+            unknown = [name for name in recording.labels if class_indices.get(label_map.get(name, name)) is None]
+            raise ValueError(f"녹화 라벨 중 학습 클래스 {list(classes)} 에 해당하는 프레임이 없습니다: {data_path} "
+                             f"(녹화 라벨 {unknown or '없음'}, label_map 으로 클래스에 연결하세요)")
+        return SampleList(labels[frames], recording=recording, frames=frames)
+
+    paths, labels = [], []
+    for cls in classes:
+        cls_path = os.path.join(data_path, cls)
+        for img_name in sorted(os.listdir(cls_path)):
+            paths.append(os.path.join(cls_path, img_name))
+            labels.append(class_indices[cls])
+    return SampleList(labels, paths=paths)
+
+
+def stratified_split(labels, val_fraction=0.2, seed=42):
+    """
+    클래스별 비율을 유지한 (훈련 번호, 검증 번호) 분할 (라벨 배열만 사용)
+    번호는 정렬해서 반환 (파일/샤드를 순서대로 읽도록, 섞기는 make_dataset 에서)
+    """
+    if not len(labels):
+        raise ValueError("분할할 샘플이 없습니다")
+    rng = np.random.default_rng(seed)
+    train, val = [], []
+    for cls in np.unique(labels):
+        members = rng.permutation(np.flatnonzero(labels == cls))
+        n_val = int(round(len(members) * val_fraction))
+        val.append(members[:n_val])
+        train.append(members[n_val:])
+    return np.sort(np.concatenate(train)), np.sort(np.concatenate(val))
+
+
+def make_dataset(samples, indices, image_size, batch_size=32, channels=1, num_classes=len(CLASSES),
+                 shuffle=False, seed=None, preprocessor_kwargs=None):
+    """
+    samples[indices] 를 (float32 (N, H, W, channels), one-hot 라벨) 배치로 흘려 보내는 tf.data.Dataset
+    - 섞기는 샘플 번호만 (버퍼가 전체 크기여도 번호 배열 크기), 에포크마다 다시 섞음
+    - 이미지는 uint8 (B, H, W, 1) 로 디코딩하고 배치 단위로 float32 / 255 변환
+    - 읽지 못한 이미지는 배치에서 빠짐
+    :param channels: 모델 입력 채널 수 (3 이면 같은 값을 세 채널에 복제)
+    :param preprocessor_kwargs: 녹화 프레임 이진화 설정 (Preprocessor 인자)
+    """
+    import tensorflow as tf
+
+    height, width = image_size[1], image_size[0]
+    indices = np.asarray(indices, dtype=np.int64)
+    local = threading.local()
+
+    def load_batch(batch_indices, labels):
+        # 배치 단위로 한 번에 디코딩 (numpy_function 호출 오버헤드를 이미지마다 내지 않도록)
+        pre = getattr(local, "pre", None)
+        if pre is None:
+            pre = local.pre = Preprocessor(output_size=image_size, **(preprocessor_kwargs or {}))
+        images = np.empty((len(batch_indices), height, width, 1), dtype=np.uint8)
+        ok = np.array([samples.decode(int(i), pre, images[n, :, :, 0]) for n, i in enumerate(batch_indices)],
+                      dtype=bool)
+        if not ok.all():  # 읽지 못한 이미지는 배치에서 뺌
+            return images[ok], labels[ok]
+        return images, labels
+
+    def decode(batch_indices, labels):
+        images, labels = tf.numpy_function(load_batch, [batch_indices, labels], (tf.uint8, tf.int64),
+                                           stateful=False)
+        images.set_shape((None, height, width, 1))
+        labels.set_shape((None,))
+        # 여기서 float32 로 바꿈 (uint8 로 디코딩한 배치 하나만 변환)
+        images = tf.cast(images, tf.float32) * (1.0 / 255.0)
+        if channels != 1:
+            images = tf.repeat(images, channels, axis=-1)
+        return images, tf.one_hot(labels, num_classes)
+
+    ds = tf.data.Dataset.from_tensor_slices((indices, samples.labels[indices]))
+    if shuffle:
+        ds = ds.shuffle(len(indices), seed=seed, reshuffle_each_iteration=True)
+    # 번호를 먼저 배치로 묶고, 배치 여러 개를 tf.data 스레드에서 동시에 디코딩 (cv2 는 GIL 을 풀어 병렬)
+    ds = ds.batch(batch_size).map(decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def take_images(dataset, count):
+    """데이터셋 앞쪽 배치에서 이미지 count 장을 float32 배열로 (int8 양자화 대표 데이터셋 등)"""
+    images = []
+    total = 0
+    for batch, _ in dataset:
+        images.append(batch.numpy())
+        total += len(images[-1])
+        if total >= count:
+            break
+    return np.concatenate(images)[:count]
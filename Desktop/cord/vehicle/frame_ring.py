@@ -0,0 +1,128 @@
+"""
+프리트리거 프레임 링 버퍼와 버스트 저장
+
+FrameRing 은 최근 N 프레임을 미리 할당한 슬롯에 복사해 두므로, 프레임마다 메모리를 새로 잡지 않습니다.
+BurstRecorder 는 트리거 시점 전후의 서로 다른 연속 프레임을 ImageWriter 로 저장합니다.
+- 트리거 이전 프레임은 링 버퍼에서, 이후 프레임은 다음 add_frame() 에서 가져옴 (sleep 없음)
+- 링 슬롯은 계속 덮어써지므로, 저장할 프레임은 고정 크기 저장 슬롯 풀에 복사한 뒤 넘기고
+  저장이 끝나면(또는 큐에서 버려지면) 슬롯을 풀에 반환 -> 메모리 사용량이 항상 일정
+
+    burst = BurstRecorder(writer, pre_frames=1, post_frames=1)
+    while True:
+        ret, frame = cap.read(frame)
+        burst.add_frame(frame)
+        if trigger:
+            burst.trigger(lambda i: f"{prefix}_burst{i}.jpg")
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameRing:
+    """최근 capacity 개 프레임을 보관하는 링 버퍼 (첫 프레임의 크기로 슬롯을 한 번만 할당)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._slots = None
+        self._times = [0.0] * capacity
+        self._seqs = [-1] * capacity
+        self.count = 0  # 지금까지 넣은 프레임 수
+
+    def push(self, image, timestamp=None):
+        """프레임을 다음 슬롯에 복사. 프레임 번호 반환"""
+        if self._slots is None:
+            self._slots = np.empty((self.capacity,) + image.shape, dtype=image.dtype)
+        elif image.shape != self._slots.shape[1:]:
+            raise ValueError(f"프레임 크기가 바뀌었습니다: {image.shape} != {self._slots.shape[1:]}")
+        i = self.count % self.capacity
+        np.copyto(self._slots[i], image)
+        self._times[i] = time.monotonic() if timestamp is None else timestamp
+        self._seqs[i] = self.count
+        self.count += 1
+        return self.count - 1
+
+    def latest(self, n):
+        """최근 n 개 프레임 [(번호, 시각, 슬롯 view)] (오래된 것부터). view 는 덮어쓰기 전까지만 유효"""
+        n = min(n, len(self))
+        out = []
+        for seq in range(self.count - n, self.count):
+            i = seq % self.capacity
+            out.append((seq, self._times[i], self._slots[i]))
+        return out
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+
+class BurstRecorder:
+    """트리거 전 pre_frames 개 + 트리거 프레임 + 이후 post_frames 개를 저장"""
+
+    def __init__(self, writer, pre_frames=1, post_frames=1, pool_size=None):
+        """
+        :param writer: vehicle.image_writer.ImageWriter
+        :param pool_size: 저장 대기 슬롯 수 (기본: 버스트 4번 분량). 모자라면 그 프레임은 버림
+        """
+        self.writer = writer
+        self.pre_frames = pre_frames
+        self.post_frames = post_frames
+        self.burst_size = pre_frames + 1 + post_frames
+        self.ring = FrameRing(pre_frames + 1)
+        self.pool_size = pool_size or self.burst_size * 4
+        self._pool = None
+        self._free = deque(range(self.pool_size))
+        self._lock = threading.Lock()
+        self._active = []  # 이후 프레임을 기다리는 버스트 [make_path, 다음 번호]
+
+        # 통계
+        self.bursts = 0
+        self.saved = 0    # 저장 요청한 프레임 수
+        self.dropped = 0  # 저장 슬롯이 모자라 버린 프레임 수
+
+    def add_frame(self, image, timestamp=None):
+        """새 프레임: 링 버퍼에 넣고, 진행 중인 버스트의 이후 프레임이면 저장"""
+        self.ring.push(image, timestamp)
+        if self._active:
+            still_active = []
+            for burst in self._active:
+                make_path, index = burst
+                self._save(image, make_path(index))
+                if index + 1 < self.burst_size:
+                    still_active.append([make_path, index + 1])
+            self._active = still_active
+
+    def trigger(self, make_path):
+        """
+        버스트 시작 (add_frame() 으로 트리거 프레임을 넣은 직후 호출)
+        :param make_path: 버스트 안 순번 i (0 부터) -> 저장 경로
+        """
+        self.bursts += 1
+        frames = self.ring.latest(self.pre_frames + 1)
+        # 시작 직후라 링에 프레임이 모자라면 앞 번호를 비워 둠
+        first = self.pre_frames + 1 - len(frames)
+        for offset, (_, _, view) in enumerate(frames):
+            self._save(view, make_path(first + offset))
+        if self.post_frames:
+            self._active.append([make_path, self.pre_frames + 1])
+
+    def _save(self, image, path):
+        with self._lock:
+            if not self._free:
+                self.dropped += 1
+                return
+            slot = self._free.popleft()
+        if self._pool is None:
+            self._pool = np.empty((self.pool_size,) + image.shape, dtype=image.dtype)
+        np.copyto(self._pool[slot], image)
+        self.saved += 1
+        self.writer.submit(path, self._pool[slot], on_done=lambda _path, _ok, slot=slot: self._release(slot))
+
+    def _release(self, slot):
+        with self._lock:
+            self._free.append(slot)
+
+    def stats(self):
+        return {"bursts": self.bursts, "saved": self.saved, "dropped": self.dropped,
+                "free_slots": len(self._free)}
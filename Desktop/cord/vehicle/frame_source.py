@@ -0,0 +1,332 @@
+"""
+최신 프레임 우선(latest-frame-wins) 카메라 입력
+
+백그라운드 스레드가 카메라에서 계속 프레임을 가져오고 가장 최근 프레임 하나만 보관합니다.
+제어 루프는 read() 로 기다림 없이 가장 신선한 프레임을 받으며,
+읽히지 못하고 덮어써진 프레임 수(dropped)와 프레임 나이(age)를 확인할 수 있습니다.
+
+백엔드
+- VideoCaptureSource: cv2.VideoCapture (USB 웹캠)
+- LibcameraSource: libcamera-vid MJPEG 파이프
+- ReplaySource: 이미지 폴더 또는 녹화된 MJPEG 파일 재생
+"""
+import os
+import shlex
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from vehicle.mjpeg import MjpegSplitter
+
+# image: 디코딩된 이미지, seq: 0부터 증가하는 일련번호, timestamp: time.monotonic() 캡처 시각
+Frame = namedtuple("Frame", ["image", "seq", "timestamp"])
+
+LIBCAMERA_CMD = ('libcamera-vid --inline --nopreview -t 0 --codec mjpeg '
+                 '--width {width} --height {height} --framerate {framerate} -o - --camera {camera}')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def stop_process(process, timeout=2.0):
+    """자식 프로세스를 끝내고 종료를 기다림 (시간 안에 끝나지 않으면 kill, 좀비 프로세스 방지)"""
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def decode_jpeg(jpg):
+    """JPEG 바이트를 BGR 이미지로 디코딩"""
+    return cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class FrameSource:
+    """
+    프레임 소스 기본 클래스
+
+    하위 클래스는 _open(), _grab(), _close() 를 구현합니다.
+    _grab() 은 다음 이미지를 반환하고, 더 이상 프레임이 없으면 None 을 반환합니다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._latest = None
+        self._thread = None
+        self._running = False
+        self._last_read_seq = -1
+
+        # 통계
+        self.grabbed = 0   # 카메라에서 가져온 프레임 수
+        self.consumed = 0  # read() 로 전달된 프레임 수
+        self.dropped = 0   # 한 번도 읽히지 못하고 덮어써진 프레임 수
+        self.errors = 0    # 디코딩 실패 등으로 버린 프레임 수
+
+    # --- 하위 클래스 구현 부분 ---
+    def _open(self):
+        pass
+
+    def _grab(self):
+        raise NotImplementedError
+
+    def _interrupt(self):
+        """stop() 에서 스레드 join 전에 호출, _grab() 에서 막혀 있는 캡처 스레드를 깨움"""
+        pass
+
+    def _close(self):
+        pass
+
+    # --- 공용 인터페이스 ---
+    def start(self):
+        """카메라를 열고 백그라운드 캡처 스레드를 시작"""
+        if self._running:
+            return self
+        self._open()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """캡처 스레드를 멈추고 카메라를 닫음 (스레드가 _grab() 안에 있는 동안 카메라를 해제하지 않도록 join 후 닫음)"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        self._interrupt()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self._close()
+
+    @property
+    def running(self):
+        return self._running
+
+    def _run(self):
+        seq = 0
+        while self._running:
+            try:
+                image = self._grab()
+            except Exception as e:
+                if self._running:
+                    print(f"프레임 캡처 중 에러 발생: {e}")
+                break
+            if image is None:
+                if self._running and self._is_exhausted():
+                    break
+                self.errors += 1
+                continue
+            frame = Frame(image, seq, time.monotonic())
+            seq += 1
+            with self._cond:
+                if self._latest is not None and self._latest.seq > self._last_read_seq:
+                    self.dropped += 1
+                self._latest = frame
+                self.grabbed += 1
+                self._cond.notify_all()
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def _is_exhausted(self):
+        """_grab() 이 None 을 반환했을 때 스트림이 끝난 것인지 여부"""
+        return True
+
+    def read(self, wait_new=True, timeout=1.0):
+        """
+        가장 최근 프레임을 반환합니다.
+        :param wait_new: True 이면 이전에 읽은 것보다 새로운 프레임이 올 때까지 기다림
+        :param timeout: 최대 대기 시간 (초)
+        :return: Frame, 시간 초과 또는 스트림 종료 시 None
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                frame = self._latest
+                if frame is not None and (not wait_new or frame.seq > self._last_read_seq):
+                    break
+                remaining = deadline - time.monotonic()
+                if not self._running or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if frame.seq > self._last_read_seq:
+                self.consumed += 1
+                self._last_read_seq = frame.seq
+        return frame
+
+    def age(self, frame):
+        """프레임이 캡처된 후 지난 시간 (초)"""
+        return time.monotonic() - frame.timestamp
+
+    def stats(self):
+        """통계를 딕셔너리로 반환"""
+        latest = self._latest
+        return {
+            "grabbed": self.grabbed,
+            "consumed": self.consumed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latest_age": self.age(latest) if latest is not None else None,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class VideoCaptureSource(FrameSource):
+    """cv2.VideoCapture 백엔드 (USB 웹캠 등)"""
+
+    def __init__(self, device=0, width=None, height=None):
+        super().__init__()
+        self.device = device
+        self.width = width
+        self.height = height
+        self._cap = None
+
+    def _open(self):
+        self._cap = cv2.VideoCapture(self.device)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"카메라를 열 수 없습니다: {self.device}")
+        # 드라이버 내부 버퍼를 최소화해서 오래된 프레임이 쌓이지 않게 함
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self.width:
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+    def _grab(self):
+        ret, frame = self._cap.read()
+        return frame if ret else None
+
+    def _close(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+class LibcameraSource(FrameSource):
+    """libcamera-vid MJPEG 파이프 백엔드"""
+
+    def __init__(self, width=640, height=480, framerate=30, camera=0, cmd=None, decoder=decode_jpeg):
+        """
+        :param cmd: libcamera-vid 명령어를 직접 지정 (지정하면 width/height/framerate/camera 무시)
+        :param decoder: JPEG 바이트(memoryview)를 받아 이미지를 반환하는 함수
+        """
+        super().__init__()
+        self.cmd = cmd or LIBCAMERA_CMD.format(width=width, height=height,
+                                               framerate=framerate, camera=camera)
+        self.decoder = decoder
+        self._process = None
+        self._splitter = None
+        self._exhausted = False
+
+    def _open(self):
+        self._process = subprocess.Popen(shlex.split(self.cmd),
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._splitter = MjpegSplitter(self._process.stdout)
+
+    def _grab(self):
+        jpg = self._splitter.read()
+        if jpg is None:
+            self._exhausted = True
+            return None
+        self._exhausted = False
+        return self.decoder(jpg)
+
+    def _is_exhausted(self):
+        return self._exhausted
+
+    def _interrupt(self):
+        if self._process is not None:
+            self._process.terminate()  # 파이프 읽기에서 막힌 캡처 스레드를 깨움
+
+    def _close(self):
+        if self._process is not None:
+            stop_process(self._process)
+            self._process.stdout.close()
+            self._process = None
+
+
+class ReplaySource(FrameSource):
+    """
+    녹화 데이터 재생 백엔드
+
+    path 가 폴더이면 이미지 파일을 이름 순으로, 파일이면 MJPEG 스트림으로 읽습니다.
+    fps 를 지정하면 실제 카메라처럼 그 속도로 프레임을 내보냅니다 (None 이면 최대 속도).
+    """
+
+    def __init__(self, path, fps=30, loop=False, decoder=decode_jpeg):
+        super().__init__()
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.decoder = decoder
+        self._files = None
+        self._index = 0
+        self._stream = None
+        self._splitter = None
+        self._exhausted = False
+        self._next_time = 0.0
+
+    def _open(self):
+        if os.path.isdir(self.path):
+            self._files = sorted(
+                os.path.join(self.path, name) for name in os.listdir(self.path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if not self._files:
+                raise RuntimeError(f"재생할 이미지가 없습니다: {self.path}")
+        else:
+            self._open_stream()
+        self._next_time = time.monotonic()
+
+    def _open_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = open(self.path, "rb")
+        self._splitter = MjpegSplitter(self._stream)
+
+    def _next_jpeg(self):
+        """다음 JPEG 바이트를 반환, 끝이면 None"""
+        if self._files is not None:
+            if self._index >= len(self._files):
+                if not self.loop:
+                    return None
+                self._index = 0
+            with open(self._files[self._index], "rb") as f:
+                data = f.read()
+            self._index += 1
+            return data
+        jpg = self._splitter.read()
+        if jpg is None and self.loop:
+            self._open_stream()
+            jpg = self._splitter.read()
+        return jpg
+
+    def _grab(self):
+        if self.fps:
+            # 실제 카메라 속도에 맞춰 대기
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic() - 1.0 / self.fps)
+        jpg = self._next_jpeg()
+        if jpg is None:
+            self._exhausted = True
+            return None
+        return self.decoder(jpg)
+
+    def _is_exhausted(self):
+        return self._exhausted
+
+    def _close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
@@ -0,0 +1,426 @@
+"""
+서보모터 / DC 모터 하드웨어 계층
+
+백엔드
+- RPi.GPIO: 소프트웨어 PWM (실제 차량)
+- PCA9685: I2C 하드웨어 PWM (adafruit_pca9685, motor_controlr/servo_motor.py 와 같은 보드)
+- 시뮬레이션: SimulatedGpio / SimulatedPca9685 가 같은 API 를 흉내 내며
+  모든 핀/듀티 변화를 time.monotonic() 시각과 함께 EventLog 에 기록
+
+드라이버 라이브러리는 open_gpio / open_pca9685 를 호출할 때만 import 하므로,
+이 모듈과 스크립트는 Pi 가 아닌 곳에서도 import 할 수 있습니다.
+환경변수 AL_CAR_SIMULATE_HW=1 이면 스크립트 수정 없이 시뮬레이션 백엔드를 사용합니다.
+
+    gpio = open_gpio()
+    servo = open_steering("pca9685", gpio)   # 또는 "soft_pwm" (GPIO 12)
+    motor = DCMotor(gpio, 17, 27, 18)
+"""
+import os
+import struct
+import time
+from array import array
+from contextlib import contextmanager
+
+SIMULATE_ENV = "AL_CAR_SIMULATE_HW"
+STEERING_DRIVERS = ("soft_pwm", "pca9685")
+
+PCA9685_LED0_ON_L = 0x06  # 채널 0 의 첫 레지스터 (채널마다 4바이트: ON_L, ON_H, OFF_L, OFF_H)
+
+# EventLog 이벤트 종류
+KIND_OUTPUT = 0  # 디지털 출력 (HIGH/LOW)
+KIND_DUTY = 1    # 소프트웨어 PWM 듀티 사이클 (%)
+KIND_PULSE = 2   # PCA9685 16비트 duty_cycle 값
+KIND_NAMES = {KIND_OUTPUT: "output", KIND_DUTY: "duty", KIND_PULSE: "pulse"}
+
+
+def simulation_requested(simulate=None):
+    """simulate 가 None 이면 환경변수 AL_CAR_SIMULATE_HW 로 결정"""
+    if simulate is None:
+        return os.environ.get(SIMULATE_ENV, "0") not in ("", "0")
+    return bool(simulate)
+
+
+class EventLog:
+    """핀/듀티 변화 기록. 이벤트마다 튜플을 만들지 않도록 종류별 array 에 나눠 저장"""
+
+    def __init__(self):
+        self.times = array('d')   # time.monotonic() 시각
+        self.pins = array('h')    # GPIO 핀 번호 또는 PCA9685 채널 번호
+        self.kinds = array('b')   # KIND_*
+        self.values = array('d')
+
+    def append(self, pin, kind, value):
+        self.times.append(time.monotonic())
+        self.pins.append(pin)
+        self.kinds.append(kind)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        """(시각, 핀, 종류, 값) 튜플로 순회"""
+        return zip(self.times, self.pins, self.kinds, self.values)
+
+    def clear(self):
+        for arr in (self.times, self.pins, self.kinds, self.values):
+            del arr[:]
+
+    def select(self, pin, kind=None):
+        """특정 핀(과 종류)의 (시각, 값) 목록"""
+        return [(t, v) for t, p, k, v in self if p == pin and (kind is None or k == kind)]
+
+    def summary(self):
+        """
+        핀/종류별 쓰기 통계
+        - writes: 쓰기 횟수, changes: 값이 실제로 바뀐 횟수 (writes - changes 가 불필요한 쓰기)
+        - rate_hz: 첫 쓰기부터 마지막 쓰기까지의 평균 쓰기 빈도
+        """
+        report = {}
+        last = {}
+        for t, pin, kind, value in self:
+            key = (pin, KIND_NAMES[kind])
+            entry = report.get(key)
+            if entry is None:
+                entry = report[key] = {"writes": 0, "changes": 0, "first": t, "last": t}
+            entry["writes"] += 1
+            if last.get(key) != value:
+                entry["changes"] += 1
+            entry["last"] = t
+            last[key] = value
+        for entry in report.values():
+            span = entry["last"] - entry["first"]
+            entry["rate_hz"] = (entry["writes"] - 1) / span if span > 0 else 0.0
+        return report
+
+
+class SimulatedGpio:
+    """RPi.GPIO 대신 쓰는 가짜 GPIO. 모든 출력/듀티 변화를 log 에 기록"""
+
+    BCM = "BCM"
+    OUT = "OUT"
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self, log=None):
+        self.log = log if log is not None else EventLog()
+        self.pins = {}  # 핀 -> 현재 출력 값
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, mode):
+        self.pins[pin] = self.LOW
+
+    def output(self, pin, value):
+        self.pins[pin] = value
+        self.log.append(pin, KIND_OUTPUT, value)
+
+    def PWM(self, pin, frequency):
+        return _SimulatedPwm(self.log, pin, frequency)
+
+    def cleanup(self):
+        self.pins.clear()
+
+
+class _SimulatedPwm:
+    def __init__(self, log, pin, frequency):
+        self._log = log
+        self.pin = pin
+        self.frequency = frequency
+        self.duty = 0.0
+
+    def start(self, duty):
+        self.ChangeDutyCycle(duty)
+
+    def ChangeDutyCycle(self, duty):
+        self.duty = duty
+        self._log.append(self.pin, KIND_DUTY, duty)
+
+    def stop(self):
+        self.ChangeDutyCycle(0)
+
+
+class SimulatedPca9685:
+    """adafruit_pca9685.PCA9685 대신 쓰는 가짜 보드 (frequency, channels[i].duty_cycle, deinit)"""
+
+    def __init__(self, log=None, num_channels=16):
+        self.log = log if log is not None else EventLog()
+        self.frequency = 50
+        self.channels = [_SimulatedPcaChannel(self.log, i) for i in range(num_channels)]
+
+    def deinit(self):
+        pass
+
+
+class _SimulatedPcaChannel:
+    def __init__(self, log, index):
+        self._log = log
+        self.index = index
+        self._duty_cycle = 0
+
+    @property
+    def duty_cycle(self):
+        return self._duty_cycle
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        self._duty_cycle = value
+        self._log.append(self.index, KIND_PULSE, value)
+
+
+def open_gpio(simulate=None, log=None):
+    """GPIO 백엔드를 열고 BCM 핀 번호 모드로 설정"""
+    if simulation_requested(simulate):
+        gpio = SimulatedGpio(log)
+    else:
+        import RPi.GPIO as gpio
+    gpio.setmode(gpio.BCM)
+    return gpio
+
+
+def open_pca9685(simulate=None, frequency=50, log=None):
+    """PCA9685 보드를 열고 PWM 주파수 설정"""
+    if simulation_requested(simulate):
+        pca = SimulatedPca9685(log)
+    else:
+        import busio
+        from board import SCL, SDA
+        from adafruit_pca9685 import PCA9685
+        pca = PCA9685(busio.I2C(SCL, SDA))
+    pca.frequency = frequency
+    return pca
+
+
+class PwmBatch:
+    """
+    PCA9685 채널 쓰기 모음
+
+    값이 바뀐 채널만 모아 두었다가, 번호가 연속된 채널끼리 레지스터 자동 증가를 이용해
+    I2C 트랜잭션 한 번으로 전송합니다. auto_flush 이면 set() 마다 바로 전송하고,
+    deferred() 블록 안에서는 블록이 끝날 때 한 번에 전송합니다.
+    """
+
+    def __init__(self, pca, auto_flush=True):
+        self.pca = pca
+        self.auto_flush = auto_flush
+        self._pending = {}   # 채널 -> 16비트 duty_cycle
+        self._current = {}   # 마지막으로 보낸 값
+        self.transactions = 0  # I2C 쓰기 횟수
+        self.writes = 0        # 채널 값 쓰기 횟수
+
+    def set(self, channel, pulse):
+        if self._current.get(channel) == pulse:
+            self._pending.pop(channel, None)
+            return
+        self._pending[channel] = pulse
+        if self.auto_flush:
+            self.flush()
+
+    @contextmanager
+    def deferred(self):
+        """블록 안의 set() 을 모아서 끝날 때 한 번에 전송"""
+        auto_flush, self.auto_flush = self.auto_flush, False
+        try:
+            yield self
+        finally:
+            self.auto_flush = auto_flush
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        channels = sorted(self._pending)
+        start = 0
+        for i in range(1, len(channels) + 1):
+            if i == len(channels) or channels[i] != channels[i - 1] + 1:
+                run = channels[start:i]
+                self._write_run(run[0], [self._pending[ch] for ch in run])
+                start = i
+        self._current.update(self._pending)
+        self._pending.clear()
+
+    def _write_run(self, first, values):
+        self.transactions += 1
+        self.writes += len(values)
+        device = getattr(self.pca, "i2c_device", None)
+        if device is None:
+            # 시뮬레이션 보드: 채널별로 기록
+            for i, value in enumerate(values):
+                self.pca.channels[first + i].duty_cycle = value
+            return
+        # adafruit_pca9685 의 duty_cycle setter 와 같은 변환 (0xFFFF 는 full-on)
+        buf = bytearray(1 + 4 * len(values))
+        buf[0] = PCA9685_LED0_ON_L + 4 * first
+        for i, value in enumerate(values):
+            if value == 0xFFFF:
+                struct.pack_into("<HH", buf, 1 + 4 * i, 0x1000, 0)
+            else:
+                struct.pack_into("<HH", buf, 1 + 4 * i, 0, (value + 1) >> 4)
+        with device as i2c:
+            i2c.write(buf)
+
+
+class Servo:
+    """소프트웨어 PWM 서보모터 (50Hz)"""
+
+    def __init__(self, gpio, pin, frequency=50, hold=0.1):
+        """
+        :param hold: 듀티 사이클을 유지하는 시간 (초). 이후 0 으로 내려 떨림/과열 방지
+        """
+        self.gpio = gpio
+        self.pin = pin
+        self.hold = hold
+        gpio.setup(pin, gpio.OUT)
+        self._pwm = gpio.PWM(pin, frequency)
+        self._pwm.start(0)
+        self._duties = [self.angle_to_duty(a) for a in range(181)]  # 정수 각도별 듀티 사이클
+        self.angle = None
+
+    @staticmethod
+    def angle_to_duty(angle):
+        """각도 -> 듀티 사이클 변환"""
+        return 2 + (angle / 18)
+
+    def set_angle(self, angle):
+        """서보모터 각도 설정 (hold 초 동안 블로킹)"""
+        duty = self._duties[angle] if isinstance(angle, int) and 0 <= angle <= 180 else self.angle_to_duty(angle)
+        self._pwm.ChangeDutyCycle(duty)
+        time.sleep(self.hold)
+        self._pwm.ChangeDutyCycle(0)
+        self.angle = angle
+
+    def close(self):
+        self._pwm.stop()
+
+
+class PcaServo:
+    """PCA9685 하드웨어 PWM 서보모터. 펄스를 보드가 계속 내보내므로 대기/0 듀티가 필요 없음"""
+
+    def __init__(self, pca, channel=0, min_pulse=1638, max_pulse=8192, max_angle=180,
+                 batch=None, owns_pca=False):
+        """
+        :param min_pulse: 0도에 해당하는 16비트 duty_cycle 값
+        :param max_pulse: max_angle 에 해당하는 16비트 duty_cycle 값
+        :param batch: 다른 채널과 함께 전송할 PwmBatch (없으면 바로 전송하는 PwmBatch 생성)
+        :param owns_pca: True 이면 close() 에서 보드도 정리
+        """
+        self.pca = pca
+        self.channel = channel
+        self.min_pulse = min_pulse
+        self.max_pulse = max_pulse
+        self.max_angle = max_angle
+        self.batch = batch if batch is not None else PwmBatch(pca)
+        self.owns_pca = owns_pca
+        self._pulses = [self.angle_to_pulse(a) for a in range(max_angle + 1)]  # 정수 각도별 펄스
+        self.angle = None
+
+    def angle_to_pulse(self, angle):
+        """각도 -> 16비트 duty_cycle 변환"""
+        return int(self.min_pulse + (angle / self.max_angle) * (self.max_pulse - self.min_pulse))
+
+    def set_angle(self, angle):
+        if isinstance(angle, int) and 0 <= angle <= self.max_angle:
+            pulse = self._pulses[angle]
+        else:
+            pulse = self.angle_to_pulse(angle)
+        self.batch.set(self.channel, pulse)
+        self.angle = angle
+
+    def close(self):
+        self.batch.set(self.channel, 0)
+        self.batch.flush()
+        if self.owns_pca:
+            self.pca.deinit()
+
+
+class _PcaPwm:
+    """PCA9685 채널을 RPi.GPIO PWM 처럼 (% 듀티 사이클) 쓰기 위한 어댑터"""
+
+    def __init__(self, batch, channel):
+        self.batch = batch
+        self.channel = channel
+
+    def start(self, duty):
+        self.ChangeDutyCycle(duty)
+
+    def ChangeDutyCycle(self, duty):
+        self.batch.set(self.channel, int(duty * 0xFFFF / 100))
+
+    def stop(self):
+        self.ChangeDutyCycle(0)
+        self.batch.flush()
+
+
+class DCMotor:
+    """L298N 계열 DC 모터 드라이버 (IN1/IN2 방향, ENA PWM 속도)"""
+
+    def __init__(self, gpio, in1, in2, ena=None, frequency=100, batch=None, pca_channel=None):
+        """
+        :param ena: 속도 PWM 을 낼 GPIO 핀 (소프트웨어 PWM)
+        :param batch, pca_channel: ena 대신 PCA9685 채널로 속도 PWM 을 낼 때 (PwmBatch, 채널 번호)
+        """
+        self.gpio = gpio
+        self.in1 = in1
+        self.in2 = in2
+        gpio.setup(in1, gpio.OUT)
+        gpio.setup(in2, gpio.OUT)
+        if pca_channel is not None:
+            self._pwm = _PcaPwm(batch, pca_channel)
+        else:
+            gpio.setup(ena, gpio.OUT)
+            self._pwm = gpio.PWM(ena, frequency)
+        self._pwm.start(0)
+        self.speed = 0
+
+    def drive(self, speed):
+        """speed > 0 전진, speed < 0 후진, 0 정지 (단위: %)"""
+        if speed > 0:
+            self.gpio.output(self.in1, self.gpio.HIGH)
+            self.gpio.output(self.in2, self.gpio.LOW)
+        elif speed < 0:
+            self.gpio.output(self.in1, self.gpio.LOW)
+            self.gpio.output(self.in2, self.gpio.HIGH)
+        else:
+            self.gpio.output(self.in1, self.gpio.LOW)
+            self.gpio.output(self.in2, self.gpio.LOW)
+        self._pwm.ChangeDutyCycle(min(abs(speed), 100))
+        self.speed = speed
+
+    def forward(self, speed):
+        self.drive(abs(speed))
+
+    def backward(self, speed):
+        self.drive(-abs(speed))
+
+    def stop(self):
+        self.drive(0)
+
+    def close(self):
+        self._pwm.stop()
+
+
+def open_steering(driver="soft_pwm", gpio=None, pin=12, channel=0, hold=0.1, batch=None, simulate=None):
+    """
+    조향 서보 드라이버 생성
+    :param driver: "soft_pwm" (GPIO 소프트웨어 PWM, pin) 또는 "pca9685" (I2C 하드웨어 PWM, channel)
+    :param hold: soft_pwm 에서 듀티 사이클 유지 시간 (pca9685 는 대기 없음)
+    :param batch: pca9685 에서 다른 채널과 공유할 PwmBatch (없으면 보드를 새로 열어 서보가 소유)
+    """
+    if driver == "soft_pwm":
+        if gpio is None:
+            gpio = open_gpio(simulate)
+        return Servo(gpio, pin, hold=hold)
+    if driver == "pca9685":
+        if batch is not None:
+            return PcaServo(batch.pca, channel, batch=batch)
+        # GPIO 가 시뮬레이션이면 보드도 시뮬레이션으로 열고 같은 로그에 기록
+        if isinstance(gpio, SimulatedGpio):
+            pca = open_pca9685(True, frequency=50, log=gpio.log)
+        else:
+            pca = open_pca9685(simulate, frequency=50)
+        return PcaServo(pca, channel, owns_pca=True)
+    raise ValueError(f"알 수 없는 조향 드라이버: {driver} (가능: {', '.join(STEERING_DRIVERS)})")
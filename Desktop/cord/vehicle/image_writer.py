@@ -0,0 +1,186 @@
+"""
+비동기 이미지 저장
+
+캡처 스레드에서 cv2.imwrite 를 바로 호출하면 SD 카드 쓰기(수십 ms) 동안 카메라 프레임을 놓칩니다.
+ImageWriter 는 크기가 정해진 큐에 저장 요청만 넣고, 작은 스레드 풀이 디스크에 씁니다.
+(cv2.imwrite 는 인코딩/쓰기 중 GIL 을 놓으므로 스레드 여러 개가 실제로 동시에 동작)
+
+이미 JPEG 로 인코딩된 바이트(카메라 MJPEG 프레임)는 submit_encoded() 로 넘기면
+디코딩/재인코딩 없이 원본 바이트를 그대로 파일에 씁니다 (화질 손실 없음, CPU 사용 없음).
+
+큐가 가득 찼을 때 정책
+- "drop_oldest": 가장 오래된 요청을 버림 (캡처는 절대 막히지 않음)
+- "block": 자리가 날 때까지 캡처 스레드가 기다림 (프레임을 하나도 버리지 않음)
+
+    writer = ImageWriter(workers=2, queue_size=16, policy="drop_oldest").start()
+    writer.submit("/home/pi/AL_CAR/images/left/a.jpg", frame)
+    ...
+    writer.close()   # 남은 요청을 모두 쓰고 종료
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from vehicle.stats import LatencyStats
+
+POLICIES = ("drop_oldest", "block")
+
+
+class ImageWriter:
+    """크기 제한 큐 + 저장 스레드 풀"""
+
+    def __init__(self, workers=2, queue_size=16, policy="drop_oldest", params=None, verbose=True):
+        """
+        :param params: cv2.imwrite 인코딩 옵션 (예: [cv2.IMWRITE_JPEG_QUALITY, 95])
+        :param verbose: True 이면 저장 성공/실패를 출력
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 정책: {policy} (가능: {', '.join(POLICIES)})")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.policy = policy
+        self.params = list(params) if params else []
+        self.verbose = verbose
+
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._in_flight = 0
+        self._threads = []
+
+        # 통계
+        self.queued = 0    # 큐에 들어간 요청 수
+        self.written = 0   # 저장 성공
+        self.failed = 0    # 저장 실패 (imwrite False 또는 예외)
+        self.dropped = 0   # 큐가 가득 차서 버린 요청 수
+        self.write_time = LatencyStats()
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"image-writer-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, path, image, timeout=None, on_done=None):
+        """
+        저장 요청 (image 참조를 보관하므로 on_done 전까지 같은 배열을 덮어쓰지 말 것)
+        :param timeout: "block" 정책에서 최대 대기 시간 (None 이면 무한 대기)
+        :param on_done: 저장이 끝나거나 요청이 버려지면 on_done(path, ok) 호출 (버퍼 반환 등)
+        :return: 큐에 들어갔으면 True, 시간 초과로 버렸으면 False
+        """
+        item = (path, image, on_done)
+        evicted = None
+        accepted = True
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("이미 닫힌 ImageWriter 입니다.")
+            if len(self._items) >= self.queue_size:
+                if self.policy == "drop_oldest":
+                    evicted = self._items.popleft()
+                elif not self._not_full.wait_for(lambda: len(self._items) < self.queue_size, timeout):
+                    evicted = item
+                    accepted = False
+            if evicted is not None:
+                self.dropped += 1
+            if accepted:
+                self._items.append(item)
+                self.queued += 1
+                self._not_empty.notify()
+        # 버린 요청의 버퍼도 돌려받을 수 있도록 잠금 밖에서 알림
+        if evicted is not None and evicted[2] is not None:
+            evicted[2](evicted[0], False)
+        return accepted
+
+    def submit_encoded(self, path, data, timeout=None, on_done=None):
+        """
+        인코딩된 이미지 바이트를 그대로 저장 (재인코딩 없음)
+        data 가 memoryview 이면 다음 프레임에서 덮어써질 수 있으므로 bytes 로 복사해서 넣음
+        """
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        return self.submit(path, data, timeout, on_done)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._not_empty.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                path, image, on_done = self._items.popleft()
+                self._in_flight += 1
+                self._not_full.notify()
+
+            start = time.perf_counter()
+            try:
+                ok = self._write(path, image)
+            except Exception as e:
+                print(f"이미지 저장 중 에러 발생: {e}")
+                ok = False
+            self.write_time.add(time.perf_counter() - start)
+
+            with self._lock:
+                self._in_flight -= 1
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+                self._not_full.notify_all()
+            if on_done is not None:
+                on_done(path, ok)
+            if self.verbose:
+                print(f"이미지 저장 {'성공' if ok else '실패'}: {path}")
+
+    def _write(self, path, image):
+        if isinstance(image, bytes):
+            with open(path, "wb") as f:
+                f.write(image)
+            return True
+        return cv2.imwrite(path, image, self.params)
+
+    @property
+    def pending(self):
+        """아직 디스크에 쓰지 않은 요청 수 (큐 + 쓰는 중)"""
+        with self._lock:
+            return len(self._items) + self._in_flight
+
+    def flush(self, timeout=None):
+        """지금까지 넣은 요청이 모두 저장될 때까지 대기. 완료되면 True"""
+        with self._lock:
+            return self._not_full.wait_for(lambda: not self._items and self._in_flight == 0, timeout)
+
+    def close(self, timeout=None):
+        """남은 요청을 모두 저장한 뒤 스레드 종료"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "pending": self.pending,
+            "write": self.write_time.summary(),
+        }
+
+    def report(self):
+        s = self.stats()
+        write = s["write"]
+        timing = f", 저장 평균 {write['mean_ms']:.1f}ms / p95 {write['p95_ms']:.1f}ms" if write.get("count") else ""
+        print(f"이미지 저장 통계: 요청 {s['queued']}, 저장 {s['written']}, 실패 {s['failed']}, "
+              f"버림 {s['dropped']}, 남음 {s['pending']}{timing}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,223 @@
+"""
+차선 추종 모델 추론 백엔드
+
+모든 백엔드는 같은 InferenceBackend 인터페이스를 따릅니다.
+    backend = load_backend("keras_direct")   # 로드 + 입력 버퍼 할당 + 워밍업
+    backend.input_buffer[0] = ...             # 미리 할당된 (1, H, W, C) float32 버퍼에 전처리 결과 기록
+    probs = backend.infer()                   # 버퍼로 추론, 지연시간 기록
+    print(backend.latency.summary())
+
+백엔드 종류
+- keras_predict: model.predict() (배치 작업용이라 호출당 오버헤드가 큼, 기존 방식)
+- keras_direct: model(x, training=False) 직접 호출 (미리 할당한 tf.Variable 입력 사용)
+- keras_traced: 입력 시그니처를 고정한 tf.function 으로 추적한 그래프 호출
+- tflite_fp16 / tflite_int8: export_tflite.py 로 변환한 모델을 TFLite 인터프리터로 추론
+
+TFLite 인터프리터는 tflite_runtime 패키지가 있으면 그것을 쓰고 (Pi 에서 가벼움),
+없으면 tensorflow.lite 를 사용합니다.
+"""
+import os
+import time
+
+import numpy as np
+
+from vehicle.stats import LatencyStats
+
+DEFAULT_MODEL_DIR = "/home/pi/AL_CAR"
+
+KERAS_MODEL_FILE = "lane_following_model.h5"
+
+# 백엔드 이름 -> 기본 모델 파일
+MODEL_FILES = {
+    "keras_predict": KERAS_MODEL_FILE,
+    "keras_direct": KERAS_MODEL_FILE,
+    "keras_traced": KERAS_MODEL_FILE,
+    "tflite_fp16": "lane_following_model_fp16.tflite",
+    "tflite_int8": "lane_following_model_int8.tflite",
+}
+
+
+class InferenceBackend:
+    """
+    추론 백엔드 기본 클래스
+
+    하위 클래스는 _load() 에서 모델을 읽고 입력 형태 (H, W, C) 를 반환하며,
+    _run(batch) 에서 (N, H, W, C) float32 배치의 클래스 확률을 반환합니다.
+    """
+
+    name = "base"
+
+    def __init__(self, model_path, batch_size=1):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.input_shape = None
+        self.input_buffer = None
+        self.latency = LatencyStats()
+
+    def load(self):
+        """모델을 로드하고 (batch_size, H, W, C) float32 입력 버퍼를 할당"""
+        self.input_shape = tuple(int(v) for v in self._load())
+        self.input_buffer = np.zeros((self.batch_size,) + self.input_shape, dtype=np.float32)
+        return self
+
+    def warmup(self, runs=3):
+        """첫 호출의 그래프 생성/메모리 할당 비용을 미리 치름 (지연시간 통계에는 포함하지 않음)"""
+        for _ in range(runs):
+            self._run(self.input_buffer)
+
+    def infer(self, batch=None):
+        """
+        추론을 실행합니다.
+        :param batch: (N, H, W, C) 배열, None 이면 input_buffer 사용
+        :return: (N, 클래스 수) float32 확률
+        """
+        if batch is None:
+            batch = self.input_buffer
+        start = time.perf_counter()
+        outputs = self._run(batch)
+        self.latency.add(time.perf_counter() - start)
+        return outputs
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _run(self, batch):
+        raise NotImplementedError
+
+
+class _KerasBackendBase(InferenceBackend):
+    def _load(self):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(self.model_path)
+        return self.model.input_shape[1:]
+
+
+class KerasPredictBackend(_KerasBackendBase):
+    """model.predict() 백엔드 (기존 방식)"""
+
+    name = "keras_predict"
+
+    def _run(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+class KerasDirectBackend(_KerasBackendBase):
+    """model(x, training=False) 직접 호출 백엔드"""
+
+    name = "keras_direct"
+
+    def load(self):
+        import tensorflow as tf
+        super().load()
+        # 입력 텐서를 한 번만 만들고 매 프레임 값만 덮어씀
+        self._input = tf.Variable(self.input_buffer, trainable=False)
+        return self
+
+    def _run(self, batch):
+        if batch.shape == self.input_buffer.shape:
+            self._input.assign(batch)
+            return self.model(self._input, training=False).numpy()
+        return self.model(batch, training=False).numpy()
+
+
+class KerasTracedBackend(_KerasBackendBase):
+    """tf.function 으로 추적한 그래프 호출 백엔드"""
+
+    name = "keras_traced"
+
+    def load(self):
+        import tensorflow as tf
+        super().load()
+        model = self.model
+        signature = [tf.TensorSpec((None,) + self.input_shape, tf.float32)]
+        # 배치 크기만 가변인 시그니처로 한 번만 추적
+        self._fn = tf.function(lambda x: model(x, training=False), input_signature=signature)
+        return self
+
+    def _run(self, batch):
+        return self._fn(batch).numpy()
+
+
+def load_tflite_interpreter(model_path, num_threads=None):
+    """TFLite 인터프리터 생성 (tflite_runtime 우선)"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+class TFLiteBackend(InferenceBackend):
+    """TFLite 인터프리터 백엔드 (float 모델과 int8 양자화 모델 모두 지원)"""
+
+    def __init__(self, model_path, batch_size=1, num_threads=None):
+        super().__init__(model_path, batch_size)
+        self.name = "tflite:" + os.path.basename(model_path)
+        self.num_threads = num_threads
+
+    def _load(self):
+        self.interpreter = load_tflite_interpreter(self.model_path, self.num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_dtype = self._input["dtype"]
+        # int8 입출력 모델은 (scale, zero_point) 로 양자화/역양자화
+        self._in_scale, self._in_zero = self._input["quantization"]
+        self._out_scale, self._out_zero = self._output["quantization"]
+        self._quant_buffer = np.zeros(self._input["shape"], dtype=self.input_dtype)
+        return self._input["shape"][1:]
+
+    def _quantize(self, x):
+        if self.input_dtype == np.float32:
+            return x.astype(np.float32, copy=False)
+        info = np.iinfo(self.input_dtype)
+        q = np.round(x / self._in_scale + self._in_zero)
+        np.clip(q, info.min, info.max, out=q)
+        self._quant_buffer[...] = q
+        return self._quant_buffer
+
+    def _dequantize(self, y):
+        if y.dtype == np.float32 or not self._out_scale:
+            return y.astype(np.float32, copy=False)
+        return (y.astype(np.float32) - self._out_zero) * self._out_scale
+
+    def _run(self, batch):
+        # 인터프리터 입력은 배치 1 로 고정되어 있으므로 한 장씩 실행
+        outputs = []
+        for x in batch:
+            self.interpreter.set_tensor(self._input["index"], self._quantize(x[np.newaxis]))
+            self.interpreter.invoke()
+            outputs.append(self._dequantize(self.interpreter.get_tensor(self._output["index"]))[0])
+        return np.stack(outputs)
+
+
+BACKENDS = {
+    "keras_predict": KerasPredictBackend,
+    "keras_direct": KerasDirectBackend,
+    "keras_traced": KerasTracedBackend,
+    "tflite_fp16": TFLiteBackend,
+    "tflite_int8": TFLiteBackend,
+}
+
+
+def load_backend(name, model_path=None, batch_size=1, num_threads=None, warmup=True):
+    """
+    이름으로 추론 백엔드를 생성하고 로드합니다.
+    :param name: BACKENDS 의 키 ("keras_predict", "keras_direct", "keras_traced", "tflite_fp16", "tflite_int8")
+    :param model_path: 모델 파일 경로 (None 이면 DEFAULT_MODEL_DIR 의 기본 파일)
+    :param batch_size: input_buffer 의 배치 크기
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드입니다: {name} (가능: {', '.join(BACKENDS)})")
+    model_path = model_path or os.path.join(DEFAULT_MODEL_DIR, MODEL_FILES[name])
+    cls = BACKENDS[name]
+    if cls is TFLiteBackend:
+        backend = TFLiteBackend(model_path, batch_size, num_threads)
+    else:
+        backend = cls(model_path, batch_size)
+    backend.load()
+    if warmup:
+        backend.warmup()
+    return backend
@@ -0,0 +1,125 @@
+"""
+모델 입력 크기에 맞춘 축소 JPEG 디코딩
+
+libjpeg 는 DCT 단계에서 1/2, 1/4, 1/8 크기로 바로 디코딩할 수 있으므로
+(cv2.IMREAD_REDUCED_*), 64x64 로 줄일 이미지를 원본 크기로 디코딩할 필요가 없습니다.
+JpegDecoder 는 목표 크기를 덮는 가장 작은 배율을 골라 디코딩하고,
+필요하면 ROI 만 잘라서 이후 변환(색 변환, 리사이즈)이 ROI 픽셀만 처리하게 합니다.
+
+사용 예
+    preview = JpegDecoder()                                    # 원본 크기 컬러 (미리보기용)
+    infer = JpegDecoder(target_size=(64, 64), roi=(0.3, 1.0))  # 추론용 축소 디코딩
+"""
+import struct
+
+import cv2
+import numpy as np
+
+# 배율 -> imdecode 플래그
+COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+GRAY_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# 크기 정보가 들어 있는 SOF 마커 (DHT=C4, JPG=C8, DAC=CC 제외)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(jpg):
+    """
+    JPEG 헤더만 읽어서 (width, height) 를 반환합니다. 디코딩하지 않습니다.
+    :return: (width, height), 헤더를 해석할 수 없으면 None
+    """
+    pos = 2  # SOI 다음
+    end = len(jpg)
+    while pos + 4 <= end:
+        if jpg[pos] != 0xFF:
+            return None
+        marker = jpg[pos + 1]
+        if marker == 0xFF:  # 채움 바이트
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:  # 길이 없는 마커
+            pos += 2
+            continue
+        length, = struct.unpack_from(">H", jpg, pos + 2)
+        if marker in SOF_MARKERS:
+            if pos + 9 > end:
+                return None
+            height, width = struct.unpack_from(">HH", jpg, pos + 5)
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def pick_scale(src_size, target_size, roi=None):
+    """
+    목표 크기를 덮는 가장 큰 축소 배율(1, 2, 4, 8)을 고릅니다.
+    :param src_size: 원본 (width, height)
+    :param target_size: 최종적으로 필요한 (width, height)
+    :param roi: (y0, y1, x0, x1) 비율, ROI 가 목표 크기를 덮어야 함
+    """
+    y0, y1, x0, x1 = roi or (0.0, 1.0, 0.0, 1.0)
+    roi_w = src_size[0] * (x1 - x0)
+    roi_h = src_size[1] * (y1 - y0)
+    for scale in (8, 4, 2):
+        if roi_w / scale >= target_size[0] and roi_h / scale >= target_size[1]:
+            return scale
+    return 1
+
+
+def normalize_roi(roi):
+    """(y0, y1) 또는 (y0, y1, x0, x1) 비율을 4개 값으로 맞춤"""
+    if roi is None:
+        return None
+    if len(roi) == 2:
+        return (roi[0], roi[1], 0.0, 1.0)
+    return tuple(roi)
+
+
+class JpegDecoder:
+    """
+    소비자별로 디코딩 방식을 정하는 JPEG 디코더 (FrameSource 의 decoder 로 사용)
+
+    target_size 가 None 이면 원본 크기로 디코딩합니다.
+    """
+
+    def __init__(self, target_size=None, grayscale=False, roi=None):
+        """
+        :param target_size: 이후 단계에서 필요한 (width, height), 예: (64, 64)
+        :param grayscale: True 이면 그레이스케일로 디코딩 (색 변환 생략)
+        :param roi: (y0, y1) 또는 (y0, y1, x0, x1) 비율. 예: (0.3, 1.0) 은 상단 30% 제거
+        """
+        self.target_size = target_size
+        self.grayscale = grayscale
+        self.roi = normalize_roi(roi)
+        self._flags = GRAY_FLAGS if grayscale else COLOR_FLAGS
+        self._size_cache = (None, 1)  # (원본 크기, 배율) - 카메라 해상도는 거의 바뀌지 않음
+
+    def scale_for(self, jpg):
+        """이 JPEG 에 사용할 축소 배율"""
+        if self.target_size is None:
+            return 1
+        size = jpeg_size(jpg)
+        if size is None:
+            return 1
+        if size != self._size_cache[0]:
+            self._size_cache = (size, pick_scale(size, self.target_size, self.roi))
+        return self._size_cache[1]
+
+    def __call__(self, jpg):
+        """JPEG 바이트를 디코딩하고 ROI 를 잘라 반환 (ROI 는 복사 없는 view)"""
+        image = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), self._flags[self.scale_for(jpg)])
+        if image is None or self.roi is None:
+            return image
+        h, w = image.shape[:2]
+        y0, y1, x0, x1 = self.roi
+        return image[int(h * y0):int(h * y1), int(w * x0):int(w * x1)]
@@ -0,0 +1,117 @@
+"""
+libcamera-vid MJPEG 파이프 프레임 분리기
+
+미리 할당한 bytearray 버퍼에 readinto 로 데이터를 채우고,
+마지막으로 탐색한 위치부터만 JPEG 마커를 찾기 때문에
+프레임 크기가 커져도 읽기 한 번당 비용이 일정합니다.
+"""
+
+SOI = b'\xff\xd8'  # JPEG 시작 마커
+EOI = b'\xff\xd9'  # JPEG 끝 마커
+
+DEFAULT_CAPACITY = 2 * 1024 * 1024  # 기본 버퍼 크기 (2MB)
+DEFAULT_CHUNK_SIZE = 64 * 1024      # readinto 한 번에 읽을 최대 크기
+
+
+class MjpegSplitter:
+    """
+    MJPEG 바이트 스트림을 JPEG 프레임 단위로 잘라 주는 클래스
+
+    read() 가 돌려주는 memoryview 는 내부 버퍼를 그대로 가리키므로
+    다음 read() 호출 전까지만 유효합니다. 오래 보관하려면 bytes() 로 복사하세요.
+    """
+
+    def __init__(self, stream, capacity=DEFAULT_CAPACITY, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :param stream: readinto 를 지원하는 바이너리 스트림 (예: process.stdout)
+        :param capacity: 내부 버퍼 크기 (프레임 하나보다 커야 하며, 부족하면 자동으로 늘어남)
+        :param chunk_size: 한 번에 읽을 최대 바이트 수
+        """
+        self._stream = stream
+        # 파이프에서는 readinto1 이 있으면 도착한 만큼만 바로 돌려받음
+        self._readinto = getattr(stream, "readinto1", None) or stream.readinto
+        self._chunk_size = chunk_size
+        self._buf = bytearray(max(capacity, chunk_size * 2))
+        self._view = memoryview(self._buf)
+        self._start = 0   # 아직 처리하지 않은 데이터의 시작 위치
+        self._end = 0     # 버퍼에 채워진 데이터의 끝 위치
+        self._scan = 0    # 다음 마커 탐색 시작 위치
+        self._soi = -1    # 현재 프레임의 시작 위치 (-1 이면 아직 못 찾음)
+        self._eof = False
+
+        # 통계
+        self.frames = 0         # 잘라낸 프레임 수
+        self.bytes_read = 0     # 스트림에서 읽은 총 바이트 수
+        self.skipped_bytes = 0  # 프레임 밖이라 버린 바이트 수
+
+    def _fill(self):
+        """스트림에서 데이터를 읽어 버퍼 끝에 이어 붙임. EOF 이면 False"""
+        if len(self._buf) - self._end < self._chunk_size:
+            self._make_room()
+        end = min(len(self._buf), self._end + self._chunk_size)
+        n = self._readinto(self._view[self._end:end])
+        if not n:
+            self._eof = True
+            return False
+        self._end += n
+        self.bytes_read += n
+        return True
+
+    def _make_room(self):
+        """처리 끝난 앞부분을 버리고 남은 데이터를 버퍼 앞으로 옮김"""
+        keep = self._end - self._start
+        if keep + self._chunk_size > len(self._buf):
+            # 프레임이 버퍼보다 큼 -> 새 버퍼를 할당 (기존 memoryview 는 그대로 유효)
+            new_buf = bytearray(max(len(self._buf) * 2, keep + self._chunk_size))
+            new_view = memoryview(new_buf)
+            new_view[:keep] = self._view[self._start:self._end]
+            self._buf, self._view = new_buf, new_view
+        elif keep:
+            # memoryview 대입은 겹치는 구간도 안전하게 복사됨
+            self._view[:keep] = self._view[self._start:self._end]
+        shift = self._start
+        self._start = 0
+        self._end = keep
+        self._scan -= shift
+        if self._soi != -1:
+            self._soi -= shift
+
+    def read(self):
+        """
+        다음 JPEG 프레임을 반환합니다.
+        :return: 프레임 바이트를 가리키는 memoryview, 스트림이 끝나면 None
+        """
+        buf = self._buf
+        while True:
+            if self._soi == -1:
+                pos = buf.find(SOI, self._scan, self._end)
+                if pos == -1:
+                    # 마지막 1바이트는 마커의 앞 절반일 수 있으므로 남겨 둠
+                    drop_to = max(self._start, self._end - 1)
+                    self.skipped_bytes += drop_to - self._start
+                    self._start = self._scan = drop_to
+                else:
+                    self.skipped_bytes += pos - self._start
+                    self._soi = self._start = pos
+                    self._scan = pos + 2
+            if self._soi != -1:
+                pos = buf.find(EOI, self._scan, self._end)
+                if pos != -1:
+                    frame_end = pos + 2
+                    frame = self._view[self._soi:frame_end]
+                    self._start = self._scan = frame_end
+                    self._soi = -1
+                    self.frames += 1
+                    return frame
+                self._scan = max(self._scan, self._end - 1)
+
+            if self._eof or not self._fill():
+                return None
+            buf = self._buf
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
@@ -0,0 +1,167 @@
+"""
+스테이지 파이프라인 (캡처 -> 전처리 -> 추론 -> 구동)
+
+스테이지마다 스레드 하나가 돌고, 스테이지 사이에는 크기가 정해진 drop-oldest 큐가 있습니다.
+뒤 스테이지가 느리면 오래된 항목을 버리므로 앞 스테이지는 절대 막히지 않고,
+프레임 N 을 추론하는 동안 프레임 N+1 을 캡처/전처리할 수 있습니다.
+
+    pipeline = Pipeline()
+    pipeline.add_stage("capture", grab)        # 첫 스테이지: 인자 없이 반복 호출
+    pipeline.add_stage("infer", run_model)     # 이후 스테이지: 앞 스테이지 결과를 받음
+    pipeline.add_stage("actuate", steer)
+    pipeline.start()
+
+스테이지 함수가 None 을 반환하면 그 항목은 다음 스테이지로 넘기지 않고,
+StopPipeline 을 발생시키면 파이프라인 전체가 멈춥니다.
+"""
+import threading
+import time
+from collections import deque
+
+from vehicle.stats import LatencyStats
+
+
+class StopPipeline(Exception):
+    """스테이지 함수에서 발생시키면 파이프라인을 종료"""
+
+
+class DropOldestQueue:
+    """가득 차면 가장 오래된 항목을 버리는 스레드 안전 큐 (put 은 절대 막히지 않음)"""
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """항목을 꺼냄. 시간 초과 또는 close() 후 비어 있으면 None"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Stage:
+    """파이프라인 스테이지 하나 (스레드 하나)"""
+
+    def __init__(self, name, func, in_queue=None):
+        self.name = name
+        self.func = func
+        self.in_queue = in_queue   # None 이면 소스 스테이지
+        self.out_queue = None
+        self.timing = LatencyStats()
+        self.thread = None
+
+
+class Pipeline:
+    """스테이지를 순서대로 연결한 파이프라인"""
+
+    def __init__(self, queue_size=1):
+        self.queue_size = queue_size
+        self.stages = []
+        self._running = False
+        self._stop_event = threading.Event()
+
+    def add_stage(self, name, func):
+        """스테이지 추가. 첫 스테이지는 소스(인자 없는 함수), 이후는 앞 스테이지 결과를 인자로 받음"""
+        in_queue = None
+        if self.stages:
+            in_queue = DropOldestQueue(self.queue_size)
+            self.stages[-1].out_queue = in_queue
+        stage = Stage(name, func, in_queue)
+        self.stages.append(stage)
+        return stage
+
+    @property
+    def running(self):
+        return self._running and not self._stop_event.is_set()
+
+    def start(self):
+        self._running = True
+        self._stop_event.clear()
+        for stage in self.stages:
+            stage.thread = threading.Thread(target=self._run_stage, args=(stage,),
+                                            name=f"stage-{stage.name}", daemon=True)
+            stage.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        for stage in self.stages:
+            if stage.in_queue is not None:
+                stage.in_queue.close()
+        for stage in self.stages:
+            if stage.thread is not None and stage.thread is not threading.current_thread():
+                stage.thread.join(timeout)
+        self._running = False
+
+    def wait(self, timeout=None):
+        """파이프라인이 멈출 때까지 대기. 멈췄으면 True"""
+        return self._stop_event.wait(timeout)
+
+    def _run_stage(self, stage):
+        while not self._stop_event.is_set():
+            if stage.in_queue is not None:
+                item = stage.in_queue.get(timeout=0.1)
+                if item is None:
+                    continue
+                args = (item,)
+            else:
+                args = ()
+
+            start = time.perf_counter()
+            try:
+                result = stage.func(*args)
+            except StopPipeline:
+                self._stop_event.set()
+                break
+            except Exception as e:
+                print(f"[{stage.name}] 스테이지 에러 발생: {e}")
+                self._stop_event.set()
+                break
+            stage.timing.add(time.perf_counter() - start)
+
+            if result is not None and stage.out_queue is not None:
+                stage.out_queue.put(result)
+
+    def stats(self):
+        """스테이지별 처리시간 통계와 입력 큐에서 버려진 항목 수"""
+        report = {}
+        for stage in self.stages:
+            entry = stage.timing.summary()
+            if stage.in_queue is not None:
+                entry["dropped"] = stage.in_queue.dropped
+            report[stage.name] = entry
+        return report
+
+    def report(self):
+        """스테이지별 통계를 보기 좋게 출력"""
+        for name, s in self.stats().items():
+            if not s.get("count"):
+                print(f"  {name:<10} 처리 0")
+                continue
+            dropped = f", 버림 {s['dropped']}" if "dropped" in s else ""
+            print(f"  {name:<10} 처리 {s['count']}, 평균 {s['mean_ms']:.1f}ms, "
+                  f"p95 {s['p95_ms']:.1f}ms, 최대 {s['max_ms']:.1f}ms{dropped}")
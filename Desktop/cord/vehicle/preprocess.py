@@ -0,0 +1,129 @@
+"""
+학습/주행 공용 전처리 커널
+
+학습 데이터는 (상단 자르기 -> 그레이스케일 -> 블러 -> 이진화) 한 이미지로 만들고,
+주행 중에는 같은 과정을 거친 뒤 모델 입력 크기로 줄여 0~1 float32 로 넣어야 입력이 일치합니다.
+Preprocessor 는 이 과정을 한 곳에 모아
+- ROI 자르기는 복사 없는 view, 그레이스케일 입력(JPEG 그레이 디코딩)이면 색 변환 생략
+- 블러/이진화 전에 ROI 를 작업 폭(work_width)으로 줄여서 픽셀 수를 줄이고
+  (카메라 JPEG 을 1/4 로 디코딩한 프레임과 원본 크기 학습 이미지가 같은 해상도에서 처리됨)
+- 중간 결과는 입력 크기별로 미리 할당한 버퍼에 dst= 로 기록 (프레임마다 메모리 할당 없음)
+- 마지막 축소 + 정규화는 호출한 쪽이 준 float32 배열에 바로 기록 ((H, W), (H, W, 1), (H, W, 3) 모두 가능)
+합니다. 버퍼를 재사용하므로 스레드마다 Preprocessor 를 따로 만들어 쓰세요.
+
+    pre = Preprocessor()                                # preprocess_images_by_range_1.py 와 같은 설정
+    binary = pre.binarize(bgr)                          # 전처리 스크립트: 저장할 이진 영상
+    pre.normalize(binary, X[i])                         # 로더: 저장된 이진 영상 -> 모델 입력
+    pre.shrink(binary, images[i])                       # 스트리밍 로더: 축소만 (uint8 로 보관, 정규화는 배치 단계)
+    pre(frame, model.input_buffer[0])                   # 주행: 카메라 프레임 -> 모델 입력
+"""
+import cv2
+import numpy as np
+
+METHODS = ("adaptive", "threshold")
+
+
+class Preprocessor:
+    """
+    ROI 자르기 -> 그레이 -> (작업 폭으로 축소) -> 블러 -> 이진화 -> 출력 크기로 축소 + 정규화
+    기본값은 preprocess_images_by_range_1.py 의 설정 (상단 30%, 블러 5, adaptiveThreshold 11/2)
+    """
+
+    def __init__(self, output_size=(64, 64), crop_top=0.3, work_width=160, blur_ksize=5,
+                 method="adaptive", block_size=11, thresh_c=2, threshold=128):
+        """
+        :param output_size: 모델 입력 (width, height)
+        :param method: "adaptive" (히스토그램 균등화 + adaptiveThreshold) 또는 "threshold" (고정 기준값)
+        """
+        if method not in METHODS:
+            raise ValueError(f"알 수 없는 이진화 방식: {method} (가능: {', '.join(METHODS)})")
+        self.output_size = tuple(output_size)
+        self.crop_top = crop_top
+        self.work_width = work_width
+        self.blur_ksize = blur_ksize
+        self.method = method
+        self.block_size = block_size
+        self.thresh_c = thresh_c
+        self.threshold = threshold
+        self._buffers = {}  # 입력 ROI 크기 -> 중간 결과 버퍼
+        self._small = np.empty((self.output_size[1], self.output_size[0]), dtype=np.uint8)
+
+    def params(self):
+        """설정 dict (매니페스트 등에서 비교용)"""
+        return {
+            "output_size": list(self.output_size),
+            "crop_top": self.crop_top,
+            "work_width": self.work_width,
+            "blur_ksize": self.blur_ksize,
+            "method": self.method,
+            "block_size": self.block_size,
+            "thresh_c": self.thresh_c,
+            "threshold": self.threshold,
+        }
+
+    def _buffers_for(self, roi_shape):
+        buffers = self._buffers.get(roi_shape)
+        if buffers is None:
+            h, w = roi_shape[:2]
+            if self.work_width and w != self.work_width:
+                work_size = (self.work_width, max(1, round(h * self.work_width / w)))
+            else:
+                work_size = (w, h)
+            shape = (work_size[1], work_size[0])
+            buffers = {
+                "gray": np.empty((h, w), dtype=np.uint8) if len(roi_shape) == 3 else None,
+                "work": np.empty(shape, dtype=np.uint8) if work_size != (w, h) else None,
+                "work_size": work_size,
+                "blurred": np.empty(shape, dtype=np.uint8),
+                "equalized": np.empty(shape, dtype=np.uint8),
+                "binary": np.empty(shape, dtype=np.uint8),
+            }
+            self._buffers[roi_shape] = buffers
+        return buffers
+
+    def binarize(self, image, cropped=False):
+        """
+        BGR 또는 그레이스케일 이미지 -> 작업 크기의 이진 영상 (uint8, 0/255)
+        :param cropped: True 이면 이미 ROI 를 자른 이미지 (JpegDecoder 의 roi 사용 시)
+        :return: 내부 버퍼 (다음 호출에서 덮어씀, 보관하려면 copy())
+        """
+        roi = image if cropped or not self.crop_top else image[int(image.shape[0] * self.crop_top):]
+        b = self._buffers_for(roi.shape)
+        gray = roi
+        if b["gray"] is not None:
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=b["gray"])
+        if b["work"] is not None:
+            gray = cv2.resize(gray, b["work_size"], dst=b["work"], interpolation=cv2.INTER_AREA)
+        k = self.blur_ksize
+        blurred = cv2.GaussianBlur(gray, (k, k), 0, dst=b["blurred"]) if k > 1 else gray
+        if self.method == "adaptive":
+            equalized = cv2.equalizeHist(blurred, dst=b["equalized"])
+            return cv2.adaptiveThreshold(equalized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
+                                         self.block_size, self.thresh_c, dst=b["binary"])
+        cv2.threshold(blurred, self.threshold, 255, cv2.THRESH_BINARY_INV, dst=b["binary"])
+        return b["binary"]
+
+    def shrink(self, binary, out=None):
+        """
+        이진(또는 그레이) 영상 -> 출력 크기로 축소한 uint8 (H, W)
+        :param out: 기록할 uint8 (H, W) 배열, None 이면 내부 버퍼 (다음 호출에서 덮어씀)
+        """
+        if binary.ndim == 3:  # 3채널로 저장된 이진 영상
+            binary = binary[:, :, 0]
+        return cv2.resize(binary, self.output_size, dst=self._small if out is None else out,
+                          interpolation=cv2.INTER_AREA)
+
+    def normalize(self, binary, out):
+        """
+        이진(또는 그레이) 영상 -> 출력 크기로 축소 -> 0~1 float32 를 out 에 기록
+        :param out: (H, W), (H, W, 1) 또는 (H, W, C) float32 배열 (채널이 여러 개면 같은 값으로 채움)
+        """
+        small = self.shrink(binary)
+        if out.ndim == 3:
+            small = small[:, :, np.newaxis]
+        np.multiply(small, np.float32(1.0 / 255.0), out=out, casting="unsafe")
+        return out
+
+    def __call__(self, image, out, cropped=False):
+        """카메라 프레임 -> 모델 입력 (out 에 기록)"""
+        return self.normalize(self.binarize(image, cropped), out)
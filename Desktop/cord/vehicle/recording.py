@@ -0,0 +1,321 @@
+"""
+샤드 단위 추가 전용(append-only) 녹화 형식
+
+수천 개의 작은 JPEG 파일 대신, 샤드 파일 하나에 JPEG 바이트와 프레임별 정보
+(시각, 서보 각도, 모터 속도, 라벨)를 이어서 기록합니다.
+파일 생성/디렉터리 갱신이 프레임마다 일어나지 않아 SD 카드 쓰기와 복사, 목록 읽기가 빠르고,
+촬영 당시 조향 각도와 속도가 함께 남습니다.
+
+샤드 파일 구조 (리틀 엔디언)
+    [파일 헤더]  MAGIC(8) + 메타 길이(u32) + 메타 JSON ({"labels": [...], "created": ...})
+    [레코드]*    RECORD_TAG(4) + 시각(f64) + 각도(f32) + 속도(f32) + 라벨(i32) + 길이(u32) + JPEG 바이트
+    [인덱스]     INDEX_DTYPE 배열 (close() 때 기록)
+    [트레일러]   인덱스 위치(u64) + 프레임 수(u32) + INDEX_TAG(4)
+close() 전에 끊긴 샤드(전원 차단 등)는 트레일러가 없으므로, 읽을 때 레코드 헤더를 따라가며 인덱스를 다시 만듭니다.
+
+    recorder = RecordingWriter("/home/pi/AL_CAR/recordings", labels=["left", "straight", "right"])
+    recorder.append(jpg, angle=current_angle, speed=current_speed, label="left")
+    recorder.close()
+
+    recording = Recording("/home/pi/AL_CAR/recordings")   # 디렉터리(샤드 여러 개) 또는 샤드 파일 하나
+    frame = recording[10]                                  # 인덱스로 바로 읽기
+    for frame in recording:                                # 순서대로 스트리밍
+        image = cv2.imdecode(np.frombuffer(frame.jpeg, np.uint8), cv2.IMREAD_COLOR)
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+SHARD_SUFFIX = ".rec"
+MAGIC = b"ALCARREC"
+META_HEADER = struct.Struct("<8sI")
+RECORD_TAG = b"FRM0"
+RECORD_HEADER = struct.Struct("<4sdffiI")
+INDEX_TAG = b"IDX0"
+TRAILER = struct.Struct("<QI4s")
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),      # JPEG 바이트 시작 위치
+    ("length", "<u4"),
+    ("timestamp", "<f8"),   # time.time()
+    ("angle", "<f4"),
+    ("speed", "<f4"),
+    ("label", "<i4"),       # labels 목록의 번호, 라벨 없음은 -1
+])
+
+SHARD_BYTES = 256 * 1024 * 1024  # 샤드 하나의 최대 크기
+
+Frame = namedtuple("Frame", ["jpeg", "timestamp", "angle", "speed", "label"])
+
+
+def find_shards(path):
+    """path 가 샤드 파일이면 [path], 디렉터리면 안의 샤드 파일 목록 (이름순 = 기록 순서)"""
+    if os.path.isfile(path):
+        return [path] if path.endswith(SHARD_SUFFIX) else []
+    return sorted(glob.glob(os.path.join(path, "*" + SHARD_SUFFIX)))
+
+
+class RecordingWriter:
+    """샤드 파일에 프레임을 이어서 기록 (크기가 shard_bytes 를 넘으면 다음 샤드로 넘어감)"""
+
+    def __init__(self, directory, labels=(), prefix="rec", shard_bytes=SHARD_BYTES,
+                 jpeg_quality=95, buffer_size=1024 * 1024):
+        """
+        :param labels: 라벨 이름 목록 (append 에 이름이나 번호로 지정)
+        :param jpeg_quality: 배열(디코딩된 프레임)을 넘겼을 때 인코딩 품질
+        :param buffer_size: 파일 쓰기 버퍼. 프레임마다 write 시스템 호출이 일어나지 않게 함
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.labels = list(labels)
+        self._label_ids = {name: i for i, name in enumerate(self.labels)}
+        self.prefix = prefix
+        self.shard_bytes = shard_bytes
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.buffer_size = buffer_size
+        self.session = time.strftime("%y%m%d_%H%M%S")
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._pos = 0
+        self._index = []
+        self._closed = False
+        self.shards = []  # 만든 샤드 경로
+
+        # 통계
+        self.frames = 0
+        self.bytes = 0
+        self.write_time = 0.0
+
+    def append(self, image, angle=0.0, speed=0.0, label=None, timestamp=None):
+        """
+        프레임 하나 기록
+        :param image: JPEG 바이트(bytes/memoryview, 그대로 기록) 또는 BGR/흑백 배열(JPEG 로 인코딩)
+        :param label: 라벨 이름 또는 번호, 없으면 None
+        :return: 이 샤드 안에서의 프레임 번호
+        """
+        if isinstance(image, np.ndarray):
+            ok, encoded = cv2.imencode(".jpg", image, self.encode_params)
+            if not ok:
+                raise ValueError("JPEG 인코딩 실패")
+            image = encoded
+        data = memoryview(image).cast("B")
+        label_id = self._label_id(label)
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("이미 닫힌 RecordingWriter 입니다.")
+            start = time.perf_counter()
+            if self._file is None or self._pos + RECORD_HEADER.size + len(data) > self.shard_bytes:
+                self._roll()
+            self._file.write(RECORD_HEADER.pack(RECORD_TAG, timestamp, angle, speed, label_id, len(data)))
+            self._file.write(data)
+            offset = self._pos + RECORD_HEADER.size
+            self._index.append((offset, len(data), timestamp, angle, speed, label_id))
+            self._pos = offset + len(data)
+            self.frames += 1
+            self.bytes += len(data)
+            self.write_time += time.perf_counter() - start
+            return len(self._index) - 1
+
+    def _label_id(self, label):
+        if label is None:
+            return -1
+        if isinstance(label, str):
+            if label not in self._label_ids:
+                raise ValueError(f"알 수 없는 라벨: {label} (가능: {', '.join(self.labels)})")
+            return self._label_ids[label]
+        return int(label)
+
+    def _roll(self):
+        """현재 샤드를 마무리하고 새 샤드를 염 (잠금 안에서 호출)"""
+        self._finish_shard()
+        path = os.path.join(self.directory, f"{self.prefix}_{self.session}_{len(self.shards):04d}{SHARD_SUFFIX}")
+        self._file = open(path, "wb", buffering=self.buffer_size)
+        meta = json.dumps({"labels": self.labels, "created": time.time()}).encode("utf-8")
+        self._file.write(META_HEADER.pack(MAGIC, len(meta)))
+        self._file.write(meta)
+        self._pos = META_HEADER.size + len(meta)
+        self._index = []
+        self.shards.append(path)
+
+    def _finish_shard(self):
+        """인덱스와 트레일러를 붙이고 닫음"""
+        if self._file is None:
+            return
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        self._file.write(index.tobytes())
+        self._file.write(TRAILER.pack(self._pos, len(index), INDEX_TAG))
+        self._file.close()
+        self._file = None
+
+    def flush(self):
+        """버퍼에 남은 레코드를 파일로 내보냄 (인덱스는 close() 때 기록)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._finish_shard()
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "shards": len(self.shards),
+            "mean_write_ms": self.write_time / self.frames * 1e3 if self.frames else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"녹화 통계: 프레임 {s['frames']}, {s['bytes'] / 1e6:.1f}MB, 샤드 {s['shards']}개, "
+              f"기록 평균 {s['mean_write_ms']:.2f}ms")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardReader:
+    """샤드 파일 하나 읽기 (mmap, 인덱스로 바로 접근)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self.labels = []
+        self.recovered = False  # 트레일러 없이 레코드를 따라가 인덱스를 만든 경우 True
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self._map = None
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+
+        # 첫 flush 전에 전원이 끊기면 빈 파일이나 헤더 일부만 남음 -> 프레임 없는 복구 샤드로 취급
+        if size < META_HEADER.size:
+            self._truncated(size)
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len = META_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"녹화 샤드 파일이 아닙니다: {path}")
+        meta_end = META_HEADER.size + meta_len
+        if size < meta_end:
+            self._truncated(size)
+            return
+        self.meta = json.loads(bytes(self._map[META_HEADER.size:meta_end]).decode("utf-8"))
+        self.labels = self.meta.get("labels", [])
+        self.index = self._read_index(meta_end)
+
+    def _truncated(self, size):
+        self.recovered = True
+        print(f"헤더가 잘린 녹화 샤드를 건너뜁니다: {self.path} ({size} bytes)")
+
+    def _read_index(self, data_start):
+        size = len(self._map)
+        if size >= data_start + TRAILER.size:
+            index_pos, count, tag = TRAILER.unpack_from(self._map, size - TRAILER.size)
+            if tag == INDEX_TAG and index_pos + count * INDEX_DTYPE.itemsize == size - TRAILER.size:
+                return np.frombuffer(self._map, dtype=INDEX_DTYPE, count=count, offset=index_pos).copy()
+        return self._scan(data_start)
+
+    def _scan(self, pos):
+        """레코드 헤더를 따라가며 인덱스 복구 (마지막의 잘린 레코드는 버림)"""
+        self.recovered = True
+        entries = []
+        size = len(self._map)
+        while pos + RECORD_HEADER.size <= size:
+            tag, timestamp, angle, speed, label, length = RECORD_HEADER.unpack_from(self._map, pos)
+            offset = pos + RECORD_HEADER.size
+            if tag != RECORD_TAG or offset + length > size:
+                break
+            entries.append((offset, length, timestamp, angle, speed, label))
+            pos = offset + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def jpeg(self, i):
+        """i 번째 프레임의 JPEG 바이트 (mmap 에서 필요한 부분만 복사)"""
+        entry = self.index[i]
+        offset = int(entry["offset"])
+        return self._map[offset:offset + int(entry["length"])]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class Recording:
+    """샤드 파일 하나 또는 샤드 디렉터리 전체를 하나의 프레임 목록처럼 읽기"""
+
+    def __init__(self, path):
+        self.paths = find_shards(path)
+        if not self.paths:
+            raise FileNotFoundError(f"녹화 샤드가 없습니다: {path}")
+        self.shards = [ShardReader(p) for p in self.paths]
+
+        # 샤드마다 라벨 목록이 다를 수 있으므로 전체 라벨 목록으로 번호를 맞춤
+        self.labels = []
+        for shard in self.shards:
+            for name in shard.labels:
+                if name not in self.labels:
+                    self.labels.append(name)
+        indexes = []
+        for shard in self.shards:
+            index = shard.index.copy()
+            # 샤드 라벨 번호 -> 전체 라벨 번호 (복구한 샤드의 범위 밖 번호는 라벨 없음 -1)
+            remap = np.array([self.labels.index(name) for name in shard.labels] + [-1], dtype=np.int32)
+            labels = index["label"]
+            labels[(labels < 0) | (labels >= len(shard.labels))] = -1
+            index["label"] = remap[labels]  # -1 은 마지막(-1)으로 그대로
+            indexes.append(index)
+        self.index = np.concatenate(indexes) if indexes else np.empty(0, dtype=INDEX_DTYPE)
+        self._shard_of = np.repeat(np.arange(len(self.shards)), [len(s) for s in self.shards])
+        self._starts = np.cumsum([0] + [len(s) for s in self.shards])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        s = self._shard_of[i]
+        entry = self.index[i]
+        jpeg = self.shards[s].jpeg(i - self._starts[s])
+        return Frame(jpeg, float(entry["timestamp"]), float(entry["angle"]), float(entry["speed"]),
+                     int(entry["label"]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def label_name(self, label):
+        return self.labels[label] if label >= 0 else None
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,180 @@
+"""
+고정 주기 제어 루프 스케줄러와 정지 감시(watchdog)
+
+RateScheduler 는 step 함수를 정해진 주기(예: 30Hz)로 호출하고,
+- 지터: 예정 시각 대비 실제 시작 시각의 지연 (히스토그램)
+- 데드라인 초과: step 이 다음 예정 시각을 넘겨 끝난 횟수 (건너뛴 주기 수 포함)
+- 처리시간: step 한 번에 걸린 시간
+을 기록합니다. 늦어진 주기를 몰아서 실행하지 않고 다음 예정 시각으로 건너뜁니다.
+
+Watchdog 은 feed() 가 timeout 초 동안 없으면 on_stall 을 호출합니다 (예: 모터 정지).
+
+    watchdog = Watchdog(0.5, on_stall=stop_motor).start()
+    scheduler = RateScheduler(30)
+    scheduler.run(control_step, should_stop=lambda: not pipeline.running)
+"""
+import bisect
+import threading
+import time
+
+from vehicle.stats import LatencyStats
+
+# 지터 히스토그램 구간 경계 (ms). 마지막 구간은 그 이상 전부
+JITTER_BINS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50)
+
+
+class JitterHistogram:
+    """지연시간 구간별 개수 (고정 구간이라 기록 비용이 일정)"""
+
+    def __init__(self, bins_ms=JITTER_BINS_MS):
+        self.bins_ms = tuple(bins_ms)
+        self.counts = [0] * (len(self.bins_ms) + 1)
+        self.max_ms = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1e3
+        self.counts[bisect.bisect_left(self.bins_ms, ms)] += 1
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def summary(self):
+        """{"<0.1ms": n, "<0.5ms": n, ..., ">=50ms": n}"""
+        labels = [f"<{b}ms" for b in self.bins_ms] + [f">={self.bins_ms[-1]}ms"]
+        return dict(zip(labels, self.counts))
+
+
+class RateScheduler:
+    """step 함수를 고정 주기로 호출하는 루프"""
+
+    def __init__(self, rate_hz, name="control"):
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.name = name
+        self._stop_event = threading.Event()
+
+        # 통계
+        self.ticks = 0
+        self.deadline_misses = 0  # step 이 다음 예정 시각을 넘겨 끝난 횟수
+        self.skipped_ticks = 0    # 그 때문에 건너뛴 주기 수
+        self.jitter = JitterHistogram()
+        self.work = LatencyStats()
+        self._started = None
+        self._elapsed = 0.0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self, step, should_stop=None):
+        """
+        stop() 또는 should_stop() 이 True 가 될 때까지 step() 을 주기마다 호출
+        step 이 False 를 반환해도 종료
+        """
+        self._stop_event.clear()
+        self._started = time.monotonic()
+        next_tick = self._started
+        try:
+            while not self._stop_event.is_set():
+                if should_stop is not None and should_stop():
+                    break
+                delay = next_tick - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+
+                start = time.monotonic()
+                self.jitter.add(max(0.0, start - next_tick))
+                result = step()
+                end = time.monotonic()
+                self.work.add(end - start)
+                self.ticks += 1
+
+                next_tick += self.period
+                if end > next_tick:
+                    # 늦어진 주기는 건너뛰고 다음 예정 시각에 맞춤
+                    self.deadline_misses += 1
+                    missed = int((end - next_tick) / self.period) + 1
+                    self.skipped_ticks += missed
+                    next_tick += missed * self.period
+                if result is False:
+                    break
+        finally:
+            self._elapsed = time.monotonic() - self._started
+
+    def stats(self):
+        elapsed = self._elapsed or (time.monotonic() - self._started if self._started else 0.0)
+        return {
+            "rate_hz": self.rate_hz,
+            "ticks": self.ticks,
+            "actual_hz": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "deadline_misses": self.deadline_misses,
+            "skipped_ticks": self.skipped_ticks,
+            "jitter": self.jitter.summary(),
+            "jitter_max_ms": self.jitter.max_ms,
+            "work": self.work.summary(),
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"  [{self.name}] 목표 {s['rate_hz']}Hz, 실제 {s['actual_hz']:.1f}Hz, 주기 {s['ticks']}, "
+              f"데드라인 초과 {s['deadline_misses']} (건너뛴 주기 {s['skipped_ticks']})")
+        work = s["work"]
+        if work.get("count"):
+            budget_ms = self.period * 1e3
+            print(f"  [{self.name}] 처리시간 평균 {work['mean_ms']:.2f}ms, p95 {work['p95_ms']:.2f}ms, "
+                  f"최대 {work['max_ms']:.2f}ms (예산 {budget_ms:.1f}ms)")
+        hist = ", ".join(f"{k} {v}" for k, v in s["jitter"].items() if v)
+        print(f"  [{self.name}] 지터: {hist or '없음'} (최대 {s['jitter_max_ms']:.2f}ms)")
+
+
+class Watchdog:
+    """feed() 가 timeout 초 동안 없으면 on_stall() 호출, 다시 feed() 되면 on_recover() 호출"""
+
+    def __init__(self, timeout, on_stall, on_recover=None, name="watchdog"):
+        self.timeout = timeout
+        self.on_stall = on_stall
+        self.on_recover = on_recover
+        self.name = name
+        self._lock = threading.Lock()
+        self._last_feed = time.monotonic()
+        self._stalled = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stalls = 0  # 정지 발생 횟수
+
+    @property
+    def stalled(self):
+        return self._stalled
+
+    def feed(self):
+        with self._lock:
+            self._last_feed = time.monotonic()
+            recovered = self._stalled
+            self._stalled = False
+        if recovered and self.on_recover is not None:
+            self.on_recover()
+
+    def start(self):
+        self._last_feed = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        interval = self.timeout / 4
+        while not self._stop_event.wait(interval):
+            with self._lock:
+                expired = not self._stalled and time.monotonic() - self._last_feed > self.timeout
+                if expired:
+                    self._stalled = True
+                    self.stalls += 1
+            if expired:
+                try:
+                    self.on_stall()
+                except Exception as e:
+                    print(f"[{self.name}] on_stall 에러 발생: {e}")
@@ -0,0 +1,31 @@
+"""
+지연시간/처리시간 통계
+"""
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """최근 지연시간 기록 (초 단위로 저장, 보고는 ms)"""
+
+    def __init__(self, window=1000):
+        self._times = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self._times.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        """{"count", "mean_ms", "p50_ms", "p95_ms", "max_ms"} (최근 window 개 기준)"""
+        if not self._times:
+            return {"count": 0}
+        times = np.fromiter(self._times, dtype=np.float64) * 1e3
+        return {
+            "count": self.count,
+            "mean_ms": float(times.mean()),
+            "p50_ms": float(np.percentile(times, 50)),
+            "p95_ms": float(np.percentile(times, 95)),
+            "max_ms": float(times.max()),
+        }
@@ -0,0 +1,131 @@
+"""
+libcamera-vid --codec yuv420 원시 스트림 리더
+
+MJPEG 는 ISP 가 JPEG 로 인코딩하고 파이썬에서 다시 디코딩해야 하지만,
+YUV420 은 Y 평면이 그대로 그레이스케일 이미지이므로 디코딩 없이 바로 이진화할 수 있습니다.
+파일이나 파이프 어디서든 같은 형식의 원시 프레임을 읽을 수 있습니다.
+
+    libcamera-vid -t 0 --nopreview --codec yuv420 --width 640 --height 480 -o - | python ...
+"""
+import shlex
+import subprocess
+
+import numpy as np
+
+from vehicle.frame_source import FrameSource, stop_process
+
+LIBCAMERA_YUV_CMD = ('libcamera-vid --nopreview -t 0 --codec yuv420 '
+                     '--width {width} --height {height} --framerate {framerate} -o - --camera {camera}')
+
+
+class Yuv420Reader:
+    """
+    고정 크기 YUV420(I420) 프레임을 미리 할당한 numpy 버퍼로 읽는 클래스
+
+    read() 가 반환하는 배열은 내부 버퍼의 view 이므로 다음 read() 전까지만 유효합니다.
+    """
+
+    def __init__(self, stream, width, height, stride=None):
+        """
+        :param stream: readinto 를 지원하는 바이너리 스트림 (파일, process.stdout 등)
+        :param width: 프레임 너비
+        :param height: 프레임 높이
+        :param stride: 한 줄의 바이트 수 (카메라가 줄 끝에 패딩을 넣는 경우 지정)
+        """
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.stride = stride or width
+        self.y_size = self.stride * height
+        self.uv_size = (self.stride // 2) * (height // 2)
+        self.frame_size = self.y_size + 2 * self.uv_size
+
+        self._buf = np.empty(self.frame_size, dtype=np.uint8)
+        self._view = memoryview(self._buf)
+        # 버퍼를 평면별로 나눈 view (복사 없음)
+        self._y = self._buf[:self.y_size].reshape(height, self.stride)[:, :width]
+        self._u = self._buf[self.y_size:self.y_size + self.uv_size].reshape(
+            height // 2, self.stride // 2)[:, :width // 2]
+        self._v = self._buf[self.y_size + self.uv_size:].reshape(
+            height // 2, self.stride // 2)[:, :width // 2]
+
+        self.frames = 0  # 읽은 프레임 수
+
+    def _fill(self):
+        """프레임 하나를 버퍼에 가득 채움. 스트림이 끝나면 False"""
+        filled = 0
+        while filled < self.frame_size:
+            n = self.stream.readinto(self._view[filled:])
+            if not n:
+                return False
+            filled += n
+        self.frames += 1
+        return True
+
+    def read(self):
+        """
+        다음 프레임의 Y 평면(그레이스케일 이미지)을 반환합니다.
+        :return: (height, width) uint8 배열, 스트림이 끝나면 None
+        """
+        if not self._fill():
+            return None
+        return self._y
+
+    def read_planes(self):
+        """다음 프레임의 (Y, U, V) 평면을 반환, 스트림이 끝나면 None"""
+        if not self._fill():
+            return None
+        return self._y, self._u, self._v
+
+    def __iter__(self):
+        while True:
+            y = self.read()
+            if y is None:
+                return
+            yield y
+
+
+class YuvSource(FrameSource):
+    """
+    YUV420 스트림을 읽는 FrameSource 백엔드 (이미지는 Y 평면 그레이스케일)
+
+    cmd 가 주어지면 libcamera-vid 를 실행하고, path 가 주어지면 파일/FIFO 에서 읽습니다.
+    """
+
+    def __init__(self, width=640, height=480, framerate=30, camera=0, stride=None, path=None, cmd=None):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.path = path
+        self.cmd = cmd or LIBCAMERA_YUV_CMD.format(width=width, height=height,
+                                                   framerate=framerate, camera=camera)
+        self._process = None
+        self._stream = None
+        self._reader = None
+
+    def _open(self):
+        if self.path is not None:
+            self._stream = open(self.path, "rb")
+        else:
+            self._process = subprocess.Popen(shlex.split(self.cmd),
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            self._stream = self._process.stdout
+        self._reader = Yuv420Reader(self._stream, self.width, self.height, self.stride)
+
+    def _grab(self):
+        y = self._reader.read()
+        # 읽기 버퍼는 다음 프레임에서 덮어써지므로 최신 프레임 보관용으로 복사 (Y 평면만)
+        return None if y is None else y.copy()
+
+    def _interrupt(self):
+        if self._process is not None:
+            self._process.terminate()  # 파이프 읽기에서 막힌 캡처 스레드를 깨움
+
+    def _close(self):
+        if self._process is not None:
+            stop_process(self._process)
+            self._process.stdout.close()
+            self._process = None
+        elif self._stream is not None:
+            self._stream.close()